@@ -0,0 +1,175 @@
+"""
+Compare the async Django views under ASGI with the sync DRF views under WSGI.
+
+Both servers, and the local PokeAPI stand-in they talk to, run as subprocesses
+with the cache effectively disabled, so every request pays the upstream round
+trip and the load generator does not share a GIL with either.
+Each concurrency level runs a closed loop of that many in-flight clients:
+
+    python benchmarks/asgi_vs_wsgi.py --concurrency 10 100 300 --duration 10 --latency-ms 50
+
+The WSGI server has a fixed pool of --wsgi-threads workers (gunicorn gthread
+style); the ASGI server is a single uvicorn worker.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from standin import SyntheticDex
+from run import percentile
+
+HERE = Path(__file__).resolve().parent
+
+# Endpoint kind -> (WSGI path, ASGI path, payload factory)
+ENDPOINTS = {
+    "info": ("/api/agent/pokemon-info/", "/api/agent/async/pokemon-info/",
+             lambda rng, names: {"name": rng.choice(names)}),
+    "compare": ("/api/agent/compare/", "/api/agent/async/compare/",
+                lambda rng, names: dict(zip(("pokemon1", "pokemon2"), rng.sample(names, 2)))),
+    "strategy": ("/api/agent/strategy/", "/api/agent/async/strategy/",
+                 lambda rng, names: {"name": rng.choice(names)}),
+    "team": ("/api/agent/team/", "/api/agent/async/team/",
+             lambda rng, names: {"description": "balanced rain team"}),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(process, port, label):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"{label} exited with {process.returncode}")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{label} did not start")
+
+
+def start_standin(args):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(HERE / "standin.py"), "--port", str(port),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms)],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for_port(process, port, "stand-in PokeAPI")
+    return process, f"http://127.0.0.1:{port}/api/v2"
+
+
+def start_server(mode, args, standin_url):
+    port = free_port()
+    env = {
+        **os.environ,
+        "POKE_API_URL": standin_url,
+        "POKE_CACHE_DIR": "none",
+        # Entries go stale immediately: every lookup pays the upstream round trip.
+        "POKE_CACHE_TTL": "1e-9",
+        "POKE_API_RATE_LIMIT": "0",
+        "POKE_API_MAX_CONNECTIONS": str(max(args.concurrency)),
+        "GOOGLE_API_KEY": "offline-benchmark",
+    }
+    process = subprocess.Popen(
+        [sys.executable, str(HERE / "django_server.py"), "--mode", mode, "--port", str(port),
+         "--threads", str(args.wsgi_threads), "--llm-latency-ms", str(args.llm_latency_ms)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(process, port, f"{mode} server")
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def run_level(base_url, path, make_payload, names, concurrency, duration, seed):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop_at = time.monotonic() + duration
+
+        async def worker(index):
+            nonlocal errors
+            rng = random.Random(seed + index)
+            while time.monotonic() < stop_at:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=make_payload(rng, names))
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += 0 if ok else 1
+
+        started = time.monotonic()
+        await asyncio.gather(*[worker(i) for i in range(concurrency)])
+        elapsed = time.monotonic() - started
+    calls = len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": calls,
+        "errors": errors,
+        "throughput_rps": round(calls / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if calls else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if calls else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if calls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=["info", "compare", "strategy"])
+    parser.add_argument("--wsgi-threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stand-in PokeAPI latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="asgi_vs_wsgi_report.json")
+    args = parser.parse_args()
+
+    standin, standin_url = start_standin(args)
+    names = [p["name"] for p in SyntheticDex().pokemon]
+    results = []
+    try:
+        for mode in ("wsgi", "asgi"):
+            process, base_url = start_server(mode, args, standin_url)
+            try:
+                for endpoint in args.endpoints:
+                    wsgi_path, asgi_path, make_payload = ENDPOINTS[endpoint]
+                    path = asgi_path if mode == "asgi" else wsgi_path
+                    for concurrency in args.concurrency:
+                        print(f"{mode} {endpoint} x{concurrency} ...", file=sys.stderr)
+                        level = asyncio.run(run_level(base_url, path, make_payload, names,
+                                                      concurrency, args.duration, args.seed))
+                        results.append({"mode": mode, "endpoint": endpoint, **level})
+            finally:
+                process.terminate()
+                process.wait(10)
+    finally:
+        standin.terminate()
+        standin.wait(10)
+
+    Path(args.output).write_text(json.dumps({"config": vars(args), "results": results}, indent=2), encoding="utf-8")
+    print(f"{'mode':<5} {'endpoint':<9} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<5} {r['endpoint']:<9} {r['concurrency']:>5} {r['throughput_rps']:>9} "
+              f"{r['p50_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7}")
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
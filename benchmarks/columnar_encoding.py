@@ -0,0 +1,99 @@
+"""
+Benchmark the bulk lookup response formats: serialized size and encode time of
+the default row format versus the columnar format.
+
+    python benchmarks/columnar_encoding.py --sizes 20 100 1000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+from src.components.encoding import encode_columnar  # noqa: E402
+from src.components.info_retrival import SUMMARY_FIELDS  # noqa: E402
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def synthetic_results(count, seed=0):
+    rng = random.Random(seed)
+    results = []
+    for i in range(1, count + 1):
+        name = f"pokemon-{i}"
+        info = {
+            "name": name,
+            "id": i,
+            "types": rng.sample(TYPES, rng.choice([1, 2])),
+            "abilities": [f"ability-{rng.randint(1, 300)}" for _ in range(rng.choice([1, 2, 3]))],
+            "height": rng.randint(1, 200),
+            "weight": rng.randint(1, 9999),
+            "stats": {s: rng.randint(5, 255) for s in STATS},
+            "sprite": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{i}.png",
+            "flavor_text": "A placeholder description of roughly typical Pokedex entry length for sizing.",
+            "evolution_chain": [name],
+            "moves": [f"move-{rng.randint(1, 900)}" for _ in range(5)],
+        }
+        results.append({"name": name, "info": info, "success": True})
+    return results
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(count, fields, repeat):
+    results = synthetic_results(count)
+    if fields != SUMMARY_FIELDS:
+        for entry in results:
+            entry["info"] = {f: entry["info"][f] for f in fields}
+
+    rows_payload = json.dumps(results, separators=(",", ":"))
+    columnar_payload = json.dumps(encode_columnar(results, fields), separators=(",", ":"))
+    rows_time = timed(lambda: json.dumps(results, separators=(",", ":")), repeat)
+    columnar_time = timed(lambda: json.dumps(encode_columnar(results, fields), separators=(",", ":")), repeat)
+    return {
+        "count": count,
+        "fields": list(fields),
+        "rows_bytes": len(rows_payload.encode()),
+        "columnar_bytes": len(columnar_payload.encode()),
+        "size_ratio": round(len(columnar_payload) / len(rows_payload), 3),
+        "rows_encode_ms": round(rows_time * 1000, 3),
+        "columnar_encode_ms": round(columnar_time * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for fields in (SUMMARY_FIELDS, ("name", "types", "stats")):
+        for count in args.sizes:
+            report.append(bench(count, fields, args.repeat))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'count':>6} {'fields':>8} {'rows B':>10} {'columnar B':>11} {'ratio':>6} {'rows ms':>8} {'col ms':>8}")
+    for r in report:
+        label = "all" if len(r["fields"]) == len(SUMMARY_FIELDS) else "compact"
+        print(f"{r['count']:>6} {label:>8} {r['rows_bytes']:>10} {r['columnar_bytes']:>11} "
+              f"{r['size_ratio']:>6} {r['rows_encode_ms']:>8} {r['columnar_encode_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
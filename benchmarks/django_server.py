@@ -0,0 +1,65 @@
+"""
+Serve the Django backend with the stub Gemini client installed, either under
+ASGI (uvicorn, one worker) or WSGI (a fixed pool of worker threads, like
+gunicorn's gthread worker). Used by asgi_vs_wsgi.py.
+
+    python benchmarks/django_server.py --mode asgi --port 8001
+    python benchmarks/django_server.py --mode wsgi --threads 8 --port 8002
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(ROOT / "mcp_server"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mcp_server.settings")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+
+class PooledWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI server handling requests on a bounded thread pool."""
+
+    request_queue_size = 1024
+    threads = 8
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("asgi", "wsgi"), required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    import stub_llm
+    from pokemon_api.src.components import team_composition
+    stub_llm.install([team_composition], args.llm_latency_ms)
+
+    if args.mode == "asgi":
+        import uvicorn
+        from mcp_server.asgi import application
+        uvicorn.run(application, host=args.host, port=args.port, log_level="warning", backlog=1024)
+    else:
+        from mcp_server.wsgi import application
+        PooledWSGIServer._pool = ThreadPoolExecutor(max_workers=args.threads)
+        server = make_server(args.host, args.port, application, server_class=PooledWSGIServer,
+                             handler_class=QuietHandler)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
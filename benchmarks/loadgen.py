@@ -0,0 +1,228 @@
+"""
+Concurrent load generator for the MCP server.
+
+Simulated agents connect through the same mcp_use MCPClient stack as
+server/client.py and call tools according to a weighted mix, with think time
+between calls and a k6-style ramp schedule. The server processes talk to a
+local PokeAPI stand-in (standin.py) and a stub Gemini, so runs are offline.
+
+    python benchmarks/loadgen.py --agents 20 --ramp-up 10 --duration 60 \\
+        --mix info=50,compare=15,counters=15,bulk=10,team=10 --think-ms 500
+
+    # explicit stages: ramp to 10 agents over 20s, hold 60s, ramp to 40 over 30s
+    python benchmarks/loadgen.py --stages 20:10,60:10,30:40
+
+The report shows throughput, latency percentiles and error rate per tool, plus
+upstream amplification: PokeAPI requests per tool call.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from mcp_use import MCPClient
+
+from standin import StandInPokeAPI
+from run import percentile
+
+HERE = Path(__file__).resolve().parent
+
+# Mix key -> (tool name, argument factory)
+TOOL_MIX = {
+    "info": ("get_pokemon_info", lambda rng, names: {"name": rng.choice(names)}),
+    "compare": ("compare_pokemon", lambda rng, names: dict(zip(("pokemon1", "pokemon2"), rng.sample(names, 2)))),
+    "counters": ("get_pokemon_counters", lambda rng, names: {"name": rng.choice(names)}),
+    "matchup": ("analyze_pokemon_matchup", lambda rng, names: dict(zip(("pokemon1", "pokemon2"), rng.sample(names, 2)))),
+    "bulk": ("bulk_pokemon_lookup", lambda rng, names: {"names": rng.sample(names, 10)}),
+    "team": ("get_team_analysis", lambda rng, names: {"team_members": rng.sample(names, rng.randint(3, 6))}),
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        key, _, weight = part.partition("=")
+        key = key.strip()
+        if key not in TOOL_MIX:
+            raise argparse.ArgumentTypeError(f"unknown mix entry '{key}' (choose from {', '.join(TOOL_MIX)})")
+        mix[key] = float(weight or 1)
+    return mix
+
+
+def parse_stages(value):
+    stages = []
+    for part in value.split(","):
+        seconds, _, agents = part.partition(":")
+        stages.append((float(seconds), int(agents)))
+    return stages
+
+
+def target_agents(elapsed, stages):
+    """Linearly interpolate the active agent count for the ramp schedule."""
+    start_agents, start_time = 0, 0.0
+    for seconds, agents in stages:
+        if elapsed < start_time + seconds:
+            fraction = (elapsed - start_time) / seconds if seconds else 1.0
+            return round(start_agents + (agents - start_agents) * fraction)
+        start_agents, start_time = agents, start_time + seconds
+    return None
+
+
+def tool_succeeded(result):
+    if getattr(result, "isError", False):
+        return False
+    for block in getattr(result, "content", []) or []:
+        text = getattr(block, "text", None)
+        if text:
+            try:
+                payload = json.loads(text)
+            except ValueError:
+                return True
+            return not isinstance(payload, dict) or payload.get("success", True)
+    return True
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, tool, seconds, ok):
+        self.latencies[tool].append(seconds)
+        if not ok:
+            self.errors[tool] += 1
+
+
+async def agent_loop(index, session, stages, mix, names, think_ms, recorder, started, rng):
+    keys = list(mix)
+    weights = [mix[k] for k in keys]
+    while True:
+        active = target_agents(time.monotonic() - started, stages)
+        if active is None:
+            return
+        if index >= active:
+            await asyncio.sleep(0.1)
+            continue
+        tool, make_args = TOOL_MIX[rng.choices(keys, weights)[0]]
+        start = time.perf_counter()
+        try:
+            ok = tool_succeeded(await session.connector.call_tool(tool, make_args(rng, names)))
+        except Exception:
+            ok = False
+        recorder.record(tool, time.perf_counter() - start, ok)
+        if think_ms:
+            await asyncio.sleep(rng.expovariate(1000 / think_ms))
+
+
+async def run_load(args, standin, cache_dir):
+    stages = args.stages or [(args.ramp_up, args.agents), (args.duration, args.agents)]
+    max_agents = max(agents for _, agents in stages)
+    servers = min(args.servers or max_agents, max_agents)
+    env = {
+        **os.environ,
+        "POKE_API_URL": standin.base_url,
+        "POKE_CACHE_DIR": str(cache_dir),
+        "STUB_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "GOOGLE_API_KEY": "offline-benchmark",
+    }
+    config = {"mcpServers": {
+        f"pokemon_api_{i}": {"command": sys.executable, "args": [str(HERE / "stub_server.py")], "env": env}
+        for i in range(servers)
+    }}
+    client = MCPClient.from_dict(config)
+    names = [p["name"] for p in standin.dex.pokemon]
+    recorder = Recorder()
+    try:
+        sessions = [await client.create_session(f"pokemon_api_{i}") for i in range(servers)]
+        standin.reset()
+        started = time.monotonic()
+        await asyncio.gather(*[
+            agent_loop(i, sessions[i % servers], stages, args.mix, names, args.think_ms,
+                       recorder, started, random.Random(args.seed + i))
+            for i in range(max_agents)
+        ])
+        elapsed = time.monotonic() - started
+    finally:
+        await client.close_all_sessions()
+    return recorder, elapsed, servers, stages
+
+
+def build_report(recorder, elapsed, upstream, args, servers, stages):
+    tools = {}
+    all_latencies = []
+    total_errors = 0
+    for tool, latencies in sorted(recorder.latencies.items()):
+        all_latencies.extend(latencies)
+        total_errors += recorder.errors[tool]
+        tools[tool] = {
+            "calls": len(latencies),
+            "errors": recorder.errors[tool],
+            "error_rate": round(recorder.errors[tool] / len(latencies), 4),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+        }
+    calls = len(all_latencies)
+    return {
+        "config": {**{k: v for k, v in vars(args).items() if k not in ("mix", "stages")},
+                   "mix": args.mix, "stages": stages, "servers": servers},
+        "duration_s": round(elapsed, 2),
+        "tool_calls": calls,
+        "throughput_rps": round(calls / elapsed, 2) if elapsed else None,
+        "error_rate": round(total_errors / calls, 4) if calls else None,
+        "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 2) if calls else None,
+        "p95_ms": round(percentile(all_latencies, 0.95) * 1000, 2) if calls else None,
+        "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 2) if calls else None,
+        "upstream_requests": upstream["total"],
+        "upstream_amplification": round(upstream["total"] / calls, 2) if calls else None,
+        "upstream_by_kind": upstream["by_kind"],
+        "tools": tools,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=10, help="simulated agents at steady state")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to ramp from 0 to --agents")
+    parser.add_argument("--duration", type=float, default=30.0, help="steady-state seconds after ramp-up")
+    parser.add_argument("--stages", type=parse_stages, help="explicit schedule 'seconds:agents,...' (overrides the above)")
+    parser.add_argument("--servers", type=int, help="MCP server processes (default: one per agent)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("info=50,compare=15,counters=15,bulk=10,team=10"))
+    parser.add_argument("--think-ms", type=float, default=250.0, help="mean think time between calls (exponential)")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="stand-in PokeAPI latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadgen_report.json")
+    args = parser.parse_args()
+
+    cache_dir = Path(tempfile.mkdtemp(prefix="pokeapi-load-"))
+    standin = StandInPokeAPI(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate).start()
+    try:
+        recorder, elapsed, servers, stages = asyncio.run(run_load(args, standin, cache_dir))
+        report = build_report(recorder, elapsed, standin.stats(), args, servers, stages)
+    finally:
+        standin.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"{report['tool_calls']} calls in {report['duration_s']}s: {report['throughput_rps']} calls/s, "
+          f"error rate {report['error_rate']}, p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms, "
+          f"upstream amplification {report['upstream_amplification']}")
+    for tool, stats in report["tools"].items():
+        print(f"  {tool:<28} calls={stats['calls']:<6} p50={stats['p50_ms']:<9} p95={stats['p95_ms']:<9} "
+              f"p99={stats['p99_ms']:<9} errors={stats['errors']}")
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
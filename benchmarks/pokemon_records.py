@@ -0,0 +1,110 @@
+"""
+Benchmark the slotted PokemonRecord against the Pokemon class on whole-dex
+workloads: memory retained per Pokémon, construction from cached documents and
+summary materialization.
+
+    python benchmarks/pokemon_records.py --sizes 100 1000 5000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+from src.components.info_retrival import Pokemon, PokemonRecord  # noqa: E402
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+FIELDS = ("name", "types", "stats")
+
+
+def synthetic_documents(count, seed=0):
+    """PokeAPI-shaped pokemon documents, each decoded separately like cache entries."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(1, count + 1):
+        doc = {
+            "id": i,
+            "name": f"pokemon-{i}",
+            "height": rng.randint(1, 200),
+            "weight": rng.randint(1, 9999),
+            "types": [{"slot": n + 1, "type": {"name": t}} for n, t in enumerate(rng.sample(TYPES, rng.choice([1, 2])))],
+            "abilities": [{"slot": n + 1, "ability": {"name": f"ability-{rng.randint(1, 300)}"}}
+                          for n in range(rng.choice([1, 2, 3]))],
+            "stats": [{"stat": {"name": s}, "base_stat": rng.randint(5, 255)} for s in STATS],
+            "sprites": {"front_default": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{i}.png"},
+            "moves": [{"move": {"name": f"move-{rng.randint(1, 900)}"}} for _ in range(60)],
+        }
+        docs.append(json.loads(json.dumps(doc)))
+    return docs
+
+
+def from_class(doc):
+    pokemon = Pokemon(doc["name"])
+    pokemon._load_basic_info(doc)
+    return pokemon
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained(build, docs):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(doc) for doc in docs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return after - before
+
+
+def bench(count, repeat):
+    docs = synthetic_documents(count)
+    classes = [from_class(doc) for doc in docs]
+    records = [PokemonRecord.from_document(doc) for doc in docs]
+    class_bytes = retained(from_class, docs)
+    record_bytes = retained(PokemonRecord.from_document, docs)
+    return {
+        "count": count,
+        "class_bytes_per": round(class_bytes / count),
+        "record_bytes_per": round(record_bytes / count),
+        "class_build_ms": round(timed(lambda: [from_class(doc) for doc in docs], repeat) * 1000, 3),
+        "record_build_ms": round(timed(lambda: [PokemonRecord.from_document(doc) for doc in docs], repeat) * 1000, 3),
+        "class_summary_ms": round(timed(lambda: [p.get_summary(FIELDS) for p in classes], repeat) * 1000, 3),
+        "record_summary_ms": round(timed(lambda: [r.summary(FIELDS) for r in records], repeat) * 1000, 3),
+        "class_speed_sort_ms": round(timed(lambda: sorted(classes, key=lambda p: p.stats["speed"]), repeat) * 1000, 3),
+        "record_speed_sort_ms": round(timed(lambda: sorted(records, key=lambda r: r.stat("speed")), repeat) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = [bench(count, args.repeat) for count in args.sizes]
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'count':>6} {'B/class':>8} {'B/record':>9} {'build ms':>17} {'summary ms':>17} {'sort ms':>15}")
+    for r in report:
+        print(f"{r['count']:>6} {r['class_bytes_per']:>8} {r['record_bytes_per']:>9} "
+              f"{r['class_build_ms']:>8}/{r['record_build_ms']:<8} {r['class_summary_ms']:>8}/{r['record_summary_ms']:<8} "
+              f"{r['class_speed_sort_ms']:>7}/{r['record_speed_sort_ms']:<7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Record real PokeAPI responses into benchmarks/fixtures/ for the stand-in server.
+
+    python benchmarks/record_fixtures.py pokemon/pikachu pokemon-species/pikachu type/electric
+    python benchmarks/record_fixtures.py --pokemon pikachu charizard eevee
+
+With --pokemon, the Pokémon, its species, evolution chain and types are recorded.
+Recorded fixtures take precedence over the stand-in's synthetic payloads.
+"""
+import argparse
+import json
+from urllib.parse import quote
+
+import requests
+
+from standin import FIXTURES_DIR
+
+POKEAPI = "https://pokeapi.co/api/v2"
+
+
+def record(path, session):
+    path = path.strip("/").lower()
+    response = session.get(f"{POKEAPI}/{path}", timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    target = FIXTURES_DIR / (quote(path, safe="/") + ".json")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    print(f"recorded {path} ({target.stat().st_size} bytes)")
+    return data
+
+
+def record_pokemon(name, session):
+    pokemon = record(f"pokemon/{name}", session)
+    species = record(f"pokemon-species/{pokemon['species']['name']}", session)
+    record(species["evolution_chain"]["url"].split("/api/v2/", 1)[1], session)
+    for t in pokemon["types"]:
+        record(f"type/{t['type']['name']}", session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="resource paths relative to /api/v2/")
+    parser.add_argument("--pokemon", nargs="*", default=[], help="record a Pokémon and its related resources")
+    args = parser.parse_args()
+    with requests.Session() as session:
+        for path in args.paths:
+            record(path, session)
+        for name in args.pokemon:
+            record_pokemon(name, session)
+
+
+if __name__ == "__main__":
+    main()
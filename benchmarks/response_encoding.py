@@ -0,0 +1,104 @@
+"""
+Benchmark Django API response encoding: render time of DRF's JSONRenderer
+versus the orjson-backed FastJSONRenderer, and bytes on the wire identity
+versus gzip (and brotli, when installed), for typical agent payloads.
+
+    python benchmarks/response_encoding.py --sizes 20 100 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "mcp_server"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mcp_server.settings")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from pokemon_api.renderers import FastJSONRenderer, orjson  # noqa: E402
+from pokemon_api.middleware import ENCODERS  # noqa: E402
+from pokemon_api.src.components.comparison_module import PokemonComparer  # noqa: E402
+from pokemon_api.src.components.search import STATS, make_record  # noqa: E402
+
+from columnar_encoding import synthetic_results, timed  # noqa: E402
+
+
+def comparison_payload():
+    rng = random.Random(1)
+    comparer = PokemonComparer("pokemon-1", "pokemon-2")
+
+    def side():
+        return {"stats": {s: rng.randint(5, 255) for s in STATS}, "types": ["fire", "flying"],
+                "abilities": [f"ability-{rng.randint(1, 300)}" for _ in range(3)]}
+    return {"result": comparer._build_comparison(side(), side())}
+
+
+def search_payload(count):
+    rng = random.Random(2)
+    results = []
+    for i in range(1, count + 1):
+        record = make_record(i, f"pokemon-{i}", ["water"], ["swift-swim", "water-veil"],
+                             {s: rng.randint(5, 255) for s in STATS}, generation=rng.randint(1, 9),
+                             evolution_stage=rng.randint(1, 3), fully_evolved=rng.random() < 0.5)
+        results.append({k: v for k, v in record.items() if k != "flavor_texts"})
+    return {"result": {"total": count, "offset": 0, "limit": count, "next_offset": None,
+                       "indexed": 1025, "results": results}}
+
+
+def payloads(sizes):
+    yield "compare", comparison_payload()
+    for count in sizes:
+        yield f"bulk x{count}", {"result": synthetic_results(count)}
+        yield f"search x{count}", search_payload(count)
+
+
+def bench(label, data, repeat):
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+    body = fast.render(data)
+    assert json.loads(body) == json.loads(drf.render(data))
+    row = {
+        "payload": label,
+        "drf_render_ms": round(timed(lambda: drf.render(data), repeat) * 1000, 3),
+        "fast_render_ms": round(timed(lambda: fast.render(data), repeat) * 1000, 3),
+        "identity_bytes": len(body),
+    }
+    row["render_speedup"] = round(row["drf_render_ms"] / max(row["fast_render_ms"], 1e-6), 1)
+    for coding, compress in ENCODERS.items():
+        row[f"{coding}_bytes"] = len(compress(body))
+        row[f"{coding}_ms"] = round(timed(lambda: compress(body), repeat) * 1000, 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = [bench(label, data, args.repeat) for label, data in payloads(args.sizes)]
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"renderer: {'orjson' if orjson else 'stdlib json (orjson not installed)'}; "
+          f"codings: {', '.join(ENCODERS)}")
+    codings = list(ENCODERS)
+    header = f"{'payload':<12} {'drf ms':>8} {'fast ms':>8} {'speedup':>8} {'bytes':>9}"
+    header += "".join(f" {c + ' B':>9} {c + ' ms':>8}" for c in codings)
+    print(header)
+    for r in report:
+        line = (f"{r['payload']:<12} {r['drf_render_ms']:>8} {r['fast_render_ms']:>8} "
+                f"{r['render_speedup']:>8} {r['identity_bytes']:>9}")
+        line += "".join(f" {r[c + '_bytes']:>9} {r[c + '_ms']:>8}" for c in codings)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Offline benchmark harness for the MCP tools (server/server.py) and the Django
+views (mcp_server/pokemon_api/views.py).
+
+A local PokeAPI stand-in (standin.py) with configurable latency and error rate
+replaces the real API and a stub replaces Gemini, so runs are reproducible and
+need no network. Django runs on an empty throwaway database rather than the
+synced mcp_server/db.sqlite3. Every target is measured cold (empty cache and
+indexes) and warm, and the results are written as a machine-readable JSON
+report:
+
+    python benchmarks/run.py --latency-ms 30 --iterations 20 --output bench_report.json
+    python benchmarks/run.py --baseline old_report.json --max-regression 0.25
+
+With --baseline the run exits non-zero when a warm p50 latency regresses by more
+than --max-regression (fractional) against the baseline report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from standin import StandInPokeAPI
+import stub_llm
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BULK_NAMES = ["bulbasaur", "charmander", "squirtle", "pikachu", "eevee",
+              "gengar", "garchomp", "snorlax", "dragonite", "lucario"]
+
+# Arguments used for each MCP tool. Tools without a scenario are reported as skipped.
+MCP_SCENARIOS = {
+    "get_pokemon_info": {"name": "pikachu"},
+    "compare_pokemon": {"pokemon1": "pikachu", "pokemon2": "charizard"},
+    "get_pokemon_counters": {"name": "charizard"},
+    "generate_pokemon_team": {"description": "balanced rain team"},
+    "analyze_pokemon_matchup": {"pokemon1": "garchomp", "pokemon2": "gengar"},
+    "get_team_analysis": {"team_members": ["pikachu", "snorlax", "garchomp"]},
+    "bulk_pokemon_lookup": {"names": BULK_NAMES},
+    "search_pokemon": {"types": ["water"], "min_stats": {"speed": 60}, "sort": "-speed"},
+    "get_move_learners": {"moves": ["tackle"]},
+    "get_pokemon_moves": {"name": "pikachu"},
+    "get_speed_tiers": {"name": "garchomp", "spread": "scarf", "versus": "max"},
+    "get_evolutions": {"name": "charmeleon"},
+    "get_competitive_analysis": {"pokemon_name": "garchomp"},
+    "health_check": {},
+    "get_profiles": {},
+}
+
+# URL name -> (method, payload) for each Django view.
+DJANGO_SCENARIOS = {
+    "agent-pokemon-info": ("post", {"name": "pikachu"}),
+    "agent-bulk-pokemon": ("post", {"names": BULK_NAMES}),
+    "agent-search": ("post", {"types": ["water"], "min_stats": {"speed": 60}, "sort": "-speed"}),
+    "agent-learnset": ("post", {"moves": ["tackle"]}),
+    "agent-speed-tiers": ("post", {"name": "garchomp", "spread": "scarf", "versus": "max"}),
+    "agent-evolutions": ("post", {"name": "charmeleon"}),
+    "agent-batch": ("post", {"operations": [
+        {"op": "info", "name": "pikachu"},
+        {"op": "compare", "pokemon1": "pikachu", "pokemon2": "charizard"},
+        {"op": "strategy", "name": "charizard"},
+    ]}),
+    "agent-compare-pokemon": ("post", {"pokemon1": "pikachu", "pokemon2": "charizard"}),
+    "agent-strategy": ("post", {"name": "charizard"}),
+    "agent-team": ("post", {"description": "balanced rain team"}),
+    "agent-async-pokemon-info": ("post", {"name": "pikachu"}),
+    "agent-async-compare-pokemon": ("post", {"pokemon1": "pikachu", "pokemon2": "charizard"}),
+    "agent-async-strategy": ("post", {"name": "charizard"}),
+    "agent-async-team": ("post", {"description": "balanced rain team"}),
+}
+
+# Targets that read what other lookups cached: this target's call runs untimed
+# on every fresh cache first, so the index has Pokémon to answer from.
+SETUP = {
+    "mcp:get_move_learners": "mcp:bulk_pokemon_lookup",
+    "django:agent-learnset": "django:agent-bulk-pokemon",
+    "mcp:get_speed_tiers": "mcp:bulk_pokemon_lookup",
+    "django:agent-speed-tiers": "django:agent-bulk-pokemon",
+}
+
+
+def configure_environment(base_url, cache_dir):
+    """Must run before the server or Django modules are imported."""
+    os.environ["POKE_API_URL"] = base_url
+    os.environ["POKE_CACHE_DIR"] = str(cache_dir)
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("POKE_API_RATE_LIMIT", "0")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mcp_server.settings")
+    sys.path.insert(0, str(ROOT / "mcp_server"))
+    sys.path.insert(0, str(ROOT / "server"))
+
+
+# Component modules holding an index built over the cache, and the global it is kept in.
+INDEXES = {"search": "_index", "learnsets": "_index", "flavor_text": "_index", "names": "_index",
+           "evolutions": "_graph"}
+
+
+def load_targets():
+    """The MCP app and a Django client; Django runs on an empty throwaway database."""
+    import importlib
+    import server as mcp_app
+    from src.components import cache as mcp_cache, team_composition as mcp_team
+
+    import django
+    django.setup()
+    from django.test import Client
+    from django.test.utils import setup_databases, setup_test_environment
+    from django.urls import get_resolver
+    from pokemon_api.src.components import cache as django_cache, team_composition as django_team
+
+    setup_test_environment()
+    # Rows synced into mcp_server/db.sqlite3 would answer cold Django calls without PokeAPI.
+    databases = setup_databases(verbosity=0, interactive=False)
+    routes = {}
+    for pattern in get_resolver().url_patterns:
+        if getattr(pattern, "app_name", None) == "admin":
+            continue
+        for sub in getattr(pattern, "url_patterns", []):
+            if getattr(sub, "name", None):
+                routes[sub.name] = f"/{pattern.pattern}{sub.pattern}"
+    return {
+        "mcp": mcp_app.mcp,
+        "django_client": Client(),
+        "routes": routes,
+        "caches": [mcp_cache.cache, django_cache.cache],
+        "indexes": [(importlib.import_module(f"{package}.{module}"), name)
+                    for package in ("src.components", "pokemon_api.src.components")
+                    for module, name in INDEXES.items()],
+        "team_modules": [mcp_team, django_team],
+        "databases": databases,
+    }
+
+
+def clear_caches(caches, cache_dir, indexes=()):
+    """Empty the caches and drop the indexes built over them."""
+    for cache in caches:
+        cache.clear_memory()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    for module, name in indexes:
+        setattr(module, name, None)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(target, phase, durations, errors, upstream_calls):
+    calls = len(durations)
+    total = sum(durations)
+    return {
+        "target": target,
+        "phase": phase,
+        "calls": calls,
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+        "max_ms": round(max(durations) * 1000, 3),
+        "throughput_rps": round(calls / total, 2) if total else None,
+        "upstream_requests_per_call": round(upstream_calls / calls, 2),
+    }
+
+
+def measure(target, call, standin, caches, cache_dir, cold_runs, iterations, setup=None, indexes=()):
+    """
+    Run `call` cold (fresh cache each time) and warm; `call` returns True on
+    success. `setup` runs untimed after every cache reset and before warming.
+    """
+    results = []
+    for phase, runs in (("cold", cold_runs), ("warm", iterations)):
+        durations, errors, upstream_calls = [], 0, 0
+        if phase == "warm":
+            if setup:
+                setup()
+            call()
+        for _ in range(runs):
+            if phase == "cold":
+                clear_caches(caches, cache_dir, indexes)
+                if setup:
+                    setup()
+            standin.reset()
+            start = time.perf_counter()
+            try:
+                ok = call()
+            except Exception:
+                ok = False
+            durations.append(time.perf_counter() - start)
+            errors += 0 if ok else 1
+            upstream_calls += standin.stats()["total"]
+        results.append(summarize(target, phase, durations, errors, upstream_calls))
+    return results
+
+
+def mcp_caller(mcp, name, arguments, loop):
+    def call():
+        result = loop.run_until_complete(mcp._tool_manager.call_tool(name, arguments, convert_result=False))
+        return not isinstance(result, dict) or result.get("success", True)
+    return call
+
+
+def django_caller(client, method, path, payload):
+    def call():
+        response = getattr(client, method)(path, payload, content_type="application/json")
+        return response.status_code < 400
+    return call
+
+
+def compare_to_baseline(report, baseline_path, max_regression):
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    previous = {(r["target"], r.get("phase")): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in report["results"]:
+        if r.get("skipped") or r["phase"] != "warm":
+            continue
+        old = previous.get((r["target"], r["phase"]))
+        if not old:
+            continue
+        if old["p50_ms"] and r["p50_ms"] > old["p50_ms"] * (1 + max_regression):
+            regressions.append({"target": r["target"], "baseline_p50_ms": old["p50_ms"], "p50_ms": r["p50_ms"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests answered 503")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="stub Gemini latency")
+    parser.add_argument("--iterations", type=int, default=20, help="warm calls per target")
+    parser.add_argument("--cold-runs", type=int, default=3, help="cold calls per target")
+    parser.add_argument("--only", nargs="*", help="limit to these targets (e.g. mcp:get_pokemon_info)")
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--baseline", help="previous report to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    cache_dir = Path(tempfile.mkdtemp(prefix="pokeapi-bench-"))
+    standin = StandInPokeAPI(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate).start()
+    configure_environment(standin.base_url, cache_dir)
+    targets = load_targets()
+    stub_llm.install(targets["team_modules"], args.llm_latency_ms)
+    loop = asyncio.new_event_loop()
+
+    plan = []
+    for tool in loop.run_until_complete(targets["mcp"].list_tools()):
+        name = f"mcp:{tool.name}"
+        arguments = MCP_SCENARIOS.get(tool.name)
+        plan.append((name, arguments is not None and mcp_caller(targets["mcp"], tool.name, arguments, loop)))
+    for url_name, path in sorted(targets["routes"].items()):
+        scenario = DJANGO_SCENARIOS.get(url_name)
+        caller = scenario and django_caller(targets["django_client"], scenario[0], path, scenario[1])
+        plan.append((f"django:{url_name}", caller))
+
+    callers = dict(plan)
+    results = []
+    try:
+        for name, caller in plan:
+            if args.only and name not in args.only:
+                continue
+            if not caller:
+                results.append({"target": name, "skipped": "no benchmark scenario"})
+                continue
+            print(f"benchmarking {name} ...", file=sys.stderr)
+            results.extend(measure(name, caller, standin, targets["caches"], cache_dir, args.cold_runs, args.iterations,
+                                   setup=callers.get(SETUP.get(name)), indexes=targets["indexes"]))
+    finally:
+        from django.test.utils import teardown_databases
+        teardown_databases(targets["databases"], verbosity=0)
+        loop.close()
+        standin.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"{'target':<40} {'phase':<5} {'p50 ms':>9} {'p95 ms':>9} {'rps':>8} {'upstream':>8} {'err':>4}")
+    for r in results:
+        if r.get("skipped"):
+            print(f"{r['target']:<40} skipped ({r['skipped']})")
+            continue
+        print(f"{r['target']:<40} {r['phase']:<5} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['throughput_rps']:>8} {r['upstream_requests_per_call']:>8} {r['errors']:>4}")
+    print(f"report written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.max_regression)
+        for r in regressions:
+            print(f"REGRESSION {r['target']}: p50 {r['baseline_p50_ms']} ms -> {r['p50_ms']} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
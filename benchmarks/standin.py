@@ -0,0 +1,446 @@
+"""
+A local stand-in for PokeAPI used by the benchmarks and load generator.
+
+Resources are served from recorded fixtures (see record_fixtures.py) when
+present under benchmarks/fixtures/, otherwise they are synthesized
+deterministically with the same shape as the real API, so everything runs
+offline. Latency and error rates can be injected, and every request is counted
+per resource kind.
+
+    python benchmarks/standin.py --port 8765 --latency-ms 40 --error-rate 0.02
+
+Special endpoints: GET /_stats returns request counters, POST /_reset clears them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, urlsplit, parse_qs
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+API_PREFIX = "/api/v2/"
+
+TYPE_CHART = {
+    # attacking type: (super effective against, not very effective against, no effect against)
+    "normal": ([], ["rock", "steel"], ["ghost"]),
+    "fire": (["grass", "ice", "bug", "steel"], ["fire", "water", "rock", "dragon"], []),
+    "water": (["fire", "ground", "rock"], ["water", "grass", "dragon"], []),
+    "electric": (["water", "flying"], ["electric", "grass", "dragon"], ["ground"]),
+    "grass": (["water", "ground", "rock"], ["fire", "grass", "poison", "flying", "bug", "dragon", "steel"], []),
+    "ice": (["grass", "ground", "flying", "dragon"], ["fire", "water", "ice", "steel"], []),
+    "fighting": (["normal", "ice", "rock", "dark", "steel"], ["poison", "flying", "psychic", "bug", "fairy"], ["ghost"]),
+    "poison": (["grass", "fairy"], ["poison", "ground", "rock", "ghost"], ["steel"]),
+    "ground": (["fire", "electric", "poison", "rock", "steel"], ["grass", "bug"], ["flying"]),
+    "flying": (["grass", "fighting", "bug"], ["electric", "rock", "steel"], []),
+    "psychic": (["fighting", "poison"], ["psychic", "steel"], ["dark"]),
+    "bug": (["grass", "psychic", "dark"], ["fire", "fighting", "poison", "flying", "ghost", "steel", "fairy"], []),
+    "rock": (["fire", "ice", "flying", "bug"], ["fighting", "ground", "steel"], []),
+    "ghost": (["psychic", "ghost"], ["dark"], ["normal"]),
+    "dragon": (["dragon"], ["steel"], ["fairy"]),
+    "dark": (["psychic", "ghost"], ["fighting", "dark", "fairy"], []),
+    "steel": (["ice", "rock", "fairy"], ["fire", "water", "electric", "steel"], []),
+    "fairy": (["fighting", "dragon", "dark"], ["fire", "poison", "steel"], []),
+}
+TYPES = list(TYPE_CHART)
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+VERSION_GROUPS = ["red-blue", "gold-silver", "sword-shield", "scarlet-violet"]
+LEARN_METHODS = ["level-up", "machine", "egg", "tutor"]
+LANGUAGES = ["en", "ja", "fr", "de", "es"]
+
+# (name, types, base stats, abilities, evolution family index)
+KNOWN_POKEMON = [
+    ("bulbasaur", ["grass", "poison"], [45, 49, 49, 65, 65, 45], ["overgrow", "chlorophyll"], 0),
+    ("ivysaur", ["grass", "poison"], [60, 62, 63, 80, 80, 60], ["overgrow", "chlorophyll"], 0),
+    ("venusaur", ["grass", "poison"], [80, 82, 83, 100, 100, 80], ["overgrow", "chlorophyll"], 0),
+    ("charmander", ["fire"], [39, 52, 43, 60, 50, 65], ["blaze", "solar-power"], 1),
+    ("charmeleon", ["fire"], [58, 64, 58, 80, 65, 80], ["blaze", "solar-power"], 1),
+    ("charizard", ["fire", "flying"], [78, 84, 78, 109, 85, 100], ["blaze", "solar-power"], 1),
+    ("squirtle", ["water"], [44, 48, 65, 50, 64, 43], ["torrent", "rain-dish"], 2),
+    ("wartortle", ["water"], [59, 63, 80, 65, 80, 58], ["torrent", "rain-dish"], 2),
+    ("blastoise", ["water"], [79, 83, 100, 85, 105, 78], ["torrent", "rain-dish"], 2),
+    ("pichu", ["electric"], [20, 40, 15, 35, 35, 60], ["static", "lightning-rod"], 3),
+    ("pikachu", ["electric"], [35, 55, 40, 50, 50, 90], ["static", "lightning-rod"], 3),
+    ("raichu", ["electric"], [60, 90, 55, 90, 80, 110], ["static", "lightning-rod"], 3),
+    ("eevee", ["normal"], [55, 55, 50, 45, 65, 55], ["run-away", "adaptability", "anticipation"], 4),
+    ("vaporeon", ["water"], [130, 65, 60, 110, 95, 65], ["water-absorb", "hydration"], 4),
+    ("jolteon", ["electric"], [65, 65, 60, 110, 95, 130], ["volt-absorb", "quick-feet"], 4),
+    ("flareon", ["fire"], [65, 130, 60, 95, 110, 65], ["flash-fire", "guts"], 4),
+    ("gengar", ["ghost", "poison"], [60, 65, 60, 130, 75, 110], ["cursed-body"], 5),
+    ("garchomp", ["dragon", "ground"], [108, 130, 95, 80, 85, 102], ["sand-veil", "rough-skin"], 6),
+    ("snorlax", ["normal"], [160, 110, 65, 65, 110, 30], ["immunity", "thick-fat", "gluttony"], 7),
+    ("dragonite", ["dragon", "flying"], [91, 134, 95, 100, 100, 80], ["inner-focus", "multiscale"], 8),
+    ("mewtwo", ["psychic"], [106, 110, 90, 154, 90, 130], ["pressure", "unnerve"], 9),
+    ("tyranitar", ["rock", "dark"], [100, 134, 110, 95, 100, 61], ["sand-stream", "unnerve"], 10),
+    ("lucario", ["fighting", "steel"], [70, 110, 70, 115, 70, 90], ["steadfast", "inner-focus", "justified"], 11),
+    ("gardevoir", ["psychic", "fairy"], [68, 65, 65, 125, 115, 80], ["synchronize", "trace", "telepathy"], 12),
+    ("ninetales", ["fire"], [73, 76, 75, 81, 100, 100], ["flash-fire", "drought"], 13),
+    ("ninetales-alola", ["ice", "fairy"], [73, 67, 75, 81, 100, 109], ["snow-cloak", "snow-warning"], 13),
+    ("charizard-mega-x", ["fire", "dragon"], [78, 130, 111, 130, 85, 100], ["tough-claws"], 1),
+    ("mr-mime", ["psychic", "fairy"], [40, 45, 65, 100, 120, 90], ["soundproof", "filter", "technician"], 14),
+]
+# Alternate forms -> the species they belong to
+FORM_OF = {"ninetales-alola": "ninetales", "charizard-mega-x": "charizard"}
+EVOLUTION_FAMILIES = [
+    [("bulbasaur", "ivysaur"), ("ivysaur", "venusaur")],
+    [("charmander", "charmeleon"), ("charmeleon", "charizard")],
+    [("squirtle", "wartortle"), ("wartortle", "blastoise")],
+    [("pichu", "pikachu"), ("pikachu", "raichu")],
+    [("eevee", "vaporeon"), ("eevee", "jolteon"), ("eevee", "flareon")],
+]
+MOVES = [
+    # (name, type, power, damage class, target)
+    ("tackle", "normal", 40, "physical", "selected-pokemon"),
+    ("body-slam", "normal", 85, "physical", "selected-pokemon"),
+    ("hyper-voice", "normal", 90, "special", "all-opponents"),
+    ("ember", "fire", 40, "special", "selected-pokemon"),
+    ("flamethrower", "fire", 90, "special", "selected-pokemon"),
+    ("heat-wave", "fire", 95, "special", "all-opponents"),
+    ("flare-blitz", "fire", 120, "physical", "selected-pokemon"),
+    ("water-gun", "water", 40, "special", "selected-pokemon"),
+    ("surf", "water", 90, "special", "all-other-pokemon"),
+    ("hydro-pump", "water", 110, "special", "selected-pokemon"),
+    ("thunder-shock", "electric", 40, "special", "selected-pokemon"),
+    ("thunderbolt", "electric", 90, "special", "selected-pokemon"),
+    ("discharge", "electric", 80, "special", "all-other-pokemon"),
+    ("vine-whip", "grass", 45, "physical", "selected-pokemon"),
+    ("energy-ball", "grass", 90, "special", "selected-pokemon"),
+    ("ice-beam", "ice", 90, "special", "selected-pokemon"),
+    ("blizzard", "ice", 110, "special", "all-opponents"),
+    ("close-combat", "fighting", 120, "physical", "selected-pokemon"),
+    ("aura-sphere", "fighting", 80, "special", "selected-pokemon"),
+    ("sludge-bomb", "poison", 90, "special", "selected-pokemon"),
+    ("earthquake", "ground", 100, "physical", "all-other-pokemon"),
+    ("air-slash", "flying", 75, "special", "selected-pokemon"),
+    ("psychic", "psychic", 90, "special", "selected-pokemon"),
+    ("bug-buzz", "bug", 90, "special", "selected-pokemon"),
+    ("rock-slide", "rock", 75, "physical", "all-opponents"),
+    ("shadow-ball", "ghost", 80, "special", "selected-pokemon"),
+    ("dragon-claw", "dragon", 80, "physical", "selected-pokemon"),
+    ("draco-meteor", "dragon", 130, "special", "selected-pokemon"),
+    ("dark-pulse", "dark", 80, "special", "selected-pokemon"),
+    ("crunch", "dark", 80, "physical", "selected-pokemon"),
+    ("flash-cannon", "steel", 80, "special", "selected-pokemon"),
+    ("moonblast", "fairy", 95, "special", "selected-pokemon"),
+    ("protect", "normal", None, "status", "user"),
+    ("swords-dance", "normal", None, "status", "user"),
+]
+
+
+def _ref(kind, name, ident):
+    return {"name": name, "url": f"https://pokeapi.co/api/v2/{kind}/{ident}/"}
+
+
+class SyntheticDex:
+    """Deterministic PokeAPI-shaped payloads for a dex of `size` Pokémon."""
+
+    def __init__(self, size=151, seed=7):
+        self.size = max(size, len(KNOWN_POKEMON))
+        rng = random.Random(seed)
+        self.pokemon = []
+        for i in range(self.size):
+            if i < len(KNOWN_POKEMON):
+                name, types, stats, abilities, family = KNOWN_POKEMON[i]
+            else:
+                name = f"synthmon-{i + 1}"
+                types = rng.sample(TYPES, rng.choice([1, 2]))
+                stats = [rng.randint(20, 150) for _ in STATS]
+                abilities = [f"ability-{rng.randint(1, 250)}" for _ in range(rng.choice([1, 2, 3]))]
+                family = None
+            moves = [m for m in MOVES if m[1] in types or m[1] == "normal"] + rng.sample(MOVES, 6)
+            self.pokemon.append({
+                "id": i + 1, "name": name, "types": types, "stats": stats,
+                "abilities": list(dict.fromkeys(abilities)), "family": family,
+                "moves": list(dict.fromkeys(m[0] for m in moves)),
+            })
+        self.by_name = {p["name"]: p for p in self.pokemon}
+        self.by_id = {p["id"]: p for p in self.pokemon}
+        self.moves = {m[0]: (i + 1, m) for i, m in enumerate(MOVES)}
+        self.chains = {}
+        for p in self.pokemon:
+            key = p["family"] if p["family"] is not None else f"solo-{p['id']}"
+            self.chains.setdefault(key, []).append(p["name"])
+        self.chain_ids = {key: i + 1 for i, key in enumerate(self.chains)}
+
+    def _find(self, ident):
+        if ident.isdigit():
+            return self.by_id.get(int(ident))
+        return self.by_name.get(ident)
+
+    def _species_name(self, p):
+        return FORM_OF.get(p["name"], p["name"])
+
+    def _generation(self, p):
+        return 1 + (p["id"] - 1) * 9 // self.size
+
+    def _chain_key(self, p):
+        return p["family"] if p["family"] is not None else f"solo-{p['id']}"
+
+    def resource(self, kind, ident, query):
+        if kind == "pokemon" and not ident:
+            limit = int(query.get("limit", ["20"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            results = [_ref("pokemon", p["name"], p["id"]) for p in self.pokemon[offset:offset + limit]]
+            return {"count": self.size, "next": None, "previous": None, "results": results}
+        if kind == "pokemon-species" and not ident:
+            species = [p for p in self.pokemon if p["name"] not in FORM_OF]
+            return {"count": len(species), "next": None, "previous": None,
+                    "results": [_ref("pokemon-species", p["name"], p["id"]) for p in species]}
+        if kind == "pokemon":
+            p = self._find(ident)
+            return p and self._pokemon(p)
+        if kind == "pokemon-species":
+            p = self._find(ident)
+            return p and p["name"] not in FORM_OF and self._species(p) or None
+        if kind == "evolution-chain" and ident.isdigit():
+            for key, chain_id in self.chain_ids.items():
+                if chain_id == int(ident):
+                    return self._chain(key)
+            return None
+        if kind == "type" and not ident:
+            return {"count": len(TYPES), "next": None, "previous": None,
+                    "results": [_ref("type", t, i) for i, t in enumerate(TYPES, 1)]}
+        if kind == "type" and ident in TYPE_CHART:
+            return self._type(ident)
+        if kind == "move":
+            entry = self.moves.get(ident) or next((m for m in self.moves.values() if str(m[0]) == ident), None)
+            return entry and self._move(*entry)
+        if kind == "generation" and ident.isdigit() and 1 <= int(ident) <= 9:
+            gen = int(ident)
+            species = [p for p in self.pokemon if p["name"] not in FORM_OF and self._generation(p) == gen]
+            return {"id": gen, "name": f"generation-{gen}",
+                    "pokemon_species": [_ref("pokemon-species", p["name"], p["id"]) for p in species]}
+        return None
+
+    def _pokemon(self, p):
+        moves = []
+        for j, move_name in enumerate(p["moves"]):
+            move_id = self.moves[move_name][0]
+            moves.append({
+                "move": _ref("move", move_name, move_id),
+                "version_group_details": [
+                    {"level_learned_at": (j * 3) % 60, "move_learn_method": _ref("move-learn-method", LEARN_METHODS[(j + k) % 4], (j + k) % 4 + 1),
+                     "version_group": _ref("version-group", vg, k + 1)}
+                    for k, vg in enumerate(VERSION_GROUPS) if (p["id"] + j + k) % 3
+                ],
+            })
+        return {
+            "id": p["id"],
+            "name": p["name"],
+            "height": 3 + p["id"] % 20,
+            "weight": 40 + p["id"] * 7 % 900,
+            "base_experience": 64,
+            "abilities": [{"ability": _ref("ability", a, 1 + sum(map(ord, a)) % 300), "is_hidden": i == 2, "slot": i + 1}
+                          for i, a in enumerate(p["abilities"])],
+            "types": [{"slot": i + 1, "type": _ref("type", t, TYPES.index(t) + 1)} for i, t in enumerate(p["types"])],
+            "stats": [{"base_stat": v, "effort": 0, "stat": _ref("stat", s, i + 1)} for i, (s, v) in enumerate(zip(STATS, p["stats"]))],
+            "moves": moves,
+            "species": _ref("pokemon-species", self._species_name(p), self.by_name[self._species_name(p)]["id"]),
+            "sprites": {"front_default": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{p['id']}.png"},
+        }
+
+    def _species(self, p):
+        chain_id = self.chain_ids[self._chain_key(p)]
+        parent = None
+        if p["family"] is not None and p["family"] < len(EVOLUTION_FAMILIES):
+            parent = next((a for a, b in EVOLUTION_FAMILIES[p["family"]] if b == p["name"]), None)
+        gen = self._generation(p)
+        return {
+            "id": p["id"],
+            "name": p["name"],
+            "is_legendary": p["name"] == "mewtwo",
+            "is_mythical": False,
+            "generation": _ref("generation", f"generation-{gen}", gen),
+            "evolves_from_species": _ref("pokemon-species", parent, self.by_name[parent]["id"]) if parent else None,
+            "evolution_chain": {"url": f"https://pokeapi.co/api/v2/evolution-chain/{chain_id}/"},
+            "varieties": [{"is_default": True, "pokemon": _ref("pokemon", p["name"], p["id"])}] + [
+                {"is_default": False, "pokemon": _ref("pokemon", q["name"], q["id"])}
+                for q in self.pokemon if FORM_OF.get(q["name"]) == p["name"]
+            ],
+            "flavor_text_entries": [
+                {"flavor_text": f"{p['name'].title()} entry in {lang} for {vg}.\nIt is a {'/'.join(p['types'])} type.",
+                 "language": _ref("language", lang, i + 1), "version": _ref("version", vg, k + 1)}
+                for k, vg in enumerate(VERSION_GROUPS) for i, lang in enumerate(LANGUAGES)
+            ],
+            "names": [{"name": p["name"].title(), "language": _ref("language", "en", 1)}],
+        }
+
+    def _chain(self, key):
+        members = [m for m in self.chains[key] if m not in FORM_OF]
+        edges = EVOLUTION_FAMILIES[key] if isinstance(key, int) and key < len(EVOLUTION_FAMILIES) else []
+        children = {}
+        for parent, child in edges:
+            children.setdefault(parent, []).append(child)
+        targets = {c for _, c in edges}
+        roots = [m for m in members if m not in targets] or members[:1]
+
+        def link(name, is_child):
+            return {
+                "species": _ref("pokemon-species", name, self.by_name[name]["id"]),
+                "evolution_details": [{"trigger": {"name": "level-up"}, "min_level": 16}] if is_child else [],
+                "evolves_to": [link(c, True) for c in children.get(name, [])],
+                "is_baby": False,
+            }
+
+        return {"id": self.chain_ids[key], "baby_trigger_item": None, "chain": link(roots[0], False)}
+
+    def _type(self, name):
+        idx = TYPES.index(name) + 1
+        double_to, half_to, none_to = TYPE_CHART[name]
+        double_from = [t for t, rel in TYPE_CHART.items() if name in rel[0]]
+        half_from = [t for t, rel in TYPE_CHART.items() if name in rel[1]]
+        none_from = [t for t, rel in TYPE_CHART.items() if name in rel[2]]
+        refs = lambda names: [_ref("type", t, TYPES.index(t) + 1) for t in names]  # noqa: E731
+        return {
+            "id": idx,
+            "name": name,
+            "damage_relations": {
+                "double_damage_to": refs(double_to), "half_damage_to": refs(half_to), "no_damage_to": refs(none_to),
+                "double_damage_from": refs(double_from), "half_damage_from": refs(half_from), "no_damage_from": refs(none_from),
+            },
+            "pokemon": [{"slot": p["types"].index(name) + 1, "pokemon": _ref("pokemon", p["name"], p["id"])}
+                        for p in self.pokemon if name in p["types"]],
+        }
+
+    def _move(self, move_id, move):
+        name, move_type, power, damage_class, target = move
+        return {
+            "id": move_id, "name": name, "power": power, "accuracy": 100, "pp": 15, "priority": 0,
+            "type": _ref("type", move_type, TYPES.index(move_type) + 1),
+            "damage_class": {"name": damage_class},
+            "target": {"name": target},
+        }
+
+
+class _Server(ThreadingHTTPServer):
+    # Concurrency benchmarks open hundreds of connections at once.
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StandInPokeAPI:
+    """Threaded HTTP server serving fixtures or synthetic payloads under /api/v2/."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 fixtures_dir=FIXTURES_DIR, dex_size=151, seed=7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures_dir = Path(fixtures_dir)
+        self.dex = SyntheticDex(dex_size, seed)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = Counter()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def stats(self):
+        with self._lock:
+            return {"total": sum(self.counts.values()), "by_kind": dict(self.counts)}
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+    def _fixture(self, path):
+        candidate = self.fixtures_dir / (quote(path, safe="/") + ".json")
+        if candidate.is_file():
+            return json.loads(candidate.read_text(encoding="utf-8"))
+        return None
+
+    def lookup(self, raw_path):
+        parts = urlsplit(raw_path)
+        path = parts.path[len(API_PREFIX):].strip("/").lower()
+        kind, _, ident = path.partition("/")
+        data = self._fixture(path) if not parts.query else None
+        if data is None:
+            data = self.dex.resource(kind, ident.strip("/"), parse_qs(parts.query))
+        return kind, data
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/_stats":
+                    return self._send(200, standin.stats())
+                if not self.path.startswith(API_PREFIX):
+                    return self._send(404, {"detail": "Not found."})
+                kind = self.path[len(API_PREFIX):].split("/")[0].split("?")[0]
+                with standin._lock:
+                    standin.counts[kind] += 1
+                    delay = standin.latency_ms + standin._rng.uniform(0, standin.jitter_ms)
+                    fail = standin._rng.random() < standin.error_rate
+                if delay:
+                    time.sleep(delay / 1000)
+                if fail:
+                    return self._send(503, {"detail": "Injected failure"})
+                _, data = standin.lookup(self.path)
+                if data is None:
+                    return self._send(404, {"detail": "Not found."})
+                return self._send(200, data)
+
+            def do_POST(self):
+                if self.path == "/_reset":
+                    standin.reset()
+                    return self._send(200, {"reset": True})
+                return self._send(405, {"detail": "Method not allowed."})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--dex-size", type=int, default=151)
+    args = parser.parse_args()
+    server = StandInPokeAPI(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, dex_size=args.dex_size)
+    print(f"Stand-in PokeAPI serving at {server.base_url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
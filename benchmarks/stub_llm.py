@@ -0,0 +1,57 @@
+"""
+Offline stand-in for the Gemini client used by team_composition.
+
+It answers generate_content() (and the async client.aio variant) with a fixed,
+valid team after an optional delay, so tools that call the LLM can be
+benchmarked without network access or keys.
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+STUB_TEAM = {
+    "description": "Balanced stub team used for offline benchmarking.",
+    "team": [
+        {"name": "Pikachu", "role": "Fast Special Attacker"},
+        {"name": "Snorlax", "role": "Tank"},
+        {"name": "Garchomp", "role": "Physical Sweeper"},
+        {"name": "Gardevoir", "role": "Special Support"},
+        {"name": "Blastoise", "role": "Bulky Water"},
+        {"name": "Lucario", "role": "Mixed Attacker"},
+    ],
+}
+
+
+class StubModels:
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(text=json.dumps(STUB_TEAM))
+
+
+class StubAsyncModels(StubModels):
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(text=json.dumps(STUB_TEAM))
+
+
+class StubGenAIClient:
+    def __init__(self, latency_ms=0.0):
+        self.models = StubModels(latency_ms)
+        self.aio = SimpleNamespace(models=StubAsyncModels(latency_ms))
+
+
+def install(modules, latency_ms=0.0):
+    """Replace the Gemini client in each team_composition module; returns the stub."""
+    stub = StubGenAIClient(latency_ms)
+    for module in modules:
+        module.client = stub
+    return stub
@@ -0,0 +1,22 @@
+"""
+Launch server/server.py over stdio with the stub Gemini client installed.
+
+Used by the load generator so simulated agents exercise the real MCP server
+process without network access. Configure the upstream with POKE_API_URL and
+the stub LLM delay with STUB_LLM_LATENCY_MS.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+import stub_llm  # noqa: E402
+import server  # noqa: E402
+from src.components import team_composition  # noqa: E402
+
+if __name__ == "__main__":
+    stub_llm.install([team_composition], float(os.getenv("STUB_LLM_LATENCY_MS", "0")))
+    server.mcp.run()
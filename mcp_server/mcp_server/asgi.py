@@ -5,12 +5,65 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serve with a single worker, e.g. ``uvicorn mcp_server.asgi:application``.
+Requests under ASYNC_API_PREFIX go to a handler whose middleware chain is
+async-native (ASYNC_API_MIDDLEWARE): Django's MiddlewareMixin runs every
+process_request/process_response hook on one shared thread, which would
+serialize the concurrent upstream waits the async views exist to overlap.
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcp_server.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+
+class AsyncAPIHandler(ASGIHandler):
+    def load_middleware(self, is_async=False):
+        """
+        BaseHandler.load_middleware() over ASYNC_API_MIDDLEWARE, which reads
+        settings.MIDDLEWARE itself. Every entry must be async-capable, so no
+        layer of the chain is adapted onto a thread.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+        handler = convert_exception_to_response(self._get_response_async if is_async else self._get_response)
+        for middleware_path in reversed(settings.ASYNC_API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            if is_async and not getattr(middleware, "async_capable", False):
+                raise ImproperlyConfigured(f"ASYNC_API_MIDDLEWARE entry {middleware_path} is not async-capable.")
+            try:
+                instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+            if hasattr(instance, "process_view"):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, instance.process_view))
+            if hasattr(instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, instance.process_template_response))
+            if hasattr(instance, "process_exception"):
+                self._exception_middleware.append(self.adapt_method_mode(False, instance.process_exception))
+            handler = convert_exception_to_response(instance)
+        self._middleware_chain = handler
+
+
+async_api_application = AsyncAPIHandler()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"].startswith(settings.ASYNC_API_PREFIX):
+        return await async_api_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -48,8 +48,21 @@ NEW_APPS = [
 
 INSTALLED_APPS += NEW_APPS
 
+# orjson-backed JSON rendering (see pokemon_api/renderers.py)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'pokemon_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
 MIDDLEWARE = [
     'pokemon_api.middleware.APILoggingMiddleware',
+    'pokemon_api.middleware.UpstreamDeadlineMiddleware',
+    'pokemon_api.middleware.ServerTimingMiddleware',
+    'pokemon_api.middleware.ProfilingMiddleware',
+    'pokemon_api.middleware.CompressionMiddleware',  # outside ETagMiddleware: tags the uncompressed body
+    'pokemon_api.middleware.ETagMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # must be high in the list
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -60,10 +73,34 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Under ASGI (see asgi.py) the async agent endpoints skip the sync-only middleware.
+ASYNC_API_PREFIX = '/api/agent/async/'
+ASYNC_API_MIDDLEWARE = [
+    'pokemon_api.middleware.APILoggingMiddleware',
+    'pokemon_api.middleware.UpstreamDeadlineMiddleware',
+    'pokemon_api.middleware.ServerTimingMiddleware',
+    'pokemon_api.middleware.ProfilingMiddleware',
+    'pokemon_api.middleware.CompressionMiddleware',
+    'pokemon_api.middleware.ETagMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+]
+
 ROOT_URLCONF = 'mcp_server.urls'
+
+# CompressionMiddleware: responses smaller than this are sent uncompressed
+API_COMPRESS_MIN_BYTES = int(os.getenv("POKE_COMPRESS_MIN_BYTES", "1024"))
+
+# Upper bound (seconds) on the PokeAPI work a single request may do
+POKE_REQUEST_DEADLINE = float(os.getenv("POKE_REQUEST_DEADLINE", "25"))
+
+# Serve Pokémon, species, type and evolution chain lookups from the local
+# Pokédex tables (filled by `manage.py sync_pokedex`), falling back to PokeAPI
+# for anything not synced yet.
+POKEDEX_LOCAL_DB = os.getenv("POKE_LOCAL_DB", "1") != "0"
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # Vite's default port
 ]
+CORS_EXPOSE_HEADERS = ["Server-Timing", "X-Profile-Id"]
 
 TEMPLATES = [
     {
@@ -140,7 +177,16 @@ API_LOG_DIR = os.path.join(BASE_DIR, 'api_logs')
 os.makedirs(API_LOG_DIR, exist_ok=True)
 API_LOG_FILE = os.path.join(API_LOG_DIR, 'api.log')
 
-# Logging configuration for API logging
+# APILoggingMiddleware: fraction of successful requests logged; errors and
+# requests slower than API_LOG_SLOW_SECONDS are always logged. Payloads are
+# cut to API_LOG_MAX_PAYLOAD bytes.
+API_LOG_SAMPLE_RATE = float(os.getenv("POKE_LOG_SAMPLE_RATE", "1"))
+API_LOG_SLOW_SECONDS = float(os.getenv("POKE_LOG_SLOW_SECONDS", "1"))
+API_LOG_MAX_PAYLOAD = int(os.getenv("POKE_LOG_MAX_PAYLOAD", "512"))
+
+# Logging configuration for API logging. Requests only enqueue records; the
+# console and file handlers run on the queue listener's background thread
+# (started in PokemonApiConfig.ready).
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -149,6 +195,9 @@ LOGGING = {
             'format': '[{levelname}] {asctime} {name} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'pokemon_api.structured_logging.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
@@ -158,13 +207,18 @@ LOGGING = {
         'api_file': {
             'class': 'logging.FileHandler',
             'filename': API_LOG_FILE,
-            'formatter': 'verbose',
+            'formatter': 'json',
             'encoding': 'utf8',
         },
+        'api_queue': {
+            'class': 'logging.handlers.QueueHandler',
+            'handlers': ['console', 'api_file'],
+            'respect_handler_level': True,
+        },
     },
     'loggers': {
         'api_logger': {
-            'handlers': ['console', 'api_file'],
+            'handlers': ['api_queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -1,3 +1,21 @@
 from django.contrib import admin
+from .models import Ability, EvolutionChain, Pokemon, Species, Type
 
-# Register your models here.
+
+@admin.register(Pokemon)
+class PokemonAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "national_id", "hp", "attack", "defense", "special_attack", "special_defense", "speed")
+    search_fields = ("name",)
+    list_filter = ("types",)
+
+
+@admin.register(Species)
+class SpeciesAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "generation", "is_legendary", "is_mythical")
+    search_fields = ("name",)
+    list_filter = ("generation",)
+
+
+admin.site.register(Type)
+admin.site.register(Ability)
+admin.site.register(EvolutionChain)
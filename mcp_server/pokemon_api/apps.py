@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PokemonApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pokemon_api'
+
+    def ready(self):
+        from .structured_logging import start_queue_listeners
+        start_queue_listeners(["api_logger"])
+
+        if settings.POKEDEX_LOCAL_DB:
+            from .repository import DatabaseRepository
+            from .src.components.repository import set_repository
+            set_repository(DatabaseRepository())
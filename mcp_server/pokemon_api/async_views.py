@@ -0,0 +1,103 @@
+"""
+Async variants of the agent endpoints, meant to be served under ASGI
+(`uvicorn mcp_server.asgi:application`). They await the shared httpx client in
+upstream.py instead of blocking a worker thread for each PokeAPI round trip.
+
+DRF's APIView cannot await, so these are plain Django views with the same
+request/response contract as their counterparts in views.py.
+"""
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from .renderers import FastJsonResponse
+from .src.components import names
+from .src.components.info_retrival import Pokemon, parse_fields
+from .src.components.comparison_module import PokemonComparer
+from .src.components.strategy import recommend_counters_async
+from .src.components.team_composition import generate_team_with_gemini_async
+from .flavor_text import flavor_text_index
+from .evolutions import evolution_graph
+
+logger = logging.getLogger(__name__)
+
+class AsyncAPIView(View):
+    """
+    JSON in, JSON out and CSRF exempt, like APIView. Subclasses define
+    `async handle(data)`. The handlers resolve Pokémon names on the event loop,
+    so the name index is built on a worker thread first when it does not exist.
+    """
+
+    http_method_names = ["post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request):
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return FastJsonResponse({"error": "Request body must be a JSON object."}, status=400)
+        if not names.built():
+            await sync_to_async(names.name_index)()
+        return await self.handle(data)
+
+class AsyncPokemonInfoView(AsyncAPIView):
+    async def handle(self, data):
+        name = str(data.get("name") or "").lower()
+        if not name:
+            return FastJsonResponse({"error": "Missing 'name'"}, status=400)
+        try:
+            fields = parse_fields(data.get("fields"))
+        except ValueError as ve:
+            return FastJsonResponse({"error": str(ve)}, status=400)
+        info = Pokemon(name, language=data.get("language"), version=data.get("version"),
+                       flavor_texts=await sync_to_async(flavor_text_index)(),
+                       evolution_graph=await sync_to_async(evolution_graph)())
+        try:
+            await info.fetch_async(fields)
+            return FastJsonResponse({"result": info.get_summary(fields)})
+        except Exception as e:
+            logger.exception("Error in AsyncPokemonInfoView")
+            return FastJsonResponse({"error": str(e)}, status=400)
+
+class AsyncComparePokemonView(AsyncAPIView):
+    async def handle(self, data):
+        name1 = data.get("pokemon1")
+        name2 = data.get("pokemon2")
+        if not name1 or not name2:
+            return FastJsonResponse({"error": "Both 'pokemon1' and 'pokemon2' are required."}, status=400)
+        try:
+            comparer = PokemonComparer(name1, name2)
+            return FastJsonResponse({"result": await comparer.compare_async()})
+        except Exception as e:
+            logger.exception("Error in AsyncComparePokemonView")
+            return FastJsonResponse({"error": str(e)}, status=400)
+
+class AsyncStrategyView(AsyncAPIView):
+    async def handle(self, data):
+        name = data.get("name")
+        if not name:
+            return FastJsonResponse({"error": "Missing 'name'"}, status=400)
+        try:
+            return FastJsonResponse({"result": await recommend_counters_async(name)})
+        except Exception as e:
+            logger.exception("Error in AsyncStrategyView")
+            return FastJsonResponse({"error": str(e)}, status=500)
+
+class AsyncTeamCompositionView(AsyncAPIView):
+    async def handle(self, data):
+        description = data.get("description")
+        if not description:
+            return FastJsonResponse({"error": "Missing 'description' in request body."}, status=400)
+        try:
+            return FastJsonResponse({"result": await generate_team_with_gemini_async(description)})
+        except ValueError as ve:
+            return FastJsonResponse({"error": str(ve)}, status=500)
+        except Exception:
+            logger.exception("Error in AsyncTeamCompositionView")
+            return FastJsonResponse({"error": "An unexpected error occurred."}, status=500)
@@ -0,0 +1,75 @@
+"""
+Operations accepted by the agent/batch/ endpoint.
+
+Each operation is a dict with an "op" key plus the fields the matching
+single-operation endpoint takes. Operations of every batch share one
+fixed-size thread pool, so concurrent batches queue rather than each starting
+threads of their own; the upstream layer's single-flight fetching makes
+concurrent operations that need the same PokeAPI resource share one request.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from .src.components.info_retrival import fetch_summary, parse_fields
+from .src.components.comparison_module import PokemonComparer
+from .src.components.strategy import recommend_counters
+
+MAX_BATCH_OPERATIONS = 50
+BATCH_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+
+def run_info(op):
+    name = str(op.get("name") or "").lower()
+    if not name:
+        raise ValueError("Missing 'name'")
+    fields = parse_fields(op.get("fields"))
+    return fetch_summary(name, fields)
+
+
+def run_compare(op):
+    name1 = op.get("pokemon1")
+    name2 = op.get("pokemon2")
+    if not name1 or not name2:
+        raise ValueError("Both 'pokemon1' and 'pokemon2' are required.")
+    return PokemonComparer(name1, name2).compare()
+
+
+def run_strategy(op):
+    name = op.get("name")
+    if not name:
+        raise ValueError("Missing 'name'")
+    result = recommend_counters(name)
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
+
+
+OPERATIONS = {
+    "info": run_info,
+    "compare": run_compare,
+    "strategy": run_strategy,
+}
+
+
+def run_operation(index, op):
+    """Run one operation; failures become a per-item error instead of failing the batch."""
+    name = op.get("op") if isinstance(op, dict) else None
+    try:
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown op '{name}'. Valid ops: {', '.join(OPERATIONS)}")
+        return {"index": index, "op": name, "success": True, "result": OPERATIONS[name](op)}
+    except Exception as e:
+        return {"index": index, "op": name, "success": False, "error": str(e)}
+
+
+def submit_batch(operations):
+    """
+    Start every operation and return their futures in request order.
+
+    Each operation runs in a copy of the caller's context, so request-scoped
+    state (deadline, priority, profile) still applies when results are
+    consumed after the view returns, as with a streamed response.
+    """
+    context = contextvars.copy_context()
+    return [_executor.submit(context.copy().run, run_operation, i, op) for i, op in enumerate(operations)]
@@ -0,0 +1,28 @@
+"""
+The Pokédex file (components/dexfile.py) written from the synced tables.
+
+`sync_pokedex` rewrites it after storing anything and `build_dexfile` on
+demand; until anything is synced it is written from the cached PokeAPI
+documents instead.
+"""
+from django.conf import settings
+from django.db import DatabaseError
+from .models import Pokemon, Type
+from .repository import pokemon_rows, row_document, type_document
+from .src.components import dexfile
+
+
+def database_documents():
+    """(pokemon documents, type documents) of every synced row."""
+    return ([row_document(row) for row in pokemon_rows()],
+            [type_document(name) for name in Type.objects.values_list("name", flat=True)])
+
+
+def documents():
+    if settings.POKEDEX_LOCAL_DB:
+        try:
+            if Pokemon.objects.exists():
+                return database_documents()
+        except DatabaseError:
+            pass
+    return dexfile.documents_from_cache()
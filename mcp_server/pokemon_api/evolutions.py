@@ -0,0 +1,38 @@
+"""
+Evolution graph (components/evolutions.py) over the synced evolution chain table.
+
+Like the learnset index, it is rebuilt when the table changes and falls back
+to the cached PokeAPI documents until anything is synced. Synced forms and
+default varieties are mapped to their species.
+"""
+import threading
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from .models import EvolutionChain, Pokemon
+from .src.components.evolutions import EvolutionGraph, cached_graph
+
+_graph = None
+_graph_version = None
+_lock = threading.Lock()
+
+
+def evolution_graph():
+    global _graph, _graph_version
+    if not settings.POKEDEX_LOCAL_DB:
+        return cached_graph()
+    try:
+        state = EvolutionChain.objects.aggregate(count=Count("id"), latest=Max("synced_at"))
+    except DatabaseError:
+        return cached_graph()
+    if not state["count"]:
+        return cached_graph()
+    version = (state["count"], state["latest"])
+    with _lock:
+        if _graph_version != version:
+            rows = EvolutionChain.objects.values_list("id", "chain").iterator()
+            graph = EvolutionGraph({"id": ident, "chain": chain} for ident, chain in rows)
+            for name, species in Pokemon.objects.filter(species__isnull=False).values_list("name", "species__name"):
+                graph.add_variety(name, species)
+            _graph, _graph_version = graph, version
+        return _graph
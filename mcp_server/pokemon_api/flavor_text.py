@@ -0,0 +1,45 @@
+"""
+Flavor text index (components/flavor_text.py) over the synced species table.
+
+Like the learnset index, it is rebuilt when the table changes and falls back
+to the cached PokeAPI documents until anything is synced. Species reach the
+index together with the names of their synced varieties.
+"""
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from .models import Pokemon, Species
+from .src.components.flavor_text import FlavorTextIndex, cached_index
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def species_documents():
+    """Species-shaped documents with just what the flavor text index reads."""
+    varieties = defaultdict(list)
+    for species_id, name in Pokemon.objects.filter(species__isnull=False).values_list("species_id", "name"):
+        varieties[species_id].append({"pokemon": {"name": name}})
+    for ident, name, entries in Species.objects.values_list("id", "name", "flavor_text_entries").iterator():
+        yield {"id": ident, "name": name, "flavor_text_entries": entries, "varieties": varieties[ident]}
+
+
+def flavor_text_index():
+    global _index, _index_version
+    if not settings.POKEDEX_LOCAL_DB:
+        return cached_index()
+    try:
+        state = Species.objects.aggregate(count=Count("id"), latest=Max("synced_at"))
+    except DatabaseError:
+        return cached_index()
+    if not state["count"]:
+        return cached_index()
+    version = (state["count"], state["latest"])
+    with _lock:
+        if _index_version != version:
+            _index = FlavorTextIndex(species_documents())
+            _index_version = version
+        return _index
@@ -0,0 +1,88 @@
+"""
+Copying PokeAPI documents into the local Pokédex tables.
+
+fetch_bundle() gathers everything one Pokémon needs (its pokemon, species,
+evolution chain and type documents) and is safe to run on worker threads;
+store_bundle() writes a bundle in a single transaction, so an interrupted sync
+never leaves a half-stored Pokémon behind.
+"""
+from django.db import transaction
+from .models import STAT_FIELDS, Ability, EvolutionChain, Pokemon, PokemonAbility, PokemonType, Species, Type
+from .src.components.learnsets import compact_moves
+from .src.components.rate_limit import BACKGROUND, priority
+from .src.components.upstream import fetch_json
+
+
+def fetch_bundle(name, known_types=frozenset()):
+    """Fetch the documents for one Pokémon; types in `known_types` are not re-fetched."""
+    with priority(BACKGROUND):
+        pokemon = fetch_json(f"pokemon/{name}")
+        species = fetch_json(pokemon["species"]["url"])
+        chain_ref = species.get("evolution_chain")
+        chain = fetch_json(chain_ref["url"]) if chain_ref else None
+        types = [fetch_json(f"type/{t['type']['name']}") for t in pokemon["types"]
+                 if t["type"]["name"] not in known_types]
+    return {"pokemon": pokemon, "species": species, "chain": chain, "types": types}
+
+
+def store_type(data):
+    Type.objects.update_or_create(
+        id=data["id"], defaults={"name": data["name"], "damage_relations": data["damage_relations"]}
+    )
+
+
+def store_chain(data):
+    chain, _ = EvolutionChain.objects.update_or_create(id=data["id"], defaults={"chain": data["chain"]})
+    return chain
+
+
+def store_species(data, chain=None):
+    species, _ = Species.objects.update_or_create(id=data["id"], defaults={
+        "name": data["name"],
+        "generation": (data.get("generation") or {}).get("name", ""),
+        "is_legendary": bool(data.get("is_legendary")),
+        "is_mythical": bool(data.get("is_mythical")),
+        "evolves_from": (data.get("evolves_from_species") or {}).get("name", ""),
+        "evolution_chain": chain,
+        "flavor_text_entries": data.get("flavor_text_entries", []),
+    })
+    return species
+
+
+def store_pokemon(data, species=None):
+    stats = {stat["stat"]["name"]: stat["base_stat"] for stat in data["stats"]}
+    pokemon, _ = Pokemon.objects.update_or_create(id=data["id"], defaults={
+        "name": data["name"],
+        "species": species,
+        "national_id": species.id if species else None,
+        "height": data.get("height"),
+        "weight": data.get("weight"),
+        "sprite": (data.get("sprites") or {}).get("front_default") or "",
+        "moves": compact_moves(data.get("moves", [])),
+        **{field: stats.get(stat, 0) for stat, field in STAT_FIELDS.items()},
+    })
+
+    types = {t.name: t for t in Type.objects.filter(name__in=[t["type"]["name"] for t in data["types"]])}
+    pokemon.type_slots.all().delete()
+    PokemonType.objects.bulk_create([
+        PokemonType(pokemon=pokemon, type=types[t["type"]["name"]], slot=t.get("slot") or i + 1)
+        for i, t in enumerate(data["types"])
+    ])
+
+    pokemon.ability_slots.all().delete()
+    slots = []
+    for i, entry in enumerate(data["abilities"]):
+        ability, _ = Ability.objects.get_or_create(name=entry["ability"]["name"])
+        slots.append(PokemonAbility(pokemon=pokemon, ability=ability, slot=entry.get("slot") or i + 1,
+                                    is_hidden=bool(entry.get("is_hidden"))))
+    PokemonAbility.objects.bulk_create(slots)
+    return pokemon
+
+
+def store_bundle(bundle):
+    with transaction.atomic():
+        for data in bundle["types"]:
+            store_type(data)
+        chain = store_chain(bundle["chain"]) if bundle["chain"] else None
+        species = store_species(bundle["species"], chain)
+        return store_pokemon(bundle["pokemon"], species)
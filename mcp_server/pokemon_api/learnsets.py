@@ -0,0 +1,36 @@
+"""
+Learnset index (components/learnsets.py) over the synced Pokédex tables.
+
+Like the search index, it is rebuilt when the tables change and falls back to
+the cached PokeAPI documents until anything is synced. Rows synced before the
+tables kept learn details list their moves without version groups or methods;
+`manage.py sync_pokedex --refresh` fills them in.
+"""
+import threading
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from .models import Pokemon
+from .src.components.learnsets import LearnsetIndex, cached_index
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def learnset_index():
+    global _index, _index_version
+    if not settings.POKEDEX_LOCAL_DB:
+        return cached_index()
+    try:
+        state = Pokemon.objects.aggregate(count=Count("id"), latest=Max("synced_at"))
+    except DatabaseError:
+        return cached_index()
+    if not state["count"]:
+        return cached_index()
+    version = (state["count"], state["latest"])
+    with _lock:
+        if _index_version != version:
+            _index = LearnsetIndex(Pokemon.objects.values_list("id", "name", "moves").iterator())
+            _index_version = version
+        return _index
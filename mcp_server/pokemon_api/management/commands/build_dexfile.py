@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...dexfile import documents
+from ...src.components import dexfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the compact Pokédex file that Pokémon, counter and comparison lookups read through "
+        "a shared read-only memory map, from the synced tables (or the cache before any sync)."
+    )
+
+    def add_arguments(self, parser):
+        dexfile.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        if not dexfile.run(options, documents(), self.stdout.write):
+            raise CommandError("Nowhere to write the Pokédex file.")
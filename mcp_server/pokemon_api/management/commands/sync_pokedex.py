@@ -0,0 +1,75 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ...dexfile import database_documents
+from ...ingest import fetch_bundle, store_bundle
+from ...models import Pokemon, Type
+from ...src.components import dexfile
+from ...src.components.resources import dex_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy Pokémon, species, types, abilities and evolution chains from PokeAPI into the local "
+        "Pokédex tables. Each Pokémon is committed as soon as it is fetched and already stored ones "
+        "are skipped, so an interrupted sync resumes where it stopped and later runs only fetch "
+        "what is new (or stale, with --older-than). The Pokédex file is rewritten afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Pokémon to sync (default: the whole national dex)")
+        parser.add_argument("--workers", type=int, default=8, help="concurrent upstream fetches (default: 8)")
+        parser.add_argument("--limit", type=int, help="only sync the first N Pokémon of the dex")
+        parser.add_argument("--older-than", type=float, metavar="HOURS",
+                            help="also re-fetch Pokémon synced more than HOURS ago")
+        parser.add_argument("--refresh", action="store_true", help="re-fetch every Pokémon, even if already stored")
+
+    def handle(self, *args, **options):
+        names = [name.lower() for name in options["names"]] or dex_names()
+        if options["limit"] is not None:
+            names = names[:options["limit"]]
+        pending = self.pending(names, options["refresh"], options["older_than"])
+        total = len(pending)
+        self.stdout.write(f"{len(names) - total} of {len(names)} Pokémon up to date, syncing {total}")
+        if not total:
+            return
+
+        known_types = frozenset() if options["refresh"] else frozenset(Type.objects.values_list("name", flat=True))
+        every = 1 if options["verbosity"] > 1 else max(1, total // 20)
+        stored, failed = 0, []
+        # Workers only fetch; rows are written from this thread, one transaction per Pokémon.
+        executor = ThreadPoolExecutor(max_workers=max(1, options["workers"]))
+        futures = {executor.submit(fetch_bundle, name, known_types): name for name in pending}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    store_bundle(future.result())
+                    stored += 1
+                except Exception as e:
+                    failed.append(name)
+                    self.stderr.write(f"{name}: {e}")
+                if done % every == 0 or done == total:
+                    self.stdout.write(f"[{done}/{total}] {name}")
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise CommandError(f"Interrupted after storing {stored} Pokémon; run the command again to resume.")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} Pokémon, {len(failed)} failed"))
+        if stored and dexfile.path():
+            dexfile.run({}, database_documents(), self.stdout.write)
+        if failed:
+            raise CommandError(f"Failed: {', '.join(sorted(failed))}. Run the command again to retry them.")
+
+    def pending(self, names, refresh, older_than):
+        if refresh:
+            return list(names)
+        fresh = Pokemon.objects.filter(name__in=names)
+        if older_than is not None:
+            fresh = fresh.filter(synced_at__gte=timezone.now() - datetime.timedelta(hours=older_than))
+        fresh = set(fresh.values_list("name", flat=True))
+        return [name for name in names if name not in fresh]
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ...src.components import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Prefetch PokeAPI documents into the cache shared with the MCP server: every type, the "
+        "Pokémon most requested in the access log, whole generations (--generations) and any "
+        "names given. Fresh documents are skipped, so an interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        warmup.add_arguments(parser, default_access_log=settings.API_LOG_FILE)
+
+    def handle(self, *args, **options):
+        try:
+            failed = warmup.run(options, self.stdout.write, self.stderr.write)
+        except KeyboardInterrupt:
+            raise CommandError("Interrupted; run the command again to resume.")
+        if failed:
+            names = ", ".join(f"{kind} {name}" for kind, name in failed)
+            raise CommandError(f"Failed: {names}. Run the command again to retry them.")
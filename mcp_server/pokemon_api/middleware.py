@@ -1,5 +1,18 @@
+import gzip
+import hashlib
 import logging
+import random
 import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from .src.components import upstream, profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 logger = logging.getLogger("api_logger")
 
@@ -11,31 +24,334 @@ def get_client_ip(request):
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
-def safe_get_body(request):
-    try:
-        return request.body.decode('utf-8', 'ignore')
-    except Exception:
-        return '[unavailable after read]'
+class PayloadTap:
+    """
+    Stands in for a request's input stream and keeps the first `limit` bytes
+    the view reads, so a logged request's payload needs no extra read and an
+    unlogged one costs no more than the view's own read.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.head = b""
+        self.size = 0
+
+    def _seen(self, data):
+        if len(self.head) < self.limit:
+            self.head += data[:self.limit - len(self.head)]
+        self.size += len(data)
+        return data
+
+    def read(self, *args, **kwargs):
+        return self._seen(self.stream.read(*args, **kwargs))
+
+    def readline(self, *args, **kwargs):
+        return self._seen(self.stream.readline(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def tap_body(request, limit):
+    """Wraps the request's input stream in a PayloadTap; None when it has no stream to wrap."""
+    stream = getattr(request, "_stream", None)
+    if stream is None or getattr(request, "_read_started", False):
+        return None
+    request._stream = PayloadTap(stream, limit)
+    return request._stream
+
+def logged_payload(request, tap, limit):
+    """(payload, size in bytes, truncated) for a request that is being logged."""
+    body = getattr(request, "_body", None)
+    if body is None and not getattr(request, "_read_started", True):
+        try:
+            body = request.body  # the view never read it, so reading it now is the only read
+        except Exception:
+            body = None
+    if body is not None:
+        return body[:limit].decode('utf-8', 'replace'), len(body), len(body) > limit
+    if tap is None:
+        return "[unavailable after read]", None, False
+    return tap.head.decode('utf-8', 'replace'), tap.size, tap.size > limit
+
+class SyncAndAsyncMiddleware:
+    """
+    Base for middleware that must not force async views back onto a thread
+    under ASGI: __call__ dispatches to __acall__ when the chain is async.
+    """
+
+    sync_capable = True
+    async_capable = True
 
-class APILoggingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        start_time = time.time()
-        response = None
-        client_ip = get_client_ip(request)
-        payload = safe_get_body(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    async def __acall__(self, request):
+        return await self.ahandle(request)
+
+class ResponseMiddleware(SyncAndAsyncMiddleware):
+    """Base for middleware that only post-processes the response; subclasses define process(request, response)."""
+
+    def handle(self, request):
+        return self.process(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.process(request, await self.get_response(request))
+
+class APILoggingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Structured, sampled request logging. Errors (status >= 400 or an exception)
+    and requests slower than API_LOG_SLOW_SECONDS are always logged; other
+    requests with probability API_LOG_SAMPLE_RATE. The body is never read for
+    logging's sake: a PayloadTap keeps the prefix the view reads, and a body
+    the view left unread is read only when the request is logged. The record
+    is only built for requests that get logged, and handing it to the queue
+    handler is the only logging work done on the request path.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, "API_LOG_SAMPLE_RATE", 1.0)
+        self.slow_seconds = getattr(settings, "API_LOG_SLOW_SECONDS", 1.0)
+        self.max_payload = getattr(settings, "API_LOG_MAX_PAYLOAD", 512)
+
+    def handle(self, request):
+        start_time = time.perf_counter()
+        tap = tap_body(request, self.max_payload)
         try:
             response = self.get_response(request)
-            duration = time.time() - start_time
-            logger.info(
-                f"[API] {request.method} {request.path} | Status: {getattr(response, 'status_code', 'N/A')} | Time: {duration:.3f}s | IP: {client_ip} | Payload: {payload}"
-            )
-            return response
         except Exception as e:
-            duration = time.time() - start_time
-            logger.error(
-                f"[API ERROR] {request.method} {request.path} | Exception: {str(e)} | Time: {duration:.3f}s | IP: {client_ip} | Payload: {payload}"
-            )
-            raise 
\ No newline at end of file
+            self.log(request, None, start_time, tap, e)
+            raise
+        self.log(request, response, start_time, tap)
+        return response
+
+    async def ahandle(self, request):
+        start_time = time.perf_counter()
+        tap = tap_body(request, self.max_payload)
+        try:
+            response = await self.get_response(request)
+        except Exception as e:
+            self.log(request, None, start_time, tap, e)
+            raise
+        self.log(request, response, start_time, tap)
+        return response
+
+    def log(self, request, response, start_time, tap, exc=None):
+        duration = time.perf_counter() - start_time
+        status = getattr(response, 'status_code', None)
+        if exc is not None or status >= 500:
+            level, reason = logging.ERROR, "error"
+        elif status >= 400:
+            level, reason = logging.WARNING, "error"
+        elif duration >= self.slow_seconds:
+            level, reason = logging.WARNING, "slow"
+        elif self.sample_rate >= 1 or random.random() < self.sample_rate:
+            level, reason = logging.INFO, "sampled"
+        else:
+            return
+        if not logger.isEnabledFor(level):
+            return
+
+        payload, size, truncated = logged_payload(request, tap, self.max_payload)
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "client_ip": get_client_ip(request),
+            "reason": reason,
+            "payload": payload,
+            "payload_bytes": size,
+            "payload_truncated": truncated,
+        }
+        if reason == "sampled" and self.sample_rate < 1:
+            fields["sample_rate"] = self.sample_rate
+        if exc is not None:
+            fields["exception"] = f"{type(exc).__name__}: {exc}"
+        if response is not None and response.has_header("X-Profile-Id"):
+            fields["profile_id"] = response["X-Profile-Id"]
+        logger.log(level, "[API] %s %s | Status: %s | Time: %.3fs", request.method, request.path,
+                   status if status is not None else "N/A", duration, extra={"api": fields})
+
+class UpstreamDeadlineMiddleware(SyncAndAsyncMiddleware):
+    """Bounds all PokeAPI calls made while handling a request by POKE_REQUEST_DEADLINE seconds."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.seconds = getattr(settings, "POKE_REQUEST_DEADLINE", None)
+
+    def handle(self, request):
+        with upstream.deadline(self.seconds):
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        with upstream.deadline(self.seconds):
+            return await self.get_response(request)
+
+class ProfilingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Profiles a request when it carries an `X-Poke-Profile: 1` header or a
+    `?profile=1` query parameter, or when it is sampled
+    (POKE_PROFILE_SAMPLE_RATE). The profile ID is returned in `X-Profile-Id`.
+    """
+
+    FLAG_VALUES = ("1", "true", "yes")
+
+    def requested(self, request):
+        flag = request.headers.get("X-Poke-Profile") or request.GET.get("profile") or ""
+        return flag.lower() in self.FLAG_VALUES
+
+    def handle(self, request):
+        with profiling.profile(f"{request.method} {request.path}", requested=self.requested(request)) as record:
+            response = self.get_response(request)
+        if record is not None:
+            response["X-Profile-Id"] = record.id
+        return response
+
+    async def ahandle(self, request):
+        with profiling.profile(f"{request.method} {request.path}", requested=self.requested(request)) as record:
+            response = await self.get_response(request)
+        if record is not None:
+            response["X-Profile-Id"] = record.id
+        return response
+
+class ServerTimingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Adds a `Server-Timing` header splitting the request's time into upstream
+    fetches per resource kind, cache lookups, local Pokédex queries, rate-limit
+    waits, Gemini calls and the remaining local computation.
+    """
+
+    def handle(self, request):
+        with profiling.timing() as timing:
+            response = self.get_response(request)
+        response["Server-Timing"] = timing.header()
+        return response
+
+    async def ahandle(self, request):
+        with profiling.timing() as timing:
+            response = await self.get_response(request)
+        response["Server-Timing"] = timing.header()
+        return response
+
+# Content-Encoding -> compress function, in server preference order for equal q-values.
+ENCODERS = {}
+if brotli is not None:
+    # Quality 4 is brotli's sweet spot for on-the-fly compression; 11 is for static assets.
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=4)
+ENCODERS["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+def parse_accept_encoding(header):
+    """Accept-Encoding header -> {coding: q}."""
+    codings = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+def negotiate_encoding(header, available=None):
+    """The available coding the client prefers (q > 0), or None for identity."""
+    codings = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available if available is not None else ENCODERS:
+        q = codings.get(coding, codings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class CompressionMiddleware(ResponseMiddleware):
+    """
+    Compresses JSON and text responses of at least API_COMPRESS_MIN_BYTES with
+    the client's preferred Accept-Encoding: brotli (when the `brotli` package
+    is installed) or gzip. A strong ETag gets the coding appended, since the
+    compressed bytes are a different representation. Streaming responses are
+    left alone so NDJSON lines still reach the client as they are produced.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, "API_COMPRESS_MIN_BYTES", 1024)
+
+    def process(self, request, response):
+        content_type = response.get("Content-Type", "")
+        if (response.streaming or response.has_header("Content-Encoding")
+                or not content_type.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < self.min_bytes:
+            return response
+        coding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        if coding is None:
+            return response
+        compressed = ENCODERS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        etag = response.get("ETag")
+        if etag and not etag.startswith("W/"):
+            response["ETag"] = f'{etag[:-1]}-{coding}"'
+        return response
+
+def matching_etag(etag, header):
+    """
+    Weak If-None-Match comparison against a strong ETag, also accepting the
+    -<coding> variants CompressionMiddleware derives from it. Returns the
+    matched tag (the representation the client holds) or None.
+    """
+    opaque = etag.strip('"')
+    for candidate in (header or "").split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        candidate = candidate.removeprefix("W/").strip('"')
+        if candidate == opaque or any(candidate == f"{opaque}-{coding}" for coding in ENCODERS):
+            return f'"{candidate}"'
+    return None
+
+class ETagMiddleware(ResponseMiddleware):
+    """
+    Gives successful GET/HEAD responses a strong ETag (a hash of the body) and
+    answers 304 Not Modified when the request's If-None-Match already has it.
+    """
+
+    NOT_MODIFIED_HEADERS = ("Cache-Control", "Content-Location", "Expires", "Vary")
+
+    def process(self, request, response):
+        if (request.method not in ("GET", "HEAD") or response.status_code != 200
+                or response.streaming or response.has_header("Content-Encoding")):
+            return response
+        if not response.has_header("ETag"):
+            response["ETag"] = f'"{hashlib.blake2b(response.content, digest_size=16).hexdigest()}"'
+        matched = matching_etag(response["ETag"], request.headers.get("If-None-Match"))
+        if matched is None:
+            return response
+        not_modified = HttpResponseNotModified()
+        not_modified["ETag"] = matched
+        for name in self.NOT_MODIFIED_HEADERS:
+            if response.has_header(name):
+                not_modified[name] = response[name]
+        not_modified.cookies = response.cookies
+        return not_modified
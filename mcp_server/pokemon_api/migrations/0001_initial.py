@@ -0,0 +1,146 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'abilities',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EvolutionChain',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('chain', models.JSONField()),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Pokemon',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('national_id', models.PositiveIntegerField(db_index=True, null=True)),
+                ('height', models.PositiveIntegerField(null=True)),
+                ('weight', models.PositiveIntegerField(null=True)),
+                ('sprite', models.URLField(blank=True, max_length=255)),
+                ('moves', models.JSONField(default=list)),
+                ('hp', models.PositiveSmallIntegerField(db_index=True)),
+                ('attack', models.PositiveSmallIntegerField(db_index=True)),
+                ('defense', models.PositiveSmallIntegerField(db_index=True)),
+                ('special_attack', models.PositiveSmallIntegerField(db_index=True)),
+                ('special_defense', models.PositiveSmallIntegerField(db_index=True)),
+                ('speed', models.PositiveSmallIntegerField(db_index=True)),
+                ('synced_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'pokemon',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Type',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=32, unique=True)),
+                ('damage_relations', models.JSONField(default=dict)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PokemonAbility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('ability', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pokemon_slots', to='pokemon_api.ability')),
+                ('pokemon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ability_slots', to='pokemon_api.pokemon')),
+            ],
+            options={
+                'ordering': ['pokemon', 'slot'],
+            },
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='abilities',
+            field=models.ManyToManyField(related_name='pokemon', through='pokemon_api.PokemonAbility', to='pokemon_api.ability'),
+        ),
+        migrations.CreateModel(
+            name='Species',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('generation', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('is_legendary', models.BooleanField(default=False)),
+                ('is_mythical', models.BooleanField(default=False)),
+                ('evolves_from', models.CharField(blank=True, max_length=64)),
+                ('flavor_text_entries', models.JSONField(default=list)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('evolution_chain', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='species', to='pokemon_api.evolutionchain')),
+            ],
+            options={
+                'verbose_name_plural': 'species',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='species',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='varieties', to='pokemon_api.species'),
+        ),
+        migrations.CreateModel(
+            name='PokemonType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('pokemon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='type_slots', to='pokemon_api.pokemon')),
+                ('type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pokemon_slots', to='pokemon_api.type')),
+            ],
+            options={
+                'ordering': ['pokemon', 'slot'],
+            },
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='types',
+            field=models.ManyToManyField(related_name='pokemon', through='pokemon_api.PokemonType', to='pokemon_api.type'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemonability',
+            index=models.Index(fields=['ability', 'pokemon'], name='pokemonability_ability_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pokemonability',
+            constraint=models.UniqueConstraint(fields=('pokemon', 'slot'), name='unique_pokemon_ability_slot'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemontype',
+            index=models.Index(fields=['type', 'pokemon'], name='pokemontype_type_pokemon_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pokemontype',
+            constraint=models.UniqueConstraint(fields=('pokemon', 'slot'), name='unique_pokemon_type_slot'),
+        ),
+    ]
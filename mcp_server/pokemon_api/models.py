@@ -1,3 +1,125 @@
 from django.db import models
 
-# Create your models here.
+STAT_FIELDS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
+
+
+class Type(models.Model):
+    id = models.PositiveIntegerField(primary_key=True)
+    name = models.CharField(max_length=32, unique=True)
+    # PokeAPI's damage_relations object: relation -> list of {"name", "url"}
+    damage_relations = models.JSONField(default=dict)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return self.name
+
+
+class Ability(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "abilities"
+
+    def __str__(self):
+        return self.name
+
+
+class EvolutionChain(models.Model):
+    id = models.PositiveIntegerField(primary_key=True)
+    # PokeAPI's nested chain link: {"species", "evolution_details", "evolves_to": [...]}
+    chain = models.JSONField()
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+
+
+class Species(models.Model):
+    # The species ID is the national Pokédex number.
+    id = models.PositiveIntegerField(primary_key=True)
+    name = models.CharField(max_length=64, unique=True)
+    generation = models.CharField(max_length=32, db_index=True, blank=True)
+    is_legendary = models.BooleanField(default=False)
+    is_mythical = models.BooleanField(default=False)
+    evolves_from = models.CharField(max_length=64, blank=True)
+    evolution_chain = models.ForeignKey(
+        EvolutionChain, null=True, blank=True, on_delete=models.SET_NULL, related_name="species"
+    )
+    flavor_text_entries = models.JSONField(default=list)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "species"
+
+    def __str__(self):
+        return self.name
+
+
+class Pokemon(models.Model):
+    # PokeAPI's pokemon ID; alternate forms get IDs above 10000.
+    id = models.PositiveIntegerField(primary_key=True)
+    name = models.CharField(max_length=64, unique=True)
+    species = models.ForeignKey(Species, null=True, blank=True, on_delete=models.SET_NULL, related_name="varieties")
+    national_id = models.PositiveIntegerField(null=True, db_index=True)
+    height = models.PositiveIntegerField(null=True)
+    weight = models.PositiveIntegerField(null=True)
+    sprite = models.URLField(max_length=255, blank=True)
+    # Move names in PokeAPI order.
+    moves = models.JSONField(default=list)  # learnsets.compact_moves() form
+    types = models.ManyToManyField(Type, through="PokemonType", related_name="pokemon")
+    abilities = models.ManyToManyField(Ability, through="PokemonAbility", related_name="pokemon")
+
+    hp = models.PositiveSmallIntegerField(db_index=True)
+    attack = models.PositiveSmallIntegerField(db_index=True)
+    defense = models.PositiveSmallIntegerField(db_index=True)
+    special_attack = models.PositiveSmallIntegerField(db_index=True)
+    special_defense = models.PositiveSmallIntegerField(db_index=True)
+    speed = models.PositiveSmallIntegerField(db_index=True)
+
+    synced_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "pokemon"
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def base_stats(self):
+        return {stat: getattr(self, field) for stat, field in STAT_FIELDS.items()}
+
+
+class PokemonType(models.Model):
+    pokemon = models.ForeignKey(Pokemon, on_delete=models.CASCADE, related_name="type_slots")
+    type = models.ForeignKey(Type, on_delete=models.CASCADE, related_name="pokemon_slots")
+    slot = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["pokemon", "slot"]
+        constraints = [models.UniqueConstraint(fields=["pokemon", "slot"], name="unique_pokemon_type_slot")]
+        indexes = [models.Index(fields=["type", "pokemon"], name="pokemontype_type_pokemon_idx")]
+
+
+class PokemonAbility(models.Model):
+    pokemon = models.ForeignKey(Pokemon, on_delete=models.CASCADE, related_name="ability_slots")
+    ability = models.ForeignKey(Ability, on_delete=models.CASCADE, related_name="pokemon_slots")
+    slot = models.PositiveSmallIntegerField()
+    is_hidden = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["pokemon", "slot"]
+        constraints = [models.UniqueConstraint(fields=["pokemon", "slot"], name="unique_pokemon_ability_slot")]
+        indexes = [models.Index(fields=["ability", "pokemon"], name="pokemonability_ability_idx")]
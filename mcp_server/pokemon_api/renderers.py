@@ -0,0 +1,46 @@
+"""
+JSON encoding for API responses.
+
+orjson encodes the agent payloads (nested dicts, lists and numbers) several
+times faster than the stdlib encoder behind DRF's JSONRenderer and emits
+compact UTF-8 directly. Without orjson installed, the stdlib encoder is used
+with the same compact output.
+"""
+import json
+from django.http import HttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        # DRF's encoder covers the types orjson does not (Decimal, lazy strings, querysets, ...).
+        return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse counterpart for views outside DRF (the async endpoints)."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
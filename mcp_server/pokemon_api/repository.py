@@ -0,0 +1,133 @@
+"""
+Repository backed by the local Pokédex tables.
+
+Rows are turned back into PokeAPI-shaped documents so the components consume
+them unchanged. Lookups are single indexed queries (name or ID, and the
+type -> pokemon index for type documents); anything not synced yet, or a
+database without the tables, falls back to PokeAPI.
+"""
+import logging
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+from .models import EvolutionChain, Pokemon, PokemonType, Species, Type
+from .src.components import profiling
+from .src.components.learnsets import expand_moves
+from .src.components.repository import UpstreamRepository
+from .src.components.upstream import resource_key, resource_url
+
+logger = logging.getLogger(__name__)
+
+
+def _ref(kind, name, ident):
+    return {"name": name, "url": resource_url(f"{kind}/{ident}/")}
+
+
+def _lookup(queryset, ident):
+    ident = str(ident).lower()
+    return queryset.filter(id=int(ident)).first() if ident.isdigit() else queryset.filter(name=ident).first()
+
+
+def pokemon_rows():
+    return Pokemon.objects.select_related("species").prefetch_related("type_slots__type", "ability_slots__ability")
+
+
+def pokemon_document(name):
+    row = _lookup(pokemon_rows(), name)
+    return None if row is None else row_document(row)
+
+
+def row_document(row):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "height": row.height,
+        "weight": row.weight,
+        "species": _ref("pokemon-species", row.species.name, row.species.id) if row.species else None,
+        "types": [{"slot": s.slot, "type": _ref("type", s.type.name, s.type.id)} for s in row.type_slots.all()],
+        "abilities": [{"slot": s.slot, "is_hidden": s.is_hidden, "ability": {"name": s.ability.name}}
+                      for s in row.ability_slots.all()],
+        "stats": [{"base_stat": value, "stat": {"name": stat}} for stat, value in row.base_stats.items()],
+        "sprites": {"front_default": row.sprite or None},
+        "moves": expand_moves(row.moves),
+    }
+
+
+def species_document(name):
+    row = _lookup(Species.objects.all(), name)
+    # A species is only usable once its evolution chain is stored alongside it.
+    if row is None or row.evolution_chain_id is None:
+        return None
+    return {
+        "id": row.id,
+        "name": row.name,
+        "generation": {"name": row.generation} if row.generation else None,
+        "is_legendary": row.is_legendary,
+        "is_mythical": row.is_mythical,
+        "evolves_from_species": {"name": row.evolves_from} if row.evolves_from else None,
+        "evolution_chain": {"url": resource_url(f"evolution-chain/{row.evolution_chain_id}/")},
+        "flavor_text_entries": row.flavor_text_entries,
+    }
+
+
+def type_document(name):
+    row = _lookup(Type.objects.all(), name)
+    if row is None:
+        return None
+    members = PokemonType.objects.filter(type=row).order_by("pokemon_id").values_list("slot", "pokemon_id", "pokemon__name")
+    return {
+        "id": row.id,
+        "name": row.name,
+        "damage_relations": row.damage_relations,
+        "pokemon": [{"slot": slot, "pokemon": _ref("pokemon", member, ident)} for slot, ident, member in members],
+    }
+
+
+def evolution_chain_document(url):
+    ident = resource_key(url).rsplit("/", 1)[-1]
+    if not ident.isdigit():
+        return None
+    row = EvolutionChain.objects.filter(id=int(ident)).first()
+    return None if row is None else {"id": row.id, "chain": row.chain}
+
+
+class DatabaseRepository(UpstreamRepository):
+    """Synced rows first, PokeAPI for the rest."""
+
+    def __init__(self):
+        self._warned = False
+
+    def _local(self, build, ident):
+        try:
+            with profiling.span(profiling.DATABASE, build.__name__):
+                return build(ident)
+        except DatabaseError as e:
+            if not self._warned:
+                self._warned = True
+                logger.warning("Local Pokédex unavailable (%s); serving from PokeAPI. Run `manage.py migrate`.", e)
+            return None
+
+    def pokemon(self, name):
+        return self._local(pokemon_document, name) or super().pokemon(name)
+
+    def species(self, name):
+        return self._local(species_document, name) or super().species(name)
+
+    def type(self, name):
+        return self._local(type_document, name) or super().type(name)
+
+    def evolution_chain(self, url):
+        return self._local(evolution_chain_document, url) or super().evolution_chain(url)
+
+    async def pokemon_async(self, name):
+        return await sync_to_async(self._local)(pokemon_document, name) or await super().pokemon_async(name)
+
+    async def species_async(self, name):
+        return await sync_to_async(self._local)(species_document, name) or await super().species_async(name)
+
+    async def type_async(self, name):
+        return await sync_to_async(self._local)(type_document, name) or await super().type_async(name)
+
+    async def evolution_chain_async(self, url):
+        return (await sync_to_async(self._local)(evolution_chain_document, url)
+                or await super().evolution_chain_async(url))
+
@@ -0,0 +1,57 @@
+"""
+Search index (components/search.py) over the synced Pokédex tables.
+
+Checking whether the tables changed costs one aggregate query per search; a
+rebuild reads them in three queries. Until anything is synced, searches run
+over the PokeAPI documents in the cache instead.
+"""
+import threading
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from .models import Pokemon
+from .src.components.search import (
+    PokedexIndex, cached_index, english_flavor_texts, evolution_position, generation_number, make_record,
+)
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def database_records():
+    rows = Pokemon.objects.select_related("species__evolution_chain").prefetch_related(
+        "type_slots__type", "ability_slots__ability")
+    for row in rows:
+        species = row.species
+        chain = species.evolution_chain if species else None
+        stage, final = evolution_position(chain.chain, species.name) if chain else (None, None)
+        yield make_record(
+            id=row.id,
+            name=row.name,
+            types=[slot.type.name for slot in row.type_slots.all()],
+            abilities=[slot.ability.name for slot in row.ability_slots.all()],
+            stats=row.base_stats,
+            generation=generation_number(species.generation) if species else None,
+            evolution_stage=stage,
+            fully_evolved=final,
+            flavor_texts=english_flavor_texts(species.flavor_text_entries) if species else (),
+        )
+
+
+def pokedex_index():
+    global _index, _index_version
+    if not settings.POKEDEX_LOCAL_DB:
+        return cached_index()
+    try:
+        state = Pokemon.objects.aggregate(count=Count("id"), latest=Max("synced_at"))
+    except DatabaseError:
+        return cached_index()
+    if not state["count"]:
+        return cached_index()
+    version = (state["count"], state["latest"])
+    with _lock:
+        if _index_version != version:
+            _index = PokedexIndex(database_records())
+            _index_version = version
+        return _index
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Both front-ends (FastMCP server and Django) point at the same directory so a
+# resource fetched by one is served locally to the other. Set POKE_CACHE_DIR to
+# "none" to keep the cache in memory only.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pokeapi-mcp")
+CACHE_DIR = os.getenv("POKE_CACHE_DIR", DEFAULT_CACHE_DIR)
+CACHE_TTL = float(os.getenv("POKE_CACHE_TTL", 7 * 24 * 3600))
+# 404s are remembered (in memory, per process) for this long so unknown names
+# do not reach PokeAPI again; at most NEGATIVE_CACHE_SIZE keys are kept.
+NEGATIVE_TTL = float(os.getenv("POKE_NEGATIVE_TTL", 3600))
+NEGATIVE_CACHE_SIZE = int(os.getenv("POKE_NEGATIVE_CACHE_SIZE", "10000"))
+
+
+class PokeCache:
+    """
+    Two-tier (memory + JSON files on disk) cache of upstream PokeAPI payloads.
+
+    Keys are resource paths relative to the API root, e.g. "pokemon/pikachu" or
+    "evolution-chain/10". Listeners registered with subscribe() are called with
+    (key, refreshed) after every write; refreshed is True when the key already
+    had a value that was replaced.
+
+    Keys PokeAPI answered 404 for are remembered separately, with their own
+    TTL, until a value is stored for them.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, negative_ttl=NEGATIVE_TTL):
+        if directory and str(directory).lower() == "none":
+            directory = None
+        self.directory = directory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = {}
+        self._missing = OrderedDict()  # key -> time.monotonic() it expires at
+        self._missing_hits = 0
+        self._lock = threading.RLock()
+        self._listeners = []
+
+    def _path(self, key):
+        return os.path.join(self.directory, *[quote(part, safe="") for part in key.split("/")]) + ".json"
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None or not self.directory:
+            return entry
+        try:
+            with open(self._path(key), encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        entry = (stored["stored_at"], stored["data"])
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def entry(self, key):
+        """Return (stored_at, data) for a key regardless of age, or None."""
+        return self._load(key)
+
+    def is_fresh(self, stored_at):
+        return self.ttl <= 0 or time.time() - stored_at < self.ttl
+
+    def get(self, key, allow_stale=False):
+        entry = self._load(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if allow_stale or self.is_fresh(stored_at):
+            return data
+        return None
+
+    def set(self, key, data):
+        stored_at = time.time()
+        refreshed = self._load(key) is not None
+        with self._lock:
+            self._memory[key] = (stored_at, data)
+            self._missing.pop(key, None)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"stored_at": stored_at, "data": data}, fh, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        for listener in list(self._listeners):
+            listener(key, refreshed)
+
+    def remember_missing(self, key):
+        """Record that PokeAPI has no resource at key."""
+        if self.negative_ttl <= 0:
+            return
+        with self._lock:
+            self._missing[key] = time.monotonic() + self.negative_ttl
+            self._missing.move_to_end(key)
+            while len(self._missing) > NEGATIVE_CACHE_SIZE:
+                self._missing.popitem(last=False)
+
+    def is_missing(self, key):
+        """True while a 404 for key is remembered."""
+        with self._lock:
+            expires = self._missing.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._missing[key]
+                return False
+            self._missing_hits += 1
+            return True
+
+    def negative_snapshot(self):
+        with self._lock:
+            return {"entries": len(self._missing), "hits": self._missing_hits, "ttl": self.negative_ttl}
+
+    def keys(self, prefix=""):
+        """All cached keys (memory and disk) starting with prefix, sorted."""
+        with self._lock:
+            found = {k for k in self._memory if k.startswith(prefix)}
+        if self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                rel = os.path.relpath(root, self.directory)
+                parts = [] if rel == "." else [unquote(p) for p in rel.split(os.sep)]
+                for filename in files:
+                    if filename.endswith(".json"):
+                        key = "/".join(parts + [unquote(filename[:-5])])
+                        if key.startswith(prefix):
+                            found.add(key)
+        return sorted(found)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+
+cache = PokeCache()
@@ -0,0 +1,375 @@
+"""
+Compact binary Pokédex file, memory-mapped read-only.
+
+Every process that serves Pokémon (each FastMCP stdio server, each Django
+worker) can answer name, type, ability, stat and type-chart lookups straight
+from one file: opening it reads a 48-byte header, and the pages behind it are
+shared through the OS page cache instead of being parsed into per-process JSON.
+`Pokemon`, `recommend_counters` and `PokemonComparer` consult it before the
+repository and fall back to the repository for anything it does not hold.
+
+Layout (little-endian):
+
+    header    magic, version, counts and section offsets (HEADER)
+    records   fixed-width, one per Pokémon in ID order (RECORD): ID, name,
+              sprite, species, type pair, three abilities, first five moves,
+              six base stats, height, weight
+    hash      open-addressed table of record index + 1 keyed by FNV-1a of
+              the name; 0 is empty
+    types     one entry per type (TYPE): name, whether its damage relations
+              are known, and a slice of the members array
+    chart     type_count x type_count bytes: the multiplier a defending type
+              (row) takes from an attacking type (column), as CHART_CODES
+    members   u32 string references, the Pokémon of each type in the order
+              PokeAPI lists them
+    strings   string_count + 1 u32 offsets, then the UTF-8 blob
+
+Type, ability and move names come first in the string table so records can
+refer to them with 16 bits. The file is written to a temporary path and
+renamed into place; readers notice the new file on their next lookup.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from .cache import CACHE_DIR, cache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PKDX"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIIIIIIIII")
+RECORD = struct.Struct("<IIII2H3H5H6HHH")
+TYPE = struct.Struct("<IIIB3x")
+NONE16, NONE32 = 0xFFFF, 0xFFFFFFFF
+STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+# Chart byte -> PokeAPI damage relation the attacking type is listed under (0: unknown or neutral).
+CHART_CODES = {1: "no_damage_from", 2: "half_damage_from", 4: "double_damage_from"}
+RELATION_CODES = {relation: code for code, relation in CHART_CODES.items()}
+
+# POKE_DEXFILE=none (or a memory-only cache without POKE_DEXFILE) disables the file.
+DEXFILE_PATH = os.getenv("POKE_DEXFILE") or (
+    os.path.join(CACHE_DIR, "pokedex.bin") if str(CACHE_DIR).lower() != "none" else None)
+if DEXFILE_PATH and DEXFILE_PATH.lower() == "none":
+    DEXFILE_PATH = None
+# How often a reader checks whether the file was replaced.
+CHECK_INTERVAL = 1.0
+
+DexEntry = namedtuple("DexEntry", "id name types abilities height weight stats sprite moves species")
+
+
+def name_hash(data):
+    """32-bit FNV-1a."""
+    h = 0x811C9DC5
+    for byte in data:
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def _normalize(name):
+    return str(name).strip().lower()
+
+
+class _Strings:
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def add(self, value):
+        if value is None:
+            return None
+        ident = self.ids.get(value)
+        if ident is None:
+            ident = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return ident
+
+
+def _refs(strings, names, width, none):
+    refs = [strings.add(name) for name in names][:width]
+    return [none if ref is None else ref for ref in refs] + [none] * (width - len(refs))
+
+
+def encode(pokemon_docs, type_docs=()):
+    """The file's bytes for PokeAPI pokemon documents and (optionally) type documents."""
+    pokemon_docs = sorted({doc["name"]: doc for doc in pokemon_docs}.values(), key=lambda doc: doc["id"])
+    type_docs = {doc["name"]: doc for doc in type_docs}
+
+    strings = _Strings()
+    # Short vocabularies first: records reference them as u16.
+    type_names = sorted(set(type_docs).union(
+        t["type"]["name"] for doc in pokemon_docs for t in doc.get("types") or ()).union(
+        rel["name"] for doc in type_docs.values() for rels in (doc.get("damage_relations") or {}).values()
+        for rel in rels))
+    for name in type_names:
+        strings.add(name)
+    for doc in pokemon_docs:
+        for ability in doc.get("abilities") or ():
+            strings.add(ability["ability"]["name"])
+        for move in (doc.get("moves") or ())[:5]:
+            strings.add(move["move"]["name"])
+    if len(strings.values) >= NONE16:
+        raise ValueError("Too many type, ability and move names for 16-bit references")
+
+    records = bytearray()
+    for doc in pokemon_docs:
+        stats = {s["stat"]["name"]: s["base_stat"] for s in doc.get("stats") or ()}
+        types = [t["type"]["name"] for t in sorted(doc.get("types") or (), key=lambda t: t.get("slot", 0))]
+        abilities = [a["ability"]["name"] for a in sorted(doc.get("abilities") or (), key=lambda a: a.get("slot", 0))]
+        sprite = (doc.get("sprites") or {}).get("front_default")
+        species = (doc.get("species") or {}).get("name")
+        records += RECORD.pack(
+            doc["id"], strings.add(doc["name"]), NONE32 if sprite is None else strings.add(sprite),
+            NONE32 if species is None else strings.add(species),
+            *_refs(strings, types, 2, NONE16),
+            *_refs(strings, abilities, 3, NONE16),
+            *_refs(strings, [m["move"]["name"] for m in (doc.get("moves") or ())[:5]], 5, NONE16),
+            *[min(stats.get(stat, NONE16), NONE16) for stat in STATS],
+            NONE16 if doc.get("height") is None else doc["height"],
+            NONE16 if doc.get("weight") is None else doc["weight"],
+        )
+
+    slots = 1
+    while slots < 2 * max(len(pokemon_docs), 1):
+        slots *= 2
+    table = [0] * slots
+    for index, doc in enumerate(pokemon_docs):
+        slot = name_hash(doc["name"].encode("utf-8")) & (slots - 1)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = index + 1
+
+    positions = {name: i for i, name in enumerate(type_names)}
+    chart = bytearray(len(type_names) ** 2)
+    types, members = bytearray(), []
+    for row, name in enumerate(type_names):
+        doc = type_docs.get(name)
+        listed = [strings.add(p["pokemon"]["name"]) for p in (doc or {}).get("pokemon") or ()]
+        types += TYPE.pack(strings.ids[name], len(members), len(listed), doc is not None)
+        members += listed
+        for relation, attackers in ((doc or {}).get("damage_relations") or {}).items():
+            code = RELATION_CODES.get(relation)
+            for attacker in attackers if code else ():
+                chart[row * len(type_names) + positions[attacker["name"]]] = code
+
+    blob = [value.encode("utf-8") for value in strings.values]
+    offsets, position = [], 0
+    for value in blob:
+        offsets.append(position)
+        position += len(value)
+    offsets.append(position)
+
+    record_off = HEADER.size
+    hash_off = record_off + len(records)
+    type_off = hash_off + 4 * slots
+    chart_off = type_off + len(types)
+    member_off = chart_off + len(chart)
+    string_off = member_off + 4 * len(members)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(pokemon_docs), slots, len(type_names), len(members),
+                         len(strings.values), record_off, hash_off, type_off, chart_off, string_off)
+    return b"".join([
+        header, bytes(records), struct.pack(f"<{slots}I", *table), bytes(types), bytes(chart),
+        struct.pack(f"<{len(members)}I", *members), struct.pack(f"<{len(offsets)}I", *offsets), *blob,
+    ])
+
+
+def write(path, pokemon_docs, type_docs=()):
+    """Atomically (re)write the file at path; returns the number of Pokémon stored."""
+    data = encode(pokemon_docs, type_docs)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+    if path == _path:
+        set_path(path)  # this process reads the new file on its next lookup
+    return HEADER.unpack_from(data)[3]
+
+
+class DexFile:
+    """A read-only view of a Pokédex file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.count, self._slots, self._type_count, _, string_count, self._record_off,
+         self._hash_off, self._type_off, self._chart_off, string_off) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Pokédex file")
+        self._member_off = self._chart_off + self._type_count ** 2
+        self._offsets_off = string_off
+        self._blob_off = string_off + 4 * (string_count + 1)
+        self._strings = {}
+        self._types = {self.string(TYPE.unpack_from(self._map, self._type_off + i * TYPE.size)[0]): i
+                       for i in range(self._type_count)}
+
+    def __len__(self):
+        return self.count
+
+    def string(self, ref):
+        value = self._strings.get(ref)
+        if value is None:
+            start, end = struct.unpack_from("<II", self._map, self._offsets_off + 4 * ref)
+            value = self._strings[ref] = self._map[self._blob_off + start:self._blob_off + end].decode("utf-8")
+        return value
+
+    def _strings_of(self, refs):
+        return tuple(self.string(ref) for ref in refs if ref != NONE16)
+
+    def index_of(self, name):
+        """Record index of a Pokémon name, or None."""
+        key = _normalize(name).encode("utf-8")
+        mask = self._slots - 1
+        slot = name_hash(key) & mask
+        while True:
+            entry = struct.unpack_from("<I", self._map, self._hash_off + 4 * slot)[0]
+            if not entry:
+                return None
+            name_ref = struct.unpack_from("<I", self._map, self._record_off + (entry - 1) * RECORD.size + 4)[0]
+            start, end = struct.unpack_from("<II", self._map, self._offsets_off + 4 * name_ref)
+            if self._map[self._blob_off + start:self._blob_off + end] == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def entry(self, index):
+        fields = RECORD.unpack_from(self._map, self._record_off + index * RECORD.size)
+        ident, name, sprite, species = fields[:4]
+        stats = fields[14:20]
+        height, weight = fields[20:]
+        return DexEntry(
+            id=ident,
+            name=self.string(name),
+            types=self._strings_of(fields[4:6]),
+            abilities=self._strings_of(fields[6:9]),
+            height=None if height == NONE16 else height,
+            weight=None if weight == NONE16 else weight,
+            stats={stat: value for stat, value in zip(STATS, stats) if value != NONE16},
+            sprite=None if sprite == NONE32 else self.string(sprite),
+            moves=self._strings_of(fields[9:14]),
+            species=None if species == NONE32 else self.string(species),
+        )
+
+    def get(self, name):
+        index = self.index_of(name)
+        return None if index is None else self.entry(index)
+
+    def __iter__(self):
+        return (self.entry(index) for index in range(self.count))
+
+    def type_document(self, name):
+        """
+        A PokeAPI-shaped type document (name, damage_relations, pokemon) when the
+        file holds the type's relations, else None.
+        """
+        row = self._types.get(_normalize(name))
+        if row is None:
+            return None
+        name_ref, start, count, known = TYPE.unpack_from(self._map, self._type_off + row * TYPE.size)
+        if not known:
+            return None
+        relations = {relation: [] for relation in CHART_CODES.values()}
+        codes = self._map[self._chart_off + row * self._type_count:self._chart_off + (row + 1) * self._type_count]
+        for attacker, code in zip(self._types, codes):
+            if code in CHART_CODES:
+                relations[CHART_CODES[code]].append({"name": attacker})
+        members = struct.unpack_from(f"<{count}I", self._map, self._member_off + 4 * start)
+        return {
+            "name": self.string(name_ref),
+            "damage_relations": relations,
+            "pokemon": [{"pokemon": {"name": self.string(ref)}} for ref in members],
+        }
+
+
+def documents_from_cache(source=None):
+    """(pokemon documents, type documents) of everything the cache holds, fresh or stale."""
+    source = source or cache
+    docs = {"pokemon/": [], "type/": []}
+    for prefix, found in docs.items():
+        for key in source.keys(prefix):
+            if "?" in key or "/" in key[len(prefix):]:
+                continue
+            entry = source.entry(key)
+            if entry and entry[1]:
+                found.append(entry[1])
+    return docs["pokemon/"], docs["type/"]
+
+
+_path = DEXFILE_PATH
+_dex = None
+_signature = None
+_checked = float("-inf")
+_lock = threading.Lock()
+
+
+def set_path(path):
+    """Point readers at another file (None disables the file); returns the previous path."""
+    global _path, _dex, _signature, _checked
+    with _lock:
+        previous, _path = _path, path
+        _dex, _signature, _checked = None, None, float("-inf")
+    return previous
+
+
+def path():
+    return _path
+
+
+def current():
+    """The open file, reopened when it was replaced since the last check; None without one."""
+    global _dex, _signature, _checked
+    if not _path:
+        return None
+    now = time.monotonic()
+    if now - _checked < CHECK_INTERVAL:
+        return _dex
+    with _lock:
+        if now - _checked < CHECK_INTERVAL:
+            return _dex
+        _checked = now
+        try:
+            stat = os.stat(_path)
+        except OSError:
+            _dex, _signature = None, None
+            return None
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != _signature:
+            _signature = signature
+            try:
+                # A replaced map is left to readers still holding it and closed when collected.
+                _dex = DexFile(_path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning("Ignoring unreadable Pokédex file %s: %s", _path, e)
+                _dex = None
+        return _dex
+
+
+def lookup(name):
+    """The DexEntry for a Pokémon name, or None when there is no file or it lacks the Pokémon."""
+    dex = current()
+    return None if dex is None else dex.get(name)
+
+
+def type_document(name):
+    dex = current()
+    return None if dex is None else dex.type_document(name)
+
+
+def add_arguments(parser):
+    """Options shared by `manage.py build_dexfile` and `server.py build-dexfile`."""
+    parser.add_argument("--output", default=None, metavar="PATH",
+                        help=f"where to write the file (default: POKE_DEXFILE or {DEXFILE_PATH})")
+
+
+def run(options, documents, write_line):
+    """Write the file from a (pokemon documents, type documents) pair; returns False without a path."""
+    target = options.get("output") or _path
+    if not target:
+        write_line("No Pokédex file path: set POKE_DEXFILE or POKE_CACHE_DIR, or pass --output.")
+        return False
+    pokemon_docs, type_docs = documents
+    count = write(target, pokemon_docs, type_docs)
+    write_line(f"Wrote {count} Pokémon and {len(type_docs)} types to {target} ({os.path.getsize(target)} bytes)")
+    return True
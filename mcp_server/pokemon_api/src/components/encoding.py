@@ -0,0 +1,98 @@
+"""
+Compact columnar encoding for bulk lookup results.
+
+The default bulk format repeats every key for every Pokémon:
+
+    [{"name": "pikachu", "info": {"name": "pikachu", "types": [...], "stats": {"hp": 35, ...}}, "success": True}, ...]
+
+The columnar format stores the keys once and the values as parallel arrays.
+Stats are packed into a row-per-Pokémon table that shares one column header:
+
+    {
+        "format": "columnar",
+        "count": 2,
+        "schema": ["name", "types"],
+        "columns": {"name": ["pikachu", "eevee"], "types": [["electric"], ["normal"]]},
+        "stats": {"columns": ["hp", ..., "speed"], "rows": [[35, ..., 90], [55, ..., 55]]},
+        "errors": [{"index": 1, "name": "eevee", "error": "..."}]
+    }
+
+Failed lookups keep their slot (None in every column and stats row) so indexes
+line up with the request order.
+"""
+
+ROW_FORMAT = "rows"
+COLUMNAR_FORMAT = "columnar"
+RESPONSE_FORMATS = (ROW_FORMAT, COLUMNAR_FORMAT)
+
+
+def parse_format(value):
+    """Validate a requested response format, defaulting to the row format."""
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"'format' must be a string. Valid formats: {', '.join(RESPONSE_FORMATS)}")
+    fmt = (value or ROW_FORMAT).strip().lower()
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format '{value}'. Valid formats: {', '.join(RESPONSE_FORMATS)}")
+    return fmt
+
+
+def encode_columnar(results, fields):
+    """
+    Encode bulk lookup entries (as built by bulk_pokemon_lookup) into the columnar format.
+
+    Args:
+        results: list of {"name", "info", "success"} or {"name", "error", "success"} dicts
+        fields: the projected summary fields, in output order
+    """
+    schema = [f for f in fields if f != "stats"]
+    columns = {f: [] for f in schema}
+    stat_columns = []
+    stat_maps = []
+    errors = []
+
+    for index, entry in enumerate(results):
+        info = entry.get("info") if entry.get("success") else None
+        if info is None:
+            errors.append({"index": index, "name": entry.get("name"), "error": entry.get("error")})
+            info = {}
+        for field in schema:
+            columns[field].append(info.get(field))
+        stats = info.get("stats")
+        if stats is not None:
+            for stat_name in stats:
+                if stat_name not in stat_columns:
+                    stat_columns.append(stat_name)
+        stat_maps.append(stats)
+
+    encoded = {
+        "format": COLUMNAR_FORMAT,
+        "count": len(results),
+        "schema": schema,
+        "columns": columns,
+        "errors": errors,
+    }
+    if "stats" in fields:
+        encoded["stats"] = {
+            "columns": stat_columns,
+            "rows": [
+                [stats.get(c) for c in stat_columns] if stats is not None else None
+                for stats in stat_maps
+            ],
+        }
+    return encoded
+
+
+def decode_columnar(encoded):
+    """Expand a columnar payload back into a list of per-Pokémon summaries (None for failures)."""
+    failed = {e["index"] for e in encoded.get("errors", [])}
+    stats = encoded.get("stats")
+    rows = []
+    for index in range(encoded["count"]):
+        if index in failed:
+            rows.append(None)
+            continue
+        row = {field: encoded["columns"][field][index] for field in encoded["schema"]}
+        if stats is not None:
+            row["stats"] = dict(zip(stats["columns"], stats["rows"][index]))
+        rows.append(row)
+    return rows
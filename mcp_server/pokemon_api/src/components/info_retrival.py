@@ -1,14 +1,54 @@
-import requests
-from dotenv import load_dotenv
-import os
+import asyncio
+import sys
+import threading
+from . import dexfile, evolutions, flavor_text, names
+from .upstream import UpstreamError
+from .repository import get_repository
 
-load_dotenv()
+# Summary fields grouped by the upstream resource that provides them. A field
+# projection only triggers the fetches its fields actually need.
+BASIC_FIELDS = ("name", "id", "types", "abilities", "height", "weight", "stats", "sprite", "moves")
+SPECIES_FIELDS = ("flavor_text",)
+EVOLUTION_FIELDS = ("evolution_chain",)
+SUMMARY_FIELDS = BASIC_FIELDS + SPECIES_FIELDS + EVOLUTION_FIELDS
+
+
+def parse_fields(fields):
+    """
+    Normalize a field projection into a tuple of summary field names.
+
+    Accepts None (all fields), a comma separated string or a list of names.
+    "name" is always included so projected results stay identifiable.
+    """
+    if fields is None:
+        return SUMMARY_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = [f.strip().lower() for f in fields if f and f.strip()]
+    if not requested:
+        return SUMMARY_FIELDS
+    unknown = [f for f in requested if f not in SUMMARY_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Valid fields: {', '.join(SUMMARY_FIELDS)}"
+        )
+    return tuple(f for f in SUMMARY_FIELDS if f == "name" or f in requested)
 
-BASE_URL = os.getenv("POKE_API_URL")
 
 class Pokemon:
-    def __init__(self, name):
-        self.name = name.lower()
+    def __init__(self, name, language=None, version=None, flavor_texts=None, evolution_graph=None):
+        """
+        language, version: which flavor text to report (default: the first entry
+        in POKE_LANGUAGE). flavor_texts, evolution_graph: the FlavorTextIndex and
+        EvolutionGraph to read from, by default the ones over the cache. Flavor
+        text and evolutions are looked up under the Pokémon's species, so forms
+        report their base species'.
+        """
+        self.name = names.resolve(name)
+        self.language = language
+        self.version = version
+        self.flavor_texts = flavor_texts
+        self.evolution_graph = evolution_graph
         self.id = None
         self.moves = []
         self.abilities = []
@@ -21,13 +61,16 @@ class Pokemon:
         self.evolution_chain = []
 
     def fetch_basic_info(self):
-        url = f"{BASE_URL}/pokemon/{self.name}"
-        response = requests.get(url)
+        entry = dexfile.lookup(self.name)
+        if entry is not None:
+            return self._load_entry(entry)
+        try:
+            data = get_repository().pokemon(self.name)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch Pokémon data: {e.status_code}{names.hint(e)}") from e
+        self._load_basic_info(data)
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch Pokémon data: {response.status_code}")
-
-        data = response.json()
+    def _load_basic_info(self, data):
         self.id = data.get("id")
         self.moves = [move["move"]["name"] for move in data["moves"][:5]]  # Limit to 5 for brevity
         self.abilities = [ability["ability"]["name"] for ability in data["abilities"]]
@@ -37,41 +80,97 @@ class Pokemon:
         self.stats = {stat["stat"]["name"]: stat["base_stat"] for stat in data["stats"]}
         self.sprite = data["sprites"]["front_default"]
 
-    def fetch_flavor_text(self):
-        url = f"{BASE_URL}/pokemon-species/{self.name}"
-        response = requests.get(url)
-
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch species data: {response.status_code}")
-
-        data = response.json()
-        flavor_entries = data.get("flavor_text_entries", [])
-        for entry in flavor_entries:
-            if entry["language"]["name"] == "en":
-                self.flavor_text = entry["flavor_text"].replace('\n', ' ').replace('\f', ' ')
-                break
-
-        # Fetch evolution chain URL
-        evolution_url = data["evolution_chain"]["url"]
-        self.fetch_evolution_chain(evolution_url)
-
-    def fetch_evolution_chain(self, url):
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception("Failed to fetch evolution chain")
-
-        chain_data = response.json()["chain"]
-        self.evolution_chain = self._extract_evolutions(chain_data)
-
-    def _extract_evolutions(self, chain):
-        evolutions = []
-        while chain:
-            evolutions.append(chain["species"]["name"])
-            chain = chain["evolves_to"][0] if chain["evolves_to"] else None
-        return evolutions
-
-    def get_summary(self):
-        return {
+    def _load_entry(self, entry):
+        """_load_basic_info() from a Pokédex file entry."""
+        self.id = entry.id
+        self.moves = list(entry.moves)
+        self.abilities = list(entry.abilities)
+        self.types = list(entry.types)
+        self.height = entry.height
+        self.weight = entry.weight
+        self.stats = dict(entry.stats)
+        self.sprite = entry.sprite
+
+    def fetch(self, fields=None):
+        """Fetch only the upstream resources needed for the given field projection."""
+        fields = parse_fields(fields)
+        if any(f in BASIC_FIELDS and f != "name" for f in fields):
+            self.fetch_basic_info()
+        if any(f in SPECIES_FIELDS for f in fields):
+            self._fetch_indexed_flavor_text()
+        if any(f in EVOLUTION_FIELDS for f in fields):
+            self.fetch_evolutions()
+        return self
+
+    async def fetch_async(self, fields=None):
+        """Async twin of fetch(); the pokemon and species resources are requested concurrently."""
+        fields = parse_fields(fields)
+        jobs = []
+        if any(f in BASIC_FIELDS and f != "name" for f in fields):
+            jobs.append(self._fetch_basic_info_async())
+        if any(f in SPECIES_FIELDS for f in fields):
+            jobs.append(self._fetch_indexed_flavor_text_async())
+        if any(f in EVOLUTION_FIELDS for f in fields):
+            jobs.append(self._fetch_evolutions_async())
+        await asyncio.gather(*jobs)
+        return self
+
+    def _index(self):
+        if self.flavor_texts is None:
+            self.flavor_texts = flavor_text.cached_index()
+        return self.flavor_texts
+
+    def _graph(self):
+        if self.evolution_graph is None:
+            self.evolution_graph = evolutions.cached_graph()
+        return self.evolution_graph
+
+    def _fetch_indexed_flavor_text(self):
+        """Flavor text alone, from the index; the species is only fetched when it is not indexed yet."""
+        try:
+            self.flavor_text = flavor_text.lookup(self._index(), self.name, self.language, self.version)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch species data: {e.status_code}") from e
+
+    async def _fetch_indexed_flavor_text_async(self):
+        try:
+            self.flavor_text = await flavor_text.lookup_async(self._index(), self.name, self.language, self.version)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch species data: {e.status_code}") from e
+
+    async def _fetch_basic_info_async(self):
+        entry = dexfile.lookup(self.name)
+        if entry is not None:
+            return self._load_entry(entry)
+        try:
+            data = await get_repository().pokemon_async(self.name)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch Pokémon data: {e.status_code}{names.hint(e)}") from e
+        self._load_basic_info(data)
+
+    async def _fetch_evolutions_async(self):
+        try:
+            species = await evolutions.indexed_async(self._graph(), self.name)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch evolution chain: {e.status_code}") from e
+        self.evolution_chain = self._graph().members(species)
+
+    def fetch_flavor_text(self, include_evolution=True):
+        """The species' flavor text and, with include_evolution, its evolution family."""
+        self._fetch_indexed_flavor_text()
+        if include_evolution:
+            self.fetch_evolutions()
+
+    def fetch_evolutions(self):
+        """Every member of the Pokémon's evolution family, branches included, from the evolution graph."""
+        try:
+            species = evolutions.indexed(self._graph(), self.name)
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch evolution chain: {e.status_code}") from e
+        self.evolution_chain = self._graph().members(species)
+
+    def get_summary(self, fields=None):
+        summary = {
             "name": self.name,
             "id": self.id,
             "types": self.types,
@@ -84,9 +183,151 @@ class Pokemon:
             "evolution_chain": self.evolution_chain,
             "moves": self.moves
         }
+        if fields is None:
+            return summary
+        return {f: summary[f] for f in parse_fields(fields)}
+
     def get_image_url(self):
        return self.sprite
 
+# Distinct type, ability and stat name sequences are a few thousand across the
+# whole dex; the cap only guards against documents that are not real Pokémon.
+MAX_SHARED = 8192
+_shared = {}
+_shared_lock = threading.Lock()
+_set = object.__setattr__
+
+
+def _share(values):
+    """One interned tuple per distinct name sequence: ("fire", "flying") is stored once per process."""
+    values = tuple(values)
+    shared = _shared.get(values)
+    if shared is None:
+        shared = tuple(map(sys.intern, values))
+        with _shared_lock:
+            if len(_shared) < MAX_SHARED:
+                shared = _shared.setdefault(shared, shared)
+    return shared
+
+
+class PokemonRecord:
+    """
+    An immutable, slotted record of a Pokémon's basic fields for whole-dex and
+    bulk workloads. Type, ability and stat name sequences come from small
+    vocabularies and are interned tuples shared between records; move names
+    are interned one by one, since the move lists differ from record to
+    record. Summary dicts are only materialized on request.
+    """
+    __slots__ = ("name", "id", "types", "abilities", "height", "weight", "_stat_names", "_stat_values",
+                 "sprite", "moves")
+
+    def __init__(self, name, id, types, abilities, height, weight, stats, sprite, moves):
+        _set(self, "name", sys.intern(name))
+        _set(self, "id", id)
+        _set(self, "types", _share(types))
+        _set(self, "abilities", _share(abilities))
+        _set(self, "height", height)
+        _set(self, "weight", weight)
+        _set(self, "_stat_names", _share(stats))
+        _set(self, "_stat_values", tuple(stats.values()))
+        _set(self, "sprite", sprite)
+        _set(self, "moves", tuple(map(sys.intern, moves)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _fields(self):
+        return (self.name, self.id, self.types, self.abilities, self.height, self.weight,
+                self.stats, self.sprite, self.moves)
+
+    def __reduce__(self):
+        return type(self), self._fields()
+
+    def __eq__(self, other):
+        return isinstance(other, PokemonRecord) and self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash((self.name, self.id))
+
+    def __repr__(self):
+        return f"PokemonRecord(name={self.name!r}, id={self.id!r}, types={self.types!r})"
+
+    @classmethod
+    def from_document(cls, data):
+        return cls(
+            data["name"], data.get("id"),
+            [t["type"]["name"] for t in data["types"]],
+            [a["ability"]["name"] for a in data["abilities"]],
+            data.get("height"), data.get("weight"),
+            {s["stat"]["name"]: s["base_stat"] for s in data["stats"]},
+            data["sprites"]["front_default"],
+            [m["move"]["name"] for m in data["moves"][:5]],
+        )
+
+    @classmethod
+    def from_entry(cls, entry):
+        """From a Pokédex file (components/dexfile.py) entry."""
+        return cls(entry.name, entry.id, entry.types, entry.abilities, entry.height, entry.weight,
+                   entry.stats, entry.sprite, entry.moves)
+
+    @classmethod
+    def fetch(cls, name):
+        """The record for a Pokémon, from the Pokédex file or else the repository."""
+        name = names.resolve(name)
+        entry = dexfile.lookup(name)
+        if entry is not None:
+            return cls.from_entry(entry)
+        try:
+            return cls.from_document(get_repository().pokemon(name))
+        except UpstreamError as e:
+            raise Exception(f"Failed to fetch Pokémon data: {e.status_code}{names.hint(e)}") from e
+
+    @property
+    def stats(self):
+        return dict(zip(self._stat_names, self._stat_values))
+
+    def stat(self, name):
+        try:
+            return self._stat_values[self._stat_names.index(name)]
+        except ValueError:
+            return None
+
+    def summary(self, fields=None):
+        """Pokemon.get_summary() for basic fields; fields default to all of BASIC_FIELDS."""
+        fields = BASIC_FIELDS if fields is None else parse_fields(fields)
+        try:
+            return {field: _SUMMARY_GETTERS[field](self) for field in fields}
+        except KeyError as e:
+            raise ValueError(f"'{e.args[0]}' is not a basic field") from None
+
+
+_SUMMARY_GETTERS = {
+    "name": lambda r: r.name,
+    "id": lambda r: r.id,
+    "types": lambda r: list(r.types),
+    "abilities": lambda r: list(r.abilities),
+    "height": lambda r: r.height,
+    "weight": lambda r: r.weight,
+    "stats": lambda r: r.stats,
+    "sprite": lambda r: r.sprite,
+    "moves": lambda r: list(r.moves),
+}
+
+
+def fetch_summary(name, fields=None):
+    """
+    Pokemon(name).fetch(fields).get_summary(fields), through a PokemonRecord
+    when the projection only asks for basic fields.
+    """
+    fields = parse_fields(fields)
+    if all(f in BASIC_FIELDS for f in fields):
+        return PokemonRecord.fetch(name).summary(fields)
+    return Pokemon(name).fetch(fields).get_summary(fields)
+
+
 # Example usage:
 if __name__ == "__main__":
     pikachu = Pokemon("pikachu")
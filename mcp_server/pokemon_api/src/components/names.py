@@ -0,0 +1,358 @@
+"""
+Local Pokémon name resolution and validation with "did you mean" suggestions.
+
+Agents often misspell names, and every misspelling used to cost a PokeAPI
+round trip ending in a 404. The name index holds every known Pokémon name:
+from the cached national dex listing, the cached pokemon documents and the
+Pokédex file. Once the dex listing is cached (`sync_pokedex`, a warm-up, or
+any resource listing fetches it), the index is complete and an unknown name
+is rejected locally. Rejections and 404s both suggest the closest known names
+by trigram similarity.
+
+The same index resolves what users type to canonical PokeAPI names in one
+dict lookup: "Mega Charizard X" -> charizard-mega-x, "Alolan Ninetales" ->
+ninetales-alola, "Mr. Mime" -> mr-mime, "25" -> pikachu, and a species to its
+default variety (deoxys -> deoxys-normal). Components resolve names before
+they fetch anything, so these no longer cost a 404. The index also knows the
+way back, from a variety to its species (charizard-mega-x -> charizard), for
+the species endpoints, which only accept species names.
+"""
+import re
+import threading
+import unicodedata
+import weakref
+from collections import Counter, defaultdict
+from . import dexfile, upstream
+from .upstream import NotFoundError, resource_url
+
+DEX_LISTING_KEY = "pokemon?limit=100000&offset=0"
+MAX_SUGGESTIONS = 3
+# Minimum Dice coefficient of trigram sets for a suggestion.
+MIN_SIMILARITY = 0.4
+# PokeAPI numbers alternate forms from 10001; below that an id is a national dex number.
+FORM_ID_START = 10001
+# Form words written before the species ("Alolan Ninetales") -> the suffix in PokeAPI names.
+FORM_PREFIXES = {
+    "mega": "mega", "primal": "primal", "gigantamax": "gmax", "gmax": "gmax",
+    "alolan": "alola", "alola": "alola", "galarian": "galar", "galar": "galar",
+    "hisuian": "hisui", "hisui": "hisui", "paldean": "paldea", "paldea": "paldea",
+}
+_PREFIXES_OF = {suffix: [p for p, s in FORM_PREFIXES.items() if s == suffix] for suffix in set(FORM_PREFIXES.values())}
+# Spellings no rule derives.
+ALIASES = {"nidoran-female": "nidoran-f", "nidoran-male": "nidoran-m"}
+_PUNCTUATION = re.compile(r"[.'’:%#]")
+_SEPARATORS = re.compile(r"[\s_-]+")
+
+
+class UnknownPokemonError(NotFoundError):
+    """A Pokémon name that is not in the dex; `suggestions` are the closest known names."""
+
+    def __init__(self, name, suggestions=()):
+        self.name = name
+        self.suggestions = list(suggestions)
+        message = f"Unknown Pokémon '{name}'"
+        if self.suggestions:
+            message += f". Did you mean: {', '.join(self.suggestions)}?"
+        super().__init__(message, status_code=404, url=resource_url(f"pokemon/{name}"))
+
+
+def hint(error):
+    """". Did you mean: ...?" for errors carrying suggestions, else ""."""
+    suggestions = getattr(error, "suggestions", None)
+    return f". Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+
+
+def normalize(name):
+    """PokeAPI spelling of a free-form name: "Mr. Mime" -> mr-mime, "Nidoran♀" -> nidoran-f, "#025" -> 25."""
+    text = str(name).replace("♀", "-f").replace("♂", "-m")
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    text = _SEPARATORS.sub("-", _PUNCTUATION.sub("", text.strip().lower())).strip("-")
+    return str(int(text)) if text.isascii() and text.isdigit() else text
+
+
+def _aliases(name):
+    """Other ways to write a canonical name: without hyphens, and with its form word first."""
+    tokens = name.split("-")
+    if len(tokens) > 1:
+        yield "".join(tokens)
+    for i in range(1, len(tokens)):
+        for prefix in _PREFIXES_OF.get(tokens[i], ()):
+            yield "-".join([prefix] + tokens[:i] + tokens[i + 1:])
+
+
+def _form_last(key):
+    """"mega-charizard-x" -> "charizard-mega-x", for forms the index does not know yet."""
+    head, _, rest = key.partition("-")
+    if head not in FORM_PREFIXES or not rest:
+        return None
+    base, _, tail = rest.partition("-")
+    return "-".join(part for part in (base, FORM_PREFIXES[head], tail) if part)
+
+
+def _trigrams(name):
+    padded = f"^{name}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    def __init__(self, names, complete=False, defaults=None):
+        """
+        names: canonical names, or (name, id) pairs when the id is known.
+        complete: the names are the whole dex, so anything else is unknown.
+        defaults: species name -> default variety, from species documents.
+        """
+        self.names = []
+        self.known = set()
+        self.complete = False
+        self.aliases = {}  # any accepted spelling, national dex number included -> canonical name
+        self._sizes = []
+        self._postings = defaultdict(list)  # trigram -> positions in self.names
+        self.species = {}  # canonical Pokémon name -> its species name
+        self._varieties = defaultdict(list)  # species -> its dex-numbered Pokémon with a form name
+        self._defaults = {}  # species -> default variety, from species documents
+        self.extend(names, complete)
+        for species, name in (defaults or {}).items():
+            self.add_default(species, name)
+
+    def extend(self, names, complete=False):
+        """Add names (or (name, id) pairs) in dex order; complete marks the index as the whole dex."""
+        entries = sorted({(n, None) if isinstance(n, str) else tuple(n) for n in names},
+                         key=lambda e: (e[1] is None, e[1] or 0, e[0]))
+        for name, id in entries:
+            self.add(name, id)
+        self.complete = self.complete or complete
+
+    def add(self, name, id=None):
+        if id is not None:
+            self.aliases.setdefault(str(id), name)
+            if id < FORM_ID_START and "-" in name:
+                self._add_variety(name.split("-")[0], name)
+            elif id < FORM_ID_START:
+                self.species.setdefault(name, name)  # a dex-numbered Pokémon named like its species
+        if name in self.known:
+            return
+        self.aliases[name] = name
+        for alias in _aliases(name):
+            if alias not in self.known:
+                self.aliases.setdefault(alias, name)
+        position = len(self.names)
+        self.names.append(name)
+        self.known.add(name)
+        grams = _trigrams(name)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(position)
+
+    def _add_variety(self, species, name):
+        # A species whose default variety carries a form name (deoxys -> deoxys-normal):
+        # the only dex-numbered Pokémon under that species.
+        candidates = self._varieties[species]
+        if name in candidates:
+            return
+        candidates.append(name)
+        if species in self.known or species in self._defaults:
+            return
+        if len(candidates) == 1:
+            self.aliases.setdefault(species, name)
+        elif self.aliases.get(species) == candidates[0]:
+            del self.aliases[species]
+
+    def add_default(self, species, name):
+        """species -> its default variety, as a species document states it."""
+        self._defaults[species] = name
+        self.species[name] = species
+        if species not in self.known:
+            self.aliases[species] = name
+
+    def add_species(self, name, species):
+        """name -> its species, from a pokemon document's or Pokédex file entry's species ref."""
+        self.species[name] = species
+
+    def species_of(self, name):
+        """The species of a Pokémon (charizard-mega-x -> charizard), or None when the index cannot tell."""
+        name = self.resolve(name)
+        species = self.species.get(name)
+        if species is None and "-" not in name:
+            species = name  # forms always carry a suffix, so an unhyphenated name is its species'
+        return species
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.resolve(name) in self.known
+
+    def resolve(self, name):
+        """The canonical PokeAPI name for a free-form name, form or dex number; unknown names come back normalized."""
+        key = normalize(name)
+        found = self.aliases.get(key)
+        if found is None:
+            key = ALIASES.get(key, key)
+            key = _form_last(key) or key
+            found = self.aliases.get(key, key)
+        return found
+
+    def suggest(self, name, limit=MAX_SUGGESTIONS):
+        """Known names closest to name, best first."""
+        grams = _trigrams(normalize(name))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for position, count in shared.items():
+            score = 2 * count / (len(grams) + self._sizes[position])
+            if score >= MIN_SIMILARITY:
+                scored.append((-score, self.names[position]))
+        return [name for _, name in sorted(scored)[:limit]]
+
+    def check(self, name):
+        """Raise UnknownPokemonError when the index is complete and does not know name."""
+        key = self.resolve(name)
+        if self.complete and key not in self.known and not key.isdigit():
+            raise UnknownPokemonError(key, self.suggest(key))
+
+    def unknown(self, name):
+        """The error for a name PokeAPI answered 404 for."""
+        return UnknownPokemonError(normalize(name), self.suggest(name))
+
+
+def _listed_id(entry):
+    id = str(entry.get("url") or "").rstrip("/").rpartition("/")[2]
+    return int(id) if id.isdigit() else None
+
+
+def listed_names(listing):
+    """(name, id) pairs of a dex listing document."""
+    return [(entry["name"], _listed_id(entry)) for entry in listing.get("results") or ()]
+
+
+def default_variety(document):
+    """The default variety named in a species document, or None."""
+    for variety in document.get("varieties") or ():
+        if variety.get("is_default"):
+            return variety["pokemon"]["name"]
+    return None
+
+
+def _named(key, prefix):
+    name = key[len(prefix):]
+    return name if "?" not in name and "/" not in name and not name.isdigit() else None
+
+
+def names_from_cache(source):
+    """(names, complete) from the cached dex listing and pokemon documents; listed names come with their ids."""
+    listing = source.entry(DEX_LISTING_KEY)
+    names = listed_names(listing[1]) if listing else []
+    names += [name for name in (_named(key, "pokemon/") for key in source.keys("pokemon/")) if name]
+    return names, listing is not None
+
+
+def species_defaults(source, known=()):
+    """species name -> default variety, for the cached species documents not named after a Pokémon."""
+    defaults = {}
+    for key in source.keys("pokemon-species/"):
+        species = _named(key, "pokemon-species/")
+        entry = source.entry(key) if species and species not in known else None
+        default = default_variety(entry[1]) if entry and entry[1] else None
+        if default:
+            defaults[species] = default
+    return defaults
+
+
+_index = None
+_index_source = (None, None)  # (weak reference to the cache, Pokédex file) the index was built from
+_index_lock = threading.Lock()
+_subscribed = weakref.WeakSet()
+
+
+def _built_from(source):
+    cache_ref = _index_source[0]
+    return cache_ref is not None and cache_ref() is source
+
+
+def _listener(source_ref):
+    def stored(key, refreshed):
+        if _index is None or not key.startswith("pokemon"):  # pokemon/, pokemon-species/ and the dex listing
+            return
+        with _index_lock:
+            source = source_ref()
+            if _index is None or source is None or not _built_from(source):
+                return
+            if key == DEX_LISTING_KEY:
+                entry = source.entry(key)
+                if entry and entry[1]:
+                    _index.extend(listed_names(entry[1]), complete=True)
+            elif key.startswith("pokemon/") and not refreshed:
+                name = _named(key, "pokemon/")
+                if name:
+                    _index.add(name)
+                    entry = source.entry(key)
+                    species = ((entry[1] or {}).get("species") or {}).get("name") if entry else None
+                    if species:
+                        _index.add_species(name, species)
+            elif key.startswith("pokemon-species/"):
+                species = _named(key, "pokemon-species/")
+                entry = source.entry(key) if species else None
+                default = default_variety(entry[1]) if entry and entry[1] else None
+                if default:
+                    _index.add_default(species, default)
+    return stored
+
+
+def _add_dex_entries(index, entries):
+    index.extend((entry.name, entry.id) for entry in entries)
+    for entry in entries:
+        if entry.species:
+            index.add_species(entry.name, entry.species)
+
+
+def name_index():
+    """
+    Index over the names the active cache (and the Pokédex file) know, extended
+    as the cache stores new ones and as newer Pokédex files are loaded. It is
+    only rebuilt from scratch when the active cache changes.
+    """
+    global _index, _index_source
+    source = upstream.cache
+    dex = dexfile.current()
+    index = _index
+    if index is None or not _built_from(source) or _index_source[1] is not dex:
+        with _index_lock:
+            index = _index
+            if index is None or not _built_from(source):
+                source_ref = weakref.ref(source)
+                names, complete = names_from_cache(source)
+                entries = list(dex) if dex is not None else []
+                known = {name if isinstance(name, str) else name[0] for name in names}
+                known.update(entry.name for entry in entries)
+                index = NameIndex(names, complete, species_defaults(source, known))
+                _add_dex_entries(index, entries)
+                _index = index
+                _index_source = (source_ref, dex)
+                if source not in _subscribed:
+                    source.subscribe(_listener(source_ref))
+                    _subscribed.add(source)
+            elif _index_source[1] is not dex:
+                if dex is not None:
+                    _add_dex_entries(index, list(dex))
+                _index_source = (_index_source[0], dex)
+    return index
+
+
+def built():
+    """Whether the index over the active cache exists, so name_index() will not walk the cache."""
+    return _index is not None and _built_from(upstream.cache)
+
+
+def resolve(name):
+    """Canonical PokeAPI name for what a user typed; see NameIndex.resolve."""
+    return name_index().resolve(name)
+
+
+def check(name):
+    """Reject a Pokémon name the complete local index does not know, with suggestions."""
+    name_index().check(name)
+
+
+def unknown(name):
+    return name_index().unknown(name)
@@ -0,0 +1,274 @@
+import contextvars
+import cProfile
+import itertools
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Fraction of calls profiled without being asked to (0 disables sampling),
+# how many finished profiles are kept, and how many functions each one lists.
+SAMPLE_RATE = float(os.getenv("POKE_PROFILE_SAMPLE_RATE", "0"))
+STORE_SIZE = int(os.getenv("POKE_PROFILE_STORE_SIZE", "50"))
+TOP_FUNCTIONS = int(os.getenv("POKE_PROFILE_TOP_FUNCTIONS", "30"))
+
+# Span kinds recorded by the components.
+UPSTREAM = "upstream"
+RATE_LIMIT_WAIT = "rate_limit_wait"
+LLM = "llm"
+CACHE = "cache"
+DATABASE = "db"
+
+_active = contextvars.ContextVar("active_profile", default=None)
+_timing = contextvars.ContextVar("active_timing", default=None)
+
+# cProfile can only have one profiler enabled per interpreter at a time; calls
+# that lose the race still get their span breakdown.
+_cpu_profiler_lock = threading.Lock()
+
+
+class Profile:
+    """Span timings (and optionally a cProfile capture) for one tool call or request."""
+
+    def __init__(self, target, reason):
+        self.id = uuid.uuid4().hex[:12]
+        self.target = target
+        self.reason = reason
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self.duration = None
+        self.spans = []
+        self.functions = None
+        self.error = None
+
+    def add_span(self, kind, name, start, end):
+        with self._lock:
+            self.spans.append({
+                "seq": next(self._seq),
+                "kind": kind,
+                "name": name,
+                "start_ms": round((start - self._start) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+            })
+
+    def breakdown(self):
+        """Total time per span kind; "other" is wall time not covered by any span."""
+        kinds = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            totals = kinds.setdefault(span["kind"], {"count": 0, "total_ms": 0.0})
+            totals["count"] += 1
+            totals["total_ms"] = round(totals["total_ms"] + span["duration_ms"], 3)
+        if self.duration is not None:
+            covered = sum(t["total_ms"] for t in kinds.values())
+            kinds["other"] = {"count": None, "total_ms": round(max(0.0, self.duration * 1000 - covered), 3)}
+        return kinds
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "target": self.target,
+            "reason": self.reason,
+            "created_at": self.created_at,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "breakdown": self.breakdown(),
+            "error": self.error,
+        }
+
+    def to_dict(self):
+        return {
+            **self.summary(),
+            "spans": sorted(self.spans, key=lambda s: s["seq"]),
+            "functions": self.functions,
+        }
+
+
+class Timing:
+    """
+    Per-call time per stage, cheap enough to collect on every call.
+
+    Upstream fetches are split by resource kind ("upstream-pokemon-species");
+    the other stages are the span kinds. "compute" is wall time not covered by
+    any stage. Stages of concurrent fetches overlap, so they may add up to more
+    than the total, in which case compute is 0.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.duration = None
+        self.stages = {}
+
+    def add(self, kind, name, seconds):
+        stage = f"{kind}-{name.split('/', 1)[0].split('?', 1)[0]}" if kind == UPSTREAM else kind
+        with self._lock:
+            totals = self.stages.setdefault(stage, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self):
+        total = self.duration if self.duration is not None else time.perf_counter() - self._start
+        with self._lock:
+            stages = {stage: {"count": count, "total_ms": round(seconds * 1000, 3)}
+                      for stage, (count, seconds) in sorted(self.stages.items())}
+        covered = sum(t["total_ms"] for t in stages.values())
+        return {
+            "total_ms": round(total * 1000, 3),
+            "stages": stages,
+            "compute_ms": round(max(0.0, total * 1000 - covered), 3),
+        }
+
+    def header(self):
+        """Server-Timing header value."""
+        timing = self.to_dict()
+        metrics = [f'{stage};dur={t["total_ms"]};desc="{t["count"]} calls"' for stage, t in timing["stages"].items()]
+        metrics.append(f"compute;dur={timing['compute_ms']}")
+        metrics.append(f"total;dur={timing['total_ms']}")
+        return ", ".join(metrics)
+
+
+class ProfileStore:
+    """Bounded, thread-safe store of the most recent profiles."""
+
+    def __init__(self, size=STORE_SIZE):
+        self.size = max(1, size)
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def recent(self, limit=None, target=None):
+        """Newest first."""
+        with self._lock:
+            profiles = [p for p in reversed(self._profiles.values()) if target is None or p.target == target]
+        return profiles[:limit] if limit else profiles
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+store = ProfileStore()
+
+
+def current():
+    return _active.get()
+
+
+@contextmanager
+def span(kind, name):
+    """Time the block as a span of the active profile and timing; a no-op when neither is active."""
+    profile, timing_ = _active.get(), _timing.get()
+    if profile is None and timing_ is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if profile is not None:
+            profile.add_span(kind, name, start, end)
+        if timing_ is not None:
+            timing_.add(kind, name, end - start)
+
+
+@contextmanager
+def timing():
+    """Collect a Timing for the block; nested blocks join the outer one."""
+    record = _timing.get()
+    if record is not None:
+        yield record
+        return
+    record = Timing()
+    token = _timing.set(record)
+    try:
+        yield record
+    finally:
+        record.finish()
+        _timing.reset(token)
+
+
+def should_profile(requested=False):
+    """Return the reason a call should be profiled, or None."""
+    if requested:
+        return "requested"
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _top_functions(profiler, limit):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def profile(target, requested=False):
+    """
+    Profile the block when requested or sampled, storing the result.
+
+    Yields the Profile (or None when the call is not profiled). Nested blocks
+    join the outer profile instead of starting a new one.
+    """
+    reason = should_profile(requested)
+    if reason is None or _active.get() is not None:
+        yield _active.get()
+        return
+
+    record = Profile(target, reason)
+    token = _active.set(record)
+    profiler = cProfile.Profile() if _cpu_profiler_lock.acquire(blocking=False) else None
+    try:
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool (e.g. a debugger) owns the hook.
+                _cpu_profiler_lock.release()
+                profiler = None
+        try:
+            yield record
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _cpu_profiler_lock.release()
+                record.functions = _top_functions(profiler, TOP_FUNCTIONS)
+    finally:
+        record.duration = time.perf_counter() - record._start
+        _active.reset(token)
+        store.add(record)
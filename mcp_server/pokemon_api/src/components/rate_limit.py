@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Sustained upstream requests per second and burst size for this process.
+# A rate of 0 disables limiting.
+RATE_LIMIT = float(os.getenv("POKE_API_RATE_LIMIT", "20"))
+BURST = int(os.getenv("POKE_API_BURST", "20"))
+
+# Lower value = served first. Interactive single lookups jump ahead of bulk
+# lookups, which jump ahead of background cache warm-up.
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+PRIORITY_CLASSES = {INTERACTIVE: 0, BULK: 1, BACKGROUND: 2}
+
+_priority = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+class RateLimitTimeout(Exception):
+    """No token became available before the caller's timeout."""
+
+
+@contextmanager
+def priority(name):
+    """Run the block's upstream requests under the given priority class."""
+    if name not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class '{name}'. Valid classes: {', '.join(PRIORITY_CLASSES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+class PriorityTokenBucket:
+    """
+    Thread-safe token bucket whose waiters are served strictly by priority
+    class, then FIFO within a class.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._stats = {
+            name: {"acquired": 0, "timeouts": 0, "queued": 0, "max_queued": 0,
+                   "total_wait": 0.0, "max_wait": 0.0}
+            for name in PRIORITY_CLASSES
+        }
+
+    def configure(self, rate=None, burst=None):
+        with self._cond:
+            self._refill()
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = max(1, burst)
+                self._tokens = min(self._tokens, self.burst)
+            self._cond.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _enqueue(self, priority_class):
+        entry = (PRIORITY_CLASSES[priority_class], next(self._seq))
+        heapq.heappush(self._waiters, entry)
+        stats = self._stats[priority_class]
+        stats["queued"] += 1
+        stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+        return entry
+
+    def _dequeue(self, entry, priority_class):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self._stats[priority_class]["queued"] -= 1
+        self._cond.notify_all()
+
+    def _try_take(self, entry):
+        """Take a token if `entry` is at the head of the queue; otherwise return a wait hint."""
+        self._refill()
+        if self._waiters[0] == entry and self._tokens >= 1:
+            self._tokens -= 1
+            return True, None
+        return False, (1 - self._tokens) / self.rate if self._waiters[0] == entry else None
+
+    def _record(self, priority_class, waited):
+        stats = self._stats[priority_class]
+        stats["acquired"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def _timed_out(self, priority_class):
+        self._stats[priority_class]["timeouts"] += 1
+        return RateLimitTimeout(f"Timed out waiting for an upstream {priority_class} slot")
+
+    def acquire(self, priority_class=None, timeout=None):
+        """Block until a token is available; returns the seconds spent waiting."""
+        priority_class = priority_class or current_priority()
+        if self.rate <= 0:
+            with self._cond:
+                self._record(priority_class, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        with self._cond:
+            entry = self._enqueue(priority_class)
+            try:
+                while True:
+                    taken, wait = self._try_take(entry)
+                    if taken:
+                        break
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            raise self._timed_out(priority_class)
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(entry, priority_class)
+
+            waited = time.monotonic() - start
+            self._record(priority_class, waited)
+        return waited
+
+    async def acquire_async(self, priority_class=None, timeout=None):
+        """
+        Event-loop friendly acquire(). Async waiters share the queue with
+        threaded ones but poll with asyncio.sleep() instead of blocking.
+        """
+        priority_class = priority_class or current_priority()
+        if self.rate <= 0:
+            with self._cond:
+                self._record(priority_class, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        with self._cond:
+            entry = self._enqueue(priority_class)
+        try:
+            while True:
+                with self._cond:
+                    taken, wait = self._try_take(entry)
+                if taken:
+                    break
+                # Waiters behind the head re-check once per token interval.
+                wait = 1 / self.rate if wait is None else wait
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        with self._cond:
+                            raise self._timed_out(priority_class)
+                    wait = min(wait, remaining)
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._dequeue(entry, priority_class)
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._record(priority_class, waited)
+        return waited
+
+    def snapshot(self):
+        with self._cond:
+            self._refill()
+            classes = {}
+            for name, stats in self._stats.items():
+                acquired = stats["acquired"]
+                classes[name] = {
+                    "queue_depth": stats["queued"],
+                    "max_queue_depth": stats["max_queued"],
+                    "acquired": acquired,
+                    "timeouts": stats["timeouts"],
+                    "avg_wait_ms": round(stats["total_wait"] / acquired * 1000, 3) if acquired else 0.0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 3),
+                }
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "available_tokens": round(self._tokens, 2),
+                "classes": classes,
+            }
+
+
+limiter = PriorityTokenBucket()
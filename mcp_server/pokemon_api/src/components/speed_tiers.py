@@ -0,0 +1,151 @@
+"""
+Speed-tier index: the whole dex sorted by actual Speed at common spreads.
+
+Each (level, spread) tier is a sorted list, so "who outspeeds X", "what does
+X outspeed" and "who ties X" are bisects rather than pairwise comparisons.
+The tiers follow the search index (components/search.py) as their snapshot
+of the dex: when it is rebuilt or extended, only the Pokémon that were
+added, removed or changed are moved in the sorted lists.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from . import names
+from .damage import calc_stats, parse_spread
+from .repository import get_repository
+
+LEVELS = (100, 50)
+# Spread name -> (level-less spread, multiplier). Scarf and +1 are both 1.5x max Speed.
+SPREADS = {
+    "min": ({"ivs": {"speed": 0}, "nature": "brave"}, 1.0),
+    "neutral": ({"evs": {"speed": 252}, "nature": "hardy"}, 1.0),
+    "max": ({"evs": {"speed": 252}, "nature": "jolly"}, 1.0),
+    "scarf": ({"evs": {"speed": 252}, "nature": "jolly"}, 1.5),
+    "+1": ({"evs": {"speed": 252}, "nature": "jolly"}, 1.5),
+}
+DEFAULT_LIMIT = 10
+
+
+def speed_at(base_speed, level, spread):
+    investment, multiplier = SPREADS[spread]
+    stat = calc_stats({"speed": base_speed}, parse_spread({**investment, "level": level}))["speed"]
+    return int(stat * multiplier)
+
+
+def _spread_name(value, default="max"):
+    spread = str(value or default).strip().lower()
+    if spread not in SPREADS:
+        raise ValueError(f"Unknown spread '{value}'. Valid spreads: {', '.join(SPREADS)}")
+    return spread
+
+
+class SpeedTierIndex:
+    def __init__(self, levels=LEVELS):
+        self.base = {}  # name -> base Speed
+        # (level, spread) -> parallel lists sorted by (speed, name)
+        self.tiers = {(level, spread): ([], []) for level in levels for spread in SPREADS}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.base)
+
+    def update(self, entries):
+        """
+        Make the tiers match a snapshot of (name, base Speed) pairs, moving only
+        what changed. Returns (removed, added) counts; a changed Pokémon counts
+        as both.
+        """
+        entries = dict(entries)
+        with self._lock:
+            stale = [name for name, speed in self.base.items() if entries.get(name) != speed]
+            fresh = [name for name, speed in entries.items() if self.base.get(name) != speed]
+            for (level, spread), (speeds, names) in self.tiers.items():
+                for name in stale:
+                    i = self._position(speeds, names, speed_at(self.base[name], level, spread), name)
+                    del speeds[i], names[i]
+                if len(fresh) > len(speeds):
+                    # A (re)build: one sort beats many inserts.
+                    merged = sorted(list(zip(speeds, names)) + [(speed_at(entries[n], level, spread), n) for n in fresh])
+                    speeds[:], names[:] = [s for s, _ in merged], [n for _, n in merged]
+                else:
+                    for name in fresh:
+                        speed = speed_at(entries[name], level, spread)
+                        i = self._insertion_point(speeds, names, speed, name)
+                        speeds.insert(i, speed)
+                        names.insert(i, name)
+            for name in stale:
+                del self.base[name]
+            for name in fresh:
+                self.base[name] = entries[name]
+        return len(stale), len(fresh)
+
+    @staticmethod
+    def _insertion_point(speeds, names, speed, name):
+        lo, hi = bisect_left(speeds, speed), bisect_right(speeds, speed)
+        return bisect_left(names, name, lo, hi)
+
+    def _position(self, speeds, names, speed, name):
+        i = self._insertion_point(speeds, names, speed, name)
+        if i == len(names) or names[i] != name:
+            raise KeyError(name)
+        return i
+
+    def query(self, name, spread="max", versus=None, level=100, limit=DEFAULT_LIMIT, base_speed=None):
+        """
+        Where a Pokémon at `spread` falls among the dex at `versus` (default: the
+        same spread): the Pokémon it outspeeds and that outspeed it, nearest
+        first, and the ones it ties. base_speed is needed for Pokémon not indexed.
+        """
+        spread, versus = _spread_name(spread), _spread_name(versus, spread)
+        level, limit = int(level), min(max(int(limit), 0), 100)
+        if (level, versus) not in self.tiers:
+            raise ValueError(f"Speed tiers are indexed for levels {', '.join(map(str, LEVELS))}")
+        name = str(name).strip().lower()
+        with self._lock:
+            base = self.base.get(name, base_speed)
+            if base is None:
+                raise LookupError(name)
+            speed = speed_at(base, level, spread)
+            speeds, names = self.tiers[(level, versus)]
+            lo, hi = bisect_left(speeds, speed), bisect_right(speeds, speed)
+
+            def entries(indexes):
+                return [{"name": names[i], "speed": speeds[i]} for i in indexes]
+
+            return {
+                "pokemon": name,
+                "base_speed": base,
+                "level": level,
+                "spread": spread,
+                "versus": versus,
+                "speed": speed,
+                "outspeeds": {"count": lo, "nearest": entries(range(lo - 1, max(lo - limit, 0) - 1, -1))},
+                "outsped_by": {"count": len(speeds) - hi, "nearest": entries(range(hi, min(hi + limit, len(speeds))))},
+                "ties": [n for n in names[lo:hi] if n != name],
+                "indexed": len(self.base),
+            }
+
+
+_tiers = SpeedTierIndex()
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def current(pokedex):
+    """The shared tiers, brought up to date with a search index (PokedexIndex) snapshot."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot != (pokedex, pokedex.version):
+            _tiers.update((r["name"], r["stats"]["speed"]) for r in list(pokedex.records.values()))
+            _snapshot = (pokedex, pokedex.version)
+    return _tiers
+
+
+def speed_tier(tiers, name, **params):
+    """tiers.query(), fetching the Pokémon's base Speed through the repository when it is not indexed."""
+    name = names.resolve(name)
+    try:
+        return tiers.query(name, **params)
+    except LookupError:
+        data = get_repository().pokemon(name)
+        base = next(s["base_stat"] for s in data["stats"] if s["stat"]["name"] == "speed")
+        return tiers.query(data["name"], base_speed=base, **params)
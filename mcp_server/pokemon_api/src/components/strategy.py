@@ -1,28 +1,29 @@
-import requests
+import asyncio
 from collections import defaultdict
-from dotenv import load_dotenv
-import os
-load_dotenv()
-
-POKEAPI_BASE = os.getenv("POKE_API_URL")
+from . import dexfile, names
+from .upstream import UpstreamError
+from .repository import get_repository
 
 def get_pokemon_types(name):
-    url = f"{POKEAPI_BASE}/pokemon/{name.lower()}"
-    res = requests.get(url)
-    if res.status_code != 200:
-        raise ValueError("Pokémon not found in PokeAPI")
-    data = res.json()
+    name = names.resolve(name)
+    entry = dexfile.lookup(name)
+    if entry is not None:
+        return list(entry.types)
+    try:
+        data = get_repository().pokemon(name)
+    except UpstreamError as e:
+        raise ValueError(f"Pokémon not found in PokeAPI{names.hint(e)}") from e
     return [t['type']['name'] for t in data['types']]
 
 def get_type_weaknesses(pokemon_types):
+    # A missing type would silently skew the result, so failures propagate.
+    return _weaknesses_from([dexfile.type_document(p_type) or get_repository().type(p_type)
+                             for p_type in pokemon_types])
+
+def _weaknesses_from(type_docs):
     weaknesses = defaultdict(float)
 
-    for p_type in pokemon_types:
-        url = f"{POKEAPI_BASE}/type/{p_type}"
-        res = requests.get(url)
-        if res.status_code != 200:
-            continue
-        data = res.json()
+    for data in type_docs:
         dmg_rel = data['damage_relations']
 
         for dt in dmg_rel['double_damage_from']:
@@ -36,11 +37,13 @@ def get_type_weaknesses(pokemon_types):
     return dict(sorted({k: v for k, v in weaknesses.items() if v > 0}.items(), key=lambda x: x[1], reverse=True))
 
 def get_pokemon_by_type(poke_type, exclude_name=None, limit=100):
-    url = f"{POKEAPI_BASE}/type/{poke_type}"
-    res = requests.get(url)
-    if res.status_code != 200:
+    try:
+        data = dexfile.type_document(poke_type) or get_repository().type(poke_type)
+    except UpstreamError:
         return []
-    data = res.json()
+    return _names_of_type(data, exclude_name, limit)
+
+def _names_of_type(data, exclude_name=None, limit=100):
     pokes = []
     for p in data['pokemon'][:limit]:
         name = p['pokemon']['name']
@@ -49,6 +52,7 @@ def get_pokemon_by_type(poke_type, exclude_name=None, limit=100):
     return pokes
 
 def recommend_counters(pokemon_name, max_counters=5):
+    pokemon_name = names.resolve(pokemon_name)
     try:
         types = get_pokemon_types(pokemon_name)
     except ValueError as e:
@@ -64,9 +68,47 @@ def recommend_counters(pokemon_name, max_counters=5):
         if len(counter_pokemons) >= max_counters:
             break
 
+    return _counter_report(pokemon_name, types, weaknesses, counter_pokemons, max_counters)
+
+def _counter_report(pokemon_name, types, weaknesses, counter_pokemons, max_counters):
     return {
         "pokemon": pokemon_name,
         "types": types,
         "top_weaknesses": weaknesses,
         "recommended_counters": list(counter_pokemons)[:max_counters]
     }
+
+async def recommend_counters_async(pokemon_name, max_counters=5):
+    """
+    Async twin of recommend_counters(). The defending types and the (at most
+    three) counter types are each fetched concurrently rather than one by one.
+    """
+    pokemon_name = names.resolve(pokemon_name)
+    entry = dexfile.lookup(pokemon_name)
+    if entry is not None:
+        types = list(entry.types)
+    else:
+        try:
+            data = await get_repository().pokemon_async(pokemon_name)
+        except UpstreamError as e:
+            return {"error": f"Pokémon not found in PokeAPI{names.hint(e)}"}
+        types = [t['type']['name'] for t in data['types']]
+
+    async def type_doc(name):
+        return dexfile.type_document(name) or await get_repository().type_async(name)
+
+    weaknesses = _weaknesses_from(await asyncio.gather(*[type_doc(t) for t in types]))
+
+    async def candidates(counter_type):
+        try:
+            return _names_of_type(await type_doc(counter_type), pokemon_name)
+        except UpstreamError:
+            return []
+
+    counter_pokemons = set()
+    for candidate_names in await asyncio.gather(*[candidates(t) for t in list(weaknesses.keys())[:3]]):
+        counter_pokemons.update(candidate_names)
+        if len(counter_pokemons) >= max_counters:
+            break
+
+    return _counter_report(pokemon_name, types, weaknesses, counter_pokemons, max_counters)
@@ -0,0 +1,232 @@
+"""
+Cache warm-up: prefetch what cold requests would otherwise wait on PokeAPI for.
+
+A plan is made of targets: every type, the Pokémon agents ask about most
+(counted from the Django access log), whole generations and any names given
+explicitly. Warming a Pokémon fetches the documents the tools read for it:
+its pokemon and species resources, its evolution chain and its types.
+
+Everything lands in the shared cache (POKE_CACHE_DIR) that both front-ends
+read through. Documents already fresh there are not fetched again, so an
+interrupted warm-up resumes where it stopped and a re-run only fetches what is
+missing or expired. Workers run under the background priority class, so
+interactive requests served meanwhile go first.
+"""
+import json
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from . import upstream
+from .names import DEX_LISTING_KEY, name_index, resolve
+from .rate_limit import BACKGROUND, priority
+from .upstream import NotFoundError, UpstreamError, fetch_json, resource_key
+
+TYPE_LISTING_KEY = "type?limit=100"
+DEFAULT_WORKERS = 8
+DEFAULT_TOP = 50
+# Payload fields naming a Pokémon in agent requests (see AGENT_API.md).
+NAME_FIELDS = ("name", "pokemon1", "pokemon2")
+_NAME_FIELD = re.compile(r'"(?:%s)"\s*:\s*"([^"]+)"' % "|".join(NAME_FIELDS))
+
+
+def add_arguments(parser, default_access_log=None):
+    """Options shared by `manage.py warm_cache` and `server.py warm-cache`."""
+    parser.add_argument("names", nargs="*", help="extra Pokémon to warm")
+    parser.add_argument("--no-types", dest="types", action="store_false", help="skip the type documents")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, metavar="N",
+                        help=f"warm the N most requested Pokémon in the access logs (default: {DEFAULT_TOP})")
+    parser.add_argument("--access-log", action="append", dest="access_logs", metavar="PATH",
+                        help="access log to count requests in; repeatable"
+                             + (f" (default: {default_access_log})" if default_access_log else ""))
+    parser.add_argument("--generations", type=int, nargs="+", default=[], metavar="N",
+                        help="warm every Pokémon of these generations")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent upstream fetches (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--refresh", action="store_true", help="re-fetch documents even if they are fresh")
+    parser.set_defaults(default_access_logs=[default_access_log] if default_access_log else [])
+
+
+def _payload_names(payload):
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        # Payloads are cut at API_LOG_MAX_PAYLOAD bytes; take what survived.
+        return _NAME_FIELD.findall(payload)
+    if not isinstance(data, dict):
+        return []
+    requests = [data] + [op for op in data.get("operations") or () if isinstance(op, dict)]
+    names = []
+    for request in requests:
+        names.extend(request[field] for field in NAME_FIELDS if isinstance(request.get(field), str))
+        names.extend(name for name in request.get("names") or () if isinstance(name, str))
+    return names
+
+
+def access_log_names(paths):
+    """Counter of the canonical Pokémon names in the payloads of successful requests in JSON access logs."""
+    counts = Counter()
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.startswith("{"):
+                        continue  # plain-text lines from before the JSON log format
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not record.get("payload") or (record.get("status") or 500) >= 400:
+                        continue
+                    counts.update(resolve(name) for name in _payload_names(record["payload"]) if name.strip())
+        except FileNotFoundError:
+            continue
+    return counts
+
+
+def type_names():
+    return [entry["name"] for entry in fetch_json(TYPE_LISTING_KEY)["results"]]
+
+
+def generation_names(number):
+    """
+    The default Pokémon of a generation's species, in dex order. A default
+    form does not always share the species name (deoxys -> deoxys-normal), but
+    it always has the species' dex number, which the dex listing resolves.
+    """
+    species = fetch_json(f"generation/{number}")["pokemon_species"]
+    try:
+        fetch_json(DEX_LISTING_KEY)
+    except UpstreamError:
+        pass  # species whose default form has its own name fall back to the species name
+    index = name_index()
+    numbers = {ref["name"]: int(resource_key(ref["url"]).rsplit("/", 1)[-1]) for ref in species}
+    return [index.aliases.get(str(numbers[name])) or index.resolve(name) for name in sorted(numbers, key=numbers.get)]
+
+
+def plan(names=(), types=True, top=0, access_logs=(), generations=()):
+    """
+    Ordered, de-duplicated ("listing" | "type" | "pokemon", name) targets. The
+    national dex listing comes with the types; it completes the local name index.
+    """
+    targets = []
+    if types:
+        targets += [("listing", DEX_LISTING_KEY)] + [("type", name) for name in type_names()]
+    if top > 0:
+        targets += [("pokemon", name) for name, _ in access_log_names(access_logs).most_common(top)]
+    for number in generations:
+        targets += [("pokemon", name) for name in generation_names(number)]
+    targets += [("pokemon", resolve(name)) for name in names if name.strip()]
+    return list(dict.fromkeys(targets))
+
+
+class Warmer:
+    """Fetches targets into the cache, counting the documents that actually came from upstream."""
+
+    def __init__(self, refresh=False):
+        self.refresh = refresh
+        self._refreshed = set()
+        self._lock = threading.Lock()
+
+    def fetch(self, path):
+        """(document, fetched): fetched is False when it was already fresh in the cache."""
+        key = resource_key(path)
+        if self.refresh:
+            with self._lock:
+                first = key not in self._refreshed
+                self._refreshed.add(key)
+            if first:
+                return fetch_json(key, use_cache=False), True
+        cached = upstream.cache.get(key)
+        if cached is not None:
+            return cached, False
+        return fetch_json(key), True
+
+    def warm(self, target):
+        """Warm one target; returns how many documents were fetched upstream."""
+        kind, name = target
+        with priority(BACKGROUND):
+            if kind == "listing":
+                return int(self.fetch(name)[1])
+            if kind == "type":
+                return int(self.fetch(f"type/{name}")[1])
+            pokemon, fetched = self.fetch(f"pokemon/{name}")
+            fetched = [fetched]
+            # The tools read species by Pokémon name; forms (charizard-mega-x) only have their base species.
+            ref = pokemon["species"]
+            species, species_fetched = self.fetch(f"pokemon-species/{name}" if ref["name"] == name else ref["url"])
+            fetched.append(species_fetched)
+            if species.get("evolution_chain"):
+                fetched.append(self.fetch(species["evolution_chain"]["url"])[1])
+            for slot in pokemon["types"]:
+                fetched.append(self.fetch(f"type/{slot['type']['name']}")[1])
+            return sum(fetched)
+
+
+def warm(targets, workers=DEFAULT_WORKERS, refresh=False, progress=None):
+    """
+    Warm targets with at most `workers` in flight. progress(done, target, fetched,
+    error) is called from this thread as each completes. Returns (fetched, failed).
+    """
+    warmer = Warmer(refresh)
+    fetched, failed = 0, []
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {executor.submit(warmer.warm, target): target for target in targets}
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            target, count, error = futures[future], 0, None
+            try:
+                count = future.result()
+                fetched += count
+            except Exception as e:
+                error = e
+                failed.append(target)
+            if progress:
+                progress(done, target, count, error)
+    except KeyboardInterrupt:
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return fetched, failed
+
+
+def run(options, write, write_error=None):
+    """
+    Plan and warm from parsed add_arguments() options, reporting through write().
+    Returns the targets that failed for a reason other than not existing upstream.
+    """
+    write_error = write_error or write
+    access_logs = options.get("access_logs") or options.get("default_access_logs") or []
+    if options["top"] > 0 and not access_logs:
+        write_error("No access log given (--access-log); skipping the most requested Pokémon.")
+    targets = plan(options["names"], options["types"], options["top"], access_logs, options["generations"])
+    total = len(targets)
+    kinds = Counter(kind for kind, _ in targets)
+    where = upstream.cache.directory or "the in-memory cache"
+    write(f"Warming {kinds['type']} types and {kinds['pokemon']} Pokémon into {where}")
+    if not total:
+        return []
+
+    every = max(1, total // 20)
+    missing = []
+
+    def progress(done, target, count, error):
+        if isinstance(error, NotFoundError):
+            # Requested names that do not exist (typos in logged requests) are not failures.
+            missing.append(target)
+        elif error is not None:
+            write_error(f"{target[0]} {target[1]}: {error}")
+        if done % every == 0 or done == total:
+            write(f"[{done}/{total}] {target[0]} {target[1]}")
+
+    try:
+        fetched, failed = warm(targets, options["workers"], options["refresh"], progress)
+    except KeyboardInterrupt:
+        write_error("Interrupted; what was fetched is cached, run the command again to resume.")
+        raise
+    write(f"Warmed {total - len(failed)} of {total} targets, {fetched} documents fetched upstream")
+    if missing:
+        write(f"Not found upstream: {', '.join(name for _, name in missing)}")
+    return [target for target in failed if target not in missing]
@@ -0,0 +1,31 @@
+import atexit
+import json
+import logging
+from logging.handlers import QueueHandler
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and the record's `api` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "api", None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def start_queue_listeners(logger_names):
+    """
+    Start the background listener thread of every QueueHandler that dictConfig
+    attached to the given loggers (dictConfig creates but does not start them).
+    """
+    for name in logger_names:
+        for handler in logging.getLogger(name).handlers:
+            listener = getattr(handler, "listener", None)
+            if isinstance(handler, QueueHandler) and listener is not None and listener._thread is None:
+                listener.start()
+                atexit.register(listener.stop)
@@ -1,3 +1,1032 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from mcp_server import asgi
+from .middleware import APILoggingMiddleware
+from .models import Pokemon as PokemonRow
+from .src.components import (
+    damage, dexfile, encoding, evolutions, flavor_text, info_retrival, learnsets, names, profiling, rate_limit,
+    resources, search, speed_tiers, upstream, warmup,
+)
+from .src.components.comparison_module import PokemonComparer
+from .src.components.strategy import recommend_counters
+from .src.components.cache import PokeCache
+
+
+def fake_response(payload, status_code=200):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    return response
+
+
+PIKACHU = {
+    "id": 25,
+    "name": "pikachu",
+    "height": 4,
+    "weight": 60,
+    "moves": [{"move": {"name": "thunder-shock"}}],
+    "abilities": [{"ability": {"name": "static"}}],
+    "types": [{"type": {"name": "electric"}}],
+    "stats": [{"stat": {"name": "hp"}, "base_stat": 35}, {"stat": {"name": "speed"}, "base_stat": 90}],
+    "sprites": {"front_default": "https://example.test/25.png"},
+}
+
+
+class UpstreamTestCase(TestCase):
+    """Gives every test an empty in-memory cache so upstream calls are observable."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.cache = PokeCache(directory=None)
+        patcher = mock.patch.object(upstream, "cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(dexfile.set_path, dexfile.set_path(None))
+
+
+class FieldProjectionTests(UpstreamTestCase):
+
+    def test_parse_fields_always_keeps_name(self):
+        self.assertEqual(info_retrival.parse_fields("stats, types"), ("name", "types", "stats"))
+        self.assertEqual(info_retrival.parse_fields(None), info_retrival.SUMMARY_FIELDS)
+        with self.assertRaises(ValueError):
+            info_retrival.parse_fields(["speed"])
+
+    def test_basic_fields_need_a_single_request(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)) as get:
+            response = self.client.post(
+                "/api/agent/pokemon-info/", {"name": "Pikachu", "fields": ["types", "stats"]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(
+            response.json()["result"],
+            {"name": "pikachu", "types": ["electric"], "stats": {"hp": 35, "speed": 90}},
+        )
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["nope"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class PokemonRecordTests(UpstreamTestCase):
+    def test_record_matches_the_class_and_is_immutable(self):
+        record = info_retrival.PokemonRecord.from_document(PIKACHU)
+        pokemon = info_retrival.Pokemon("pikachu")
+        pokemon._load_basic_info(PIKACHU)
+        self.assertEqual(record.summary(), pokemon.get_summary(info_retrival.BASIC_FIELDS))
+        self.assertEqual(record.summary("stats"), {"name": "pikachu", "stats": {"hp": 35, "speed": 90}})
+        self.assertEqual((record.stat("speed"), record.stat("attack")), (90, None))
+        with self.assertRaises(AttributeError):
+            record.name = "raichu"
+        with self.assertRaises(ValueError):
+            record.summary(["flavor_text"])
+        other = info_retrival.PokemonRecord.from_document(json.loads(json.dumps(PIKACHU)))
+        self.assertIs(other.types, record.types)
+        self.assertEqual(other, record)
+
+    def test_only_small_vocabularies_are_shared_and_the_table_is_capped(self):
+        with mock.patch.object(info_retrival, "_shared", {}) as shared, \
+                mock.patch.object(info_retrival, "MAX_SHARED", 2):
+            record = info_retrival.PokemonRecord.from_document(PIKACHU)
+            self.assertEqual(set(shared), {record.types, record.abilities})
+            self.assertNotIn(record.moves, shared)
+            self.assertEqual(len(shared), 2)
+
+    def test_bulk_basic_fields_build_records(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)), \
+                mock.patch.object(info_retrival, "Pokemon") as pokemon_class:
+            response = self.client.post("/api/agent/bulk/", {"names": ["pikachu"], "fields": ["types"]}, format="json")
+        pokemon_class.assert_not_called()
+        self.assertEqual(response.json()["result"][0]["info"], {"name": "pikachu", "types": ["electric"]})
+
+
+class ColumnarEncodingTests(UpstreamTestCase):
+    def test_round_trip_keeps_failed_slots(self):
+        fields = info_retrival.parse_fields(["types", "stats"])
+        results = [
+            {"name": "pikachu", "info": {"name": "pikachu", "types": ["electric"], "stats": {"hp": 35, "speed": 90}}, "success": True},
+            {"name": "missingno", "error": "not found", "success": False},
+        ]
+        encoded = encoding.encode_columnar(results, fields)
+        self.assertEqual(encoded["schema"], ["name", "types"])
+        self.assertEqual(encoded["stats"], {"columns": ["hp", "speed"], "rows": [[35, 90], None]})
+        self.assertEqual(encoded["errors"], [{"index": 1, "name": "missingno", "error": "not found"}])
+        self.assertEqual(encoding.decode_columnar(encoded), [results[0]["info"], None])
+
+    def test_bulk_endpoint_columnar(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)):
+            response = self.client.post(
+                "/api/agent/bulk/", {"names": ["pikachu"], "fields": ["stats"], "format": "columnar"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["result"]["stats"]["rows"], [[35, 90]])
+
+    def test_bulk_endpoint_rejects_non_string_formats(self):
+        for fmt in (1, []):
+            response = self.client.post("/api/agent/bulk/", {"names": ["pikachu"], "format": fmt}, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("'format' must be a string", response.json()["error"])
+
+
+class CacheTests(UpstreamTestCase):
+    def test_second_lookup_is_served_from_cache(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)) as get:
+            for _ in range(2):
+                self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["types"]}, format="json")
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.cache.keys("pokemon/"), ["pokemon/pikachu"])
+
+    def test_listeners_see_refreshes(self):
+        events = []
+        self.cache.subscribe(lambda key, refreshed: events.append((key, refreshed)))
+        self.cache.set("type/fire", {})
+        self.cache.set("type/fire", {"id": 10})
+        self.assertEqual(events, [("type/fire", False), ("type/fire", True)])
+
+    def test_resource_key_accepts_absolute_urls(self):
+        self.assertEqual(upstream.resource_key("https://pokeapi.co/api/v2/evolution-chain/10/"), "evolution-chain/10")
+
+
+class BatchTests(UpstreamTestCase):
+    def fake_get(self, url, timeout=None):
+        time.sleep(0.02)
+        return fake_response(PIKACHU) if url.endswith("/pokemon/pikachu") else fake_response({}, 404)
+
+    def test_results_keep_request_order_with_per_item_errors(self):
+        operations = [
+            {"op": "info", "name": "pikachu", "fields": ["types"]},
+            {"op": "compare", "pokemon1": "pikachu", "pokemon2": "pikachu"},
+            {"op": "info", "name": "missingno"},
+            {"op": "evolve", "name": "pikachu"},
+        ]
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            response = self.client.post("/api/agent/batch/", {"operations": operations}, format="json")
+        results = response.json()["result"]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3])
+        self.assertEqual([r["success"] for r in results], [True, True, False, False])
+        self.assertEqual(results[0]["result"]["types"], ["electric"])
+        self.assertIn("Unknown op", results[3]["error"])
+        fetched = [c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list]
+        self.assertEqual(fetched.count("pokemon/pikachu"), 1)
+
+    def test_streams_ndjson(self):
+        operations = [{"op": "info", "name": "pikachu", "fields": ["types"]}, {"op": "strategy"}]
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get):
+            response = self.client.post("/api/agent/batch/", {"operations": operations, "stream": True}, format="json")
+            lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(sorted((r["index"], r["success"]) for r in lines), [(0, True), (1, False)])
+
+    def test_concurrent_misses_share_one_request(self):
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            threads = [threading.Thread(target=upstream.fetch_json, args=("pokemon/pikachu",)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(2)
+        self.assertEqual(get.call_count, 1)
+
+
+@override_settings(API_COMPRESS_MIN_BYTES=64)
+class ResponseEncodingTests(UpstreamTestCase):
+    URL = "/api/agent/pokemon-info/?name=pikachu&fields=types,abilities"
+    # Enough abilities for the body to compress well.
+    PAYLOAD = dict(PIKACHU, abilities=[{"ability": {"name": f"ability-{i}"}} for i in range(40)])
+
+    def get(self, url=URL, **headers):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(self.PAYLOAD)):
+            return self.client.get(url, **headers)
+
+    def test_compression_is_negotiated_above_the_threshold(self):
+        plain = self.get()
+        zipped = self.get(HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+        small = self.get("/api/agent/pokemon-info/?name=pikachu&fields=id", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(zipped.content)), plain.json())
+        self.assertFalse(small.has_header("Content-Encoding"))
+
+    def test_strong_etags_answer_conditional_gets(self):
+        etag = self.get()["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        not_modified = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((not_modified.status_code, not_modified["ETag"]), (304, etag))
+        self.assertEqual(not_modified.content, b"")
+
+        zipped_etag = self.get(HTTP_ACCEPT_ENCODING="gzip;q=1, br;q=0")["ETag"]
+        self.assertEqual(zipped_etag, etag[:-1] + '-gzip"')
+        revalidated = self.get(HTTP_ACCEPT_ENCODING="gzip, br;q=0", HTTP_IF_NONE_MATCH=zipped_etag)
+        self.assertEqual((revalidated.status_code, revalidated["ETag"]), (304, zipped_etag))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+
+class ResilienceTests(UpstreamTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(upstream, "breaker", upstream.CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        self.breaker = patcher.start()
+        self.addCleanup(patcher.stop)
+        sleep = mock.patch.object(upstream.time, "sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retries_transient_errors(self):
+        responses = [fake_response({}, 503), fake_response({}, 429), fake_response(PIKACHU)]
+        with mock.patch.object(upstream.requests, "get", side_effect=responses) as get:
+            self.assertEqual(upstream.fetch_json("pokemon/pikachu")["id"], 25)
+        self.assertEqual(get.call_count, 3)
+        self.assertIn("timeout", get.call_args.kwargs)
+
+    def test_not_found_is_not_retried(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response({}, 404)) as get:
+            with self.assertRaises(upstream.NotFoundError):
+                upstream.fetch_json("pokemon/missingno")
+        self.assertEqual(get.call_count, 1)
+
+    def test_open_breaker_fails_fast_or_serves_stale(self):
+        self.cache.ttl = 1
+        self.cache._memory["pokemon/pikachu"] = (0, PIKACHU)
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response({}, 500)) as get:
+            self.assertEqual(upstream.fetch_json("pokemon/pikachu"), PIKACHU)
+            with self.assertRaises(upstream.UpstreamError):
+                upstream.fetch_json("pokemon/eevee")
+            self.assertEqual(self.breaker.state, upstream.CircuitBreaker.OPEN)
+            calls = get.call_count
+            with self.assertRaises(upstream.CircuitOpenError):
+                upstream.fetch_json("pokemon/eevee")
+            self.assertEqual(upstream.fetch_json("pokemon/pikachu"), PIKACHU)
+        self.assertEqual(get.call_count, calls)
+
+    def test_rate_limit_waits_do_not_open_the_breaker(self):
+        bucket = rate_limit.PriorityTokenBucket(rate=0.01, burst=1)
+        bucket.acquire()
+        with mock.patch.object(upstream, "limiter", bucket), \
+                mock.patch.object(upstream.requests, "get") as get:
+            for _ in range(3):
+                with upstream.deadline(0.01), self.assertRaises(upstream.DeadlineExceeded):
+                    upstream.fetch_json("pokemon/pikachu")
+        get.assert_not_called()
+        self.assertEqual(self.breaker.state, upstream.CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.snapshot()["failures"], 0)
+
+    def test_deadline_expiring_in_backoff_does_not_open_the_breaker(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response({}, 503)) as get, \
+                mock.patch.object(upstream, "_backoff_delay", return_value=5):
+            for _ in range(3):
+                with upstream.deadline(1), self.assertRaises(upstream.DeadlineExceeded):
+                    upstream.fetch_json("pokemon/pikachu")
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(self.breaker.state, upstream.CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_is_released_by_unexpected_errors(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response({}, 500)):
+            for _ in range(2):
+                with self.assertRaises(upstream.UpstreamError):
+                    upstream.fetch_json("pokemon/pikachu")
+        self.breaker._opened_at -= 60
+        with mock.patch.object(upstream.requests, "get", side_effect=RuntimeError("bad body")):
+            with self.assertRaises(RuntimeError):
+                upstream.fetch_json("pokemon/pikachu")
+        self.assertEqual(self.breaker.state, upstream.CircuitBreaker.HALF_OPEN)
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)):
+            self.assertEqual(upstream.fetch_json("pokemon/pikachu")["id"], 25)
+        self.assertEqual(self.breaker.state, upstream.CircuitBreaker.CLOSED)
+
+    def test_expired_deadline_skips_the_request(self):
+        with mock.patch.object(upstream.requests, "get") as get:
+            with upstream.deadline(-1):
+                with self.assertRaises(upstream.DeadlineExceeded):
+                    upstream.fetch_json("pokemon/pikachu")
+        get.assert_not_called()
+
+
+class UnknownNameTests(UpstreamTestCase):
+    def test_404s_are_remembered(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response({}, 404)) as get:
+            for _ in range(3):
+                with self.assertRaises(Exception):
+                    PokemonComparer("pikachuu", "raichu").fetch_data("pikachuu")
+        self.assertEqual(get.call_count, 1)
+        self.cache.set("pokemon/pikachuu", PIKACHU)
+        self.assertFalse(self.cache.is_missing("pokemon/pikachuu"))
+
+    def test_complete_index_rejects_locally_with_suggestions(self):
+        self.cache.set(names.DEX_LISTING_KEY, {"results": [
+            {"name": "pikachu"}, {"name": "raichu"}, {"name": "charizard"}, {"name": "charmander"}]})
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)) as get:
+            counters = recommend_counters("pikachuu")
+            response = self.client.post("/api/agent/pokemon-info/", {"name": "Charzard"}, format="json")
+            self.assertEqual(info_retrival.Pokemon("25").fetch(["types"]).get_summary(["types"])["types"], ["electric"])
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(counters, {"error": "Pokémon not found in PokeAPI. Did you mean: pikachu?"})
+        self.assertTrue(response.json()["error"].endswith("Did you mean: charizard?"))
+
+    def test_trigram_suggestions(self):
+        index = names.NameIndex(["garchomp", "gabite", "gible", "mr-mime", "mime-jr"], complete=True)
+        self.assertEqual(index.suggest("garchmop")[0], "garchomp")
+        self.assertEqual(index.suggest("Mr Mime"), ["mr-mime"])
+        self.assertEqual(index.suggest("xyz"), [])
+        index.check("Garchomp")
+        with self.assertRaises(names.UnknownPokemonError):
+            index.check("garchompp")
+
+
+class NameResolutionTests(UpstreamTestCase):
+    LISTING = {"results": [
+        {"name": name, "url": f"https://pokeapi.co/api/v2/pokemon/{id}/"} for name, id in [
+            ("pikachu", 25), ("nidoran-f", 29), ("ninetales", 38), ("mr-mime", 122), ("charizard", 6),
+            ("deoxys-normal", 386), ("type-null", 772), ("charizard-mega-x", 10034),
+            ("ninetales-alola", 10104), ("deoxys-attack", 10001)]]}
+
+    def test_free_form_names_forms_and_numbers(self):
+        index = names.NameIndex([(e["name"], names._listed_id(e)) for e in self.LISTING["results"]], complete=True)
+        for typed, canonical in [
+                ("Mega Charizard X", "charizard-mega-x"), ("Alolan Ninetales", "ninetales-alola"),
+                ("mr mime", "mr-mime"), ("Mr. Mime", "mr-mime"), ("#025", "pikachu"), ("10034", "charizard-mega-x"),
+                ("Deoxys", "deoxys-normal"), ("Nidoran♀", "nidoran-f"), ("Type: Null", "type-null"),
+                ("Galarian Meowth", "meowth-galar"), ("pikachu", "pikachu")]:
+            self.assertEqual(index.resolve(typed), canonical, typed)
+        index.check("Alolan Ninetales")
+
+    def test_lookups_fetch_canonical_names(self):
+        self.cache.set(names.DEX_LISTING_KEY, self.LISTING)
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)) as get:
+            info_retrival.Pokemon("Mega Charizard X").fetch(["types"])
+            comparison = PokemonComparer("#25", "mr mime").compare()
+        fetched = [c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list]
+        self.assertEqual(fetched, ["pokemon/charizard-mega-x", "pokemon/pikachu", "pokemon/mr-mime"])
+        self.assertEqual((comparison["pokemon_1"], comparison["pokemon_2"]), ("pikachu", "mr-mime"))
+
+    def test_forms_read_their_species_text_and_family(self):
+        self.cache.set(names.DEX_LISTING_KEY, self.LISTING)
+        with mock.patch.object(upstream.requests, "get", side_effect=fake_get_from(FORMS)) as get:
+            summary = info_retrival.Pokemon("Mega Charizard X").fetch().get_summary()
+        fetched = sorted(c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list)
+        self.assertEqual(fetched, ["evolution-chain/2", "pokemon-species/charizard", "pokemon/charizard-mega-x"])
+        self.assertEqual((summary["name"], summary["flavor_text"]), ("charizard-mega-x", "Spits fire."))
+        self.assertEqual(summary["evolution_chain"], ["charmander", "charmeleon", "charizard"])
+        self.assertEqual(names.name_index().species_of("Mega Charizard X"), "charizard")
+
+    def test_index_takes_listings_and_species_without_rebuilding(self):
+        index = names.name_index()
+        self.assertFalse(index.complete)
+        self.cache.set(names.DEX_LISTING_KEY, self.LISTING)
+        self.cache.set("pokemon-species/giratina", {"name": "giratina", "varieties": [
+            {"is_default": True, "pokemon": {"name": "giratina-altered"}}]})
+        self.assertIs(names.name_index(), index)
+        self.assertTrue(index.complete)
+        self.assertEqual((index.resolve("Deoxys"), index.resolve("giratina")), ("deoxys-normal", "giratina-altered"))
+        index.check("Alolan Ninetales")
+
+
+class RateLimiterTests(TestCase):
+    def test_interactive_requests_overtake_queued_background_work(self):
+        bucket = rate_limit.PriorityTokenBucket(rate=10, burst=1)
+        bucket.acquire(rate_limit.INTERACTIVE)
+        order = []
+
+        def worker(name):
+            bucket.acquire(name)
+            order.append(name)
+
+        background = threading.Thread(target=worker, args=(rate_limit.BACKGROUND,))
+        background.start()
+        while bucket.snapshot()["classes"][rate_limit.BACKGROUND]["queue_depth"] == 0:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=worker, args=(rate_limit.INTERACTIVE,))
+        interactive.start()
+        background.join(2)
+        interactive.join(2)
+
+        self.assertEqual(order, [rate_limit.INTERACTIVE, rate_limit.BACKGROUND])
+        stats = bucket.snapshot()["classes"]
+        self.assertEqual(stats[rate_limit.BACKGROUND]["max_queue_depth"], 1)
+        self.assertGreater(stats[rate_limit.BACKGROUND]["max_wait_ms"], 0)
+
+    def test_acquire_times_out(self):
+        bucket = rate_limit.PriorityTokenBucket(rate=0.01, burst=1)
+        bucket.acquire()
+        with self.assertRaises(rate_limit.RateLimitTimeout):
+            bucket.acquire(timeout=0.01)
+
+
+class AsyncViewTests(UpstreamTestCase):
+    async def test_async_info_view_awaits_the_shared_client(self):
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            return httpx.Response(200, json=PIKACHU)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with mock.patch.object(upstream, "async_client", return_value=client), \
+                mock.patch.object(upstream.requests, "get") as blocking_get:
+            response = await self.async_client.post(
+                "/api/agent/async/pokemon-info/", {"name": "Pikachu", "fields": ["types"]},
+                content_type="application/json",
+            )
+        await client.aclose()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["result"], {"name": "pikachu", "types": ["electric"]})
+        self.assertEqual(paths, ["/api/v2/pokemon/pikachu"])
+        blocking_get.assert_not_called()
+
+    async def test_name_index_is_built_off_the_event_loop(self):
+        loops = []
+        build = names.name_index
+
+        def name_index():
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return build()
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=PIKACHU)))
+        with mock.patch.object(names, "name_index", side_effect=name_index), \
+                mock.patch.object(upstream, "async_client", return_value=client):
+            response = await self.async_client.post(
+                "/api/agent/async/compare/", {"pokemon1": "pikachu", "pokemon2": "pikachu"},
+                content_type="application/json",
+            )
+        await client.aclose()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(loops[0])
+
+    async def test_async_view_rejects_non_json(self):
+        response = await self.async_client.post("/api/agent/async/strategy/", "nope", content_type="text/plain")
+        self.assertEqual(response.status_code, 400)
+
+
+    @override_settings(MIDDLEWARE=["missing.Middleware"])
+    async def test_asgi_handler_builds_its_chain_from_async_api_middleware(self):
+        handler = asgi.AsyncAPIHandler()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=handler), base_url="http://test") as client:
+            response = await client.post("/api/agent/async/strategy/", content="nope")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+
+
+class RequestLoggingTests(UpstreamTestCase):
+    @override_settings(API_LOG_SAMPLE_RATE=0, API_LOG_MAX_PAYLOAD=16)
+    def test_successes_are_sampled_and_errors_always_logged(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)):
+            with self.assertLogs("api_logger") as logs:
+                self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["types"]}, format="json")
+                self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["nope" * 10]}, format="json")
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0].api
+        self.assertEqual((record["status"], record["reason"]), (400, "error"))
+        self.assertEqual(len(record["payload"]), 16)
+        self.assertTrue(record["payload_truncated"])
+
+    @override_settings(API_LOG_SAMPLE_RATE=0, API_LOG_MAX_PAYLOAD=4)
+    def test_body_is_only_read_by_the_view_or_for_a_logged_request(self):
+        def view(status, read):
+            def get_response(request):
+                if read:
+                    request.read()
+                return HttpResponse(status=status)
+            return APILoggingMiddleware(get_response)
+
+        unlogged = RequestFactory().post("/api/x/", data=b"abcdefgh", content_type="text/plain")
+        view(200, read=False)(unlogged)
+        self.assertFalse(unlogged._read_started)
+
+        with self.assertLogs("api_logger") as logs:
+            view(400, read=True)(RequestFactory().post("/api/x/", data=b"abcdefgh", content_type="text/plain"))
+            view(400, read=False)(RequestFactory().post("/api/x/", data=b"ijklmnop", content_type="text/plain"))
+        self.assertEqual(
+            [(r.api["payload"], r.api["payload_bytes"], r.api["payload_truncated"]) for r in logs.records],
+            [("abcd", 8, True), ("ijkl", 8, True)],
+        )
+
+
+class ProfilingTests(UpstreamTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(profiling.store.clear)
+
+    def test_requested_profile_is_stored_with_span_breakdown(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)):
+            response = self.client.post(
+                "/api/agent/pokemon-info/?profile=1", {"name": "pikachu", "fields": ["types"]}, format="json"
+            )
+            unprofiled = self.client.post("/api/agent/pokemon-info/", {"name": "eevee", "fields": ["types"]}, format="json")
+        self.assertNotIn("X-Profile-Id", unprofiled)
+        profile_id = response["X-Profile-Id"]
+
+        self.client.force_authenticate(User.objects.create_user("admin", is_staff=True))
+        detail = self.client.get(f"/api/admin/profiles/{profile_id}/").json()["result"]
+        self.assertEqual(detail["reason"], "requested")
+        self.assertEqual(detail["breakdown"][profiling.UPSTREAM]["count"], 1)
+        self.assertEqual([s["name"] for s in detail["spans"] if s["kind"] == profiling.UPSTREAM], ["pokemon/pikachu"])
+        self.assertTrue(detail["functions"])
+        listing = self.client.get("/api/admin/profiles/").json()["result"]["profiles"]
+        self.assertEqual([p["id"] for p in listing], [profile_id])
+
+    def test_server_timing_header_splits_stages(self):
+        with mock.patch.object(upstream.requests, "get", return_value=fake_response(PIKACHU)):
+            cold = self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["types"]}, format="json")
+            warm = self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["types"]}, format="json")
+        stages = lambda response: [m.split(";")[0] for m in response["Server-Timing"].split(", ")]  # noqa: E731
+        self.assertEqual(stages(cold), ["cache", "db", "rate_limit_wait", "upstream-pokemon", "compute", "total"])
+        self.assertEqual(stages(warm), ["cache", "db", "compute", "total"])
+
+    def test_profiles_require_staff_outside_debug(self):
+        self.assertEqual(self.client.get("/api/admin/profiles/").status_code, 403)
+
+
+def _ref(kind, name, ident):
+    return {"name": name, "url": f"https://pokeapi.co/api/v2/{kind}/{ident}/"}
+
+
+def _learned(move, *details):
+    return {"move": _ref("move", move, 1), "version_group_details": [
+        {"level_learned_at": level, "version_group": {"name": group}, "move_learn_method": {"name": method}}
+        for group, method, level in details
+    ]}
+
+
+def _synced_pokemon(ident, name, type_name, speed, moves=()):
+    return {
+        "id": ident, "name": name, "height": 4, "weight": 60,
+        "species": _ref("pokemon-species", name, ident),
+        "moves": [{"move": {"name": "tackle"}}, *moves],
+        "abilities": [{"slot": 1, "is_hidden": False, "ability": _ref("ability", "static", 9)}],
+        "types": [{"slot": 1, "type": _ref("type", type_name, 13)}],
+        "stats": [{"stat": {"name": stat}, "base_stat": speed if stat == "speed" else 50}
+                  for stat in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")],
+        "sprites": {"front_default": f"https://example.test/{ident}.png"},
+    }
+
+
+DEX = {
+    "pokemon/pikachu": _synced_pokemon(25, "pikachu", "electric", 90, [
+        _learned("thunder-shock", ("red-blue", "level-up", 1), ("scarlet-violet", "level-up", 1)),
+        _learned("thunderbolt", ("red-blue", "machine", 0), ("scarlet-violet", "machine", 0)),
+        _learned("volt-tackle", ("scarlet-violet", "egg", 0)),
+    ]),
+    "pokemon/raichu": _synced_pokemon(26, "raichu", "electric", 110, [
+        _learned("thunderbolt", ("scarlet-violet", "machine", 0), ("scarlet-violet", "level-up", 30)),
+    ]),
+    "pokemon-species/25": {
+        "id": 25, "name": "pikachu", "generation": {"name": "generation-i"},
+        "evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/10/"},
+        "flavor_text_entries": [{"flavor_text": "Stores electricity.", "language": {"name": "en"}}],
+    },
+    "pokemon-species/26": {
+        "id": 26, "name": "raichu", "generation": {"name": "generation-i"},
+        "evolves_from_species": {"name": "pikachu"},
+        "evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/10/"},
+        "flavor_text_entries": [],
+    },
+    "evolution-chain/10": {"id": 10, "chain": {
+        "species": {"name": "pikachu"},
+        "evolves_to": [{"species": {"name": "raichu"}, "evolves_to": []}],
+    }},
+    "type/electric": {"id": 13, "name": "electric", "damage_relations": {
+        "double_damage_from": [{"name": "ground"}], "half_damage_from": [{"name": "electric"}], "no_damage_from": [],
+    }},
+}
+
+
+# A form whose species is named differently, with the species' text and family.
+FORMS = {
+    "pokemon/charizard-mega-x": {**_synced_pokemon(10034, "charizard-mega-x", "fire", 100),
+                                 "species": _ref("pokemon-species", "charizard", 6)},
+    "pokemon-species/6": {
+        "id": 6, "name": "charizard",
+        "evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/2/"},
+        "varieties": [{"is_default": True, "pokemon": _ref("pokemon", "charizard", 6)},
+                      {"is_default": False, "pokemon": _ref("pokemon", "charizard-mega-x", 10034)}],
+        "flavor_text_entries": [{"flavor_text": "Spits fire.", "language": {"name": "en"}}],
+    },
+    "evolution-chain/2": {"id": 2, "chain": {"species": {"name": "charmander"}, "evolves_to": [
+        {"species": {"name": "charmeleon"}, "evolves_to": [{"species": {"name": "charizard"}, "evolves_to": []}]}]}},
+}
+FORMS["pokemon-species/charizard"] = FORMS["pokemon-species/6"]
+
+
+def fake_get_from(documents):
+    def get(url, timeout=None):
+        data = documents.get(url.rsplit("/api/v2/", 1)[1])
+        return fake_response(data) if data is not None else fake_response({}, 404)
+    return get
+
+
+@override_settings(POKEDEX_LOCAL_DB=True)
+class PokedexTestCase(UpstreamTestCase):
+    """Syncs Pokémon from the DEX fixtures into the test database."""
+
+    def fake_get(self, url, timeout=None):
+        data = DEX.get(url.rsplit("/api/v2/", 1)[1])
+        return fake_response(data) if data is not None else fake_response({}, 404)
+
+    def sync(self, *args):
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            call_command("sync_pokedex", *args, stdout=io.StringIO(), stderr=io.StringIO())
+        return get
+
+
+class PokedexSyncTests(PokedexTestCase):
+    def test_sync_is_incremental(self):
+        self.sync("pikachu")
+        get = self.sync("pikachu", "raichu")
+        fetched = [c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list]
+        # pikachu is already stored, the electric type with it, and the shared chain is cached.
+        self.assertEqual(sorted(fetched), ["pokemon-species/26", "pokemon/raichu"])
+        raichu = PokemonRow.objects.get(name="raichu")
+        self.assertEqual((raichu.national_id, raichu.speed), (26, 110))
+        self.assertEqual(list(raichu.types.values_list("name", flat=True)), ["electric"])
+        self.assertEqual(list(PokemonRow.objects.filter(speed__gte=100).values_list("name", flat=True)), ["raichu"])
+
+    def test_components_read_synced_rows_without_upstream(self):
+        self.sync("pikachu", "raichu")
+        self.cache.clear_memory()
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            summary = info_retrival.Pokemon("pikachu").fetch().get_summary()
+            comparison = PokemonComparer("pikachu", "raichu").compare()
+            counters = recommend_counters("raichu")
+        # Only the ground type, which no synced Pokémon has, falls back to PokeAPI.
+        self.assertEqual([c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list], ["type/ground"])
+        self.assertEqual(summary["stats"]["speed"], 90)
+        self.assertEqual(summary["flavor_text"], "Stores electricity.")
+        self.assertEqual(summary["evolution_chain"], ["pikachu", "raichu"])
+        self.assertEqual(comparison["stats_comparison"]["speed"]["winner"], "raichu")
+        self.assertEqual(counters["top_weaknesses"], {"ground": 2.0})
+
+
+class FlavorTextTests(PokedexTestCase):
+    SPECIES = {
+        "id": 6, "name": "charizard",
+        "varieties": [{"is_default": True, "pokemon": {"name": "charizard"}},
+                      {"is_default": False, "pokemon": {"name": "charizard-mega-x"}}],
+        "flavor_text_entries": [
+            {"flavor_text": "Spits fire that\nis hot.", "language": {"name": "en"}, "version": {"name": "red"}},
+            {"flavor_text": "Spits fire that\fis hot.", "language": {"name": "en"}, "version": {"name": "blue"}},
+            {"flavor_text": "Flies in search of foes.", "language": {"name": "en"}, "version": {"name": "x"}},
+            {"flavor_text": "Crache du feu.", "language": {"name": "fr"}, "version": {"name": "x"}},
+        ],
+    }
+
+    def test_index_by_language_and_version(self):
+        index = flavor_text.FlavorTextIndex([self.SPECIES])
+        self.assertEqual(index.text("charizard"), "Spits fire that is hot.")
+        self.assertEqual(index.text("6", version="x"), "Flies in search of foes.")
+        self.assertEqual(index.text("charizard-mega-x", language="FR"), "Crache du feu.")
+        self.assertIsNone(index.text("charizard", language="fr", version="red"))
+        self.assertIsNone(index.text("charizard", language="ja"))
+        self.assertEqual(len(index.texts), 3)
+        with self.assertRaises(LookupError):
+            index.text("pikachu")
+
+    def test_cached_species_are_indexed_once_stored(self):
+        self.cache.set("pokemon-species/charizard", self.SPECIES)
+        with mock.patch.object(upstream.requests, "get") as get:
+            summary = info_retrival.Pokemon("charizard", language="fr").fetch(["flavor_text"]).get_summary(["flavor_text"])
+        get.assert_not_called()
+        self.assertEqual(summary, {"name": "charizard", "flavor_text": "Crache du feu."})
+
+    def test_forms_fetch_their_species_on_a_cold_cache(self):
+        with mock.patch.object(upstream.requests, "get", side_effect=fake_get_from(FORMS)) as get:
+            text = flavor_text.lookup(flavor_text.cached_index(), "charizard-mega-x")
+        fetched = sorted(c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list)
+        self.assertEqual(fetched, ["pokemon-species/charizard", "pokemon/charizard-mega-x"])
+        self.assertEqual(text, "Spits fire.")
+
+    def test_species_resource_reads_the_index(self):
+        self.cache.set("pokemon-species/charizard", self.SPECIES)
+        with mock.patch.object(flavor_text, "DEFAULT_LANGUAGE", "fr"):
+            self.assertEqual(resources.species_resource("charizard")["flavor_text"], "Crache du feu.")
+
+    def test_view_serves_synced_text_without_upstream(self):
+        self.sync("pikachu")
+        self.cache.clear_memory()
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            english = self.client.post("/api/agent/pokemon-info/", {"name": "pikachu", "fields": ["flavor_text"]},
+                                       format="json").json()["result"]
+            german = self.client.get("/api/agent/pokemon-info/", {"name": "pikachu", "fields": "flavor_text",
+                                                                  "language": "de"}).json()["result"]
+        get.assert_not_called()
+        self.assertEqual(english["flavor_text"], "Stores electricity.")
+        self.assertIsNone(german["flavor_text"])
+
+
+class EvolutionGraphTests(PokedexTestCase):
+    TYROGUE = {"id": 47, "chain": {"species": {"name": "tyrogue"}, "evolution_details": [], "evolves_to": [
+        {"species": {"name": name}, "evolves_to": [], "evolution_details": [{
+            "trigger": {"name": "level-up"}, "min_level": 20, "relative_physical_stats": stats, "item": None,
+            "gender": None, "time_of_day": "", "needs_overworld_rain": False}]}
+        for name, stats in (("hitmonlee", 1), ("hitmonchan", -1), ("hitmontop", 0))]}}
+
+    def test_branches_are_all_kept(self):
+        graph = evolutions.EvolutionGraph([self.TYROGUE, DEX["evolution-chain/10"]])
+        self.assertEqual(graph.members("hitmontop"), ["tyrogue", "hitmonlee", "hitmonchan", "hitmontop"])
+        self.assertEqual(graph.final_stages("tyrogue"), ["hitmonlee", "hitmonchan", "hitmontop"])
+        self.assertEqual(graph.pre_evolutions("hitmontop"), ["tyrogue"])
+        self.assertEqual(graph.evolutions("tyrogue")[2], {"species": "hitmontop", "conditions": [
+            {"trigger": "level-up", "min_level": 20, "relative_physical_stats": 0}]})
+        report = graph.report("raichu")
+        self.assertEqual((report["stage"], report["fully_evolved"], report["chain_id"]), (2, True, 10))
+        self.assertEqual(report["tree"]["evolves_to"][0]["species"], "raichu")
+
+    def test_family_members_share_one_chain(self):
+        self.cache.set("pokemon-species/pikachu", DEX["pokemon-species/25"])
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            pikachu = info_retrival.Pokemon("pikachu").fetch(["evolution_chain"]).get_summary(["evolution_chain"])
+            raichu = info_retrival.Pokemon("raichu").fetch(["evolution_chain"]).get_summary(["evolution_chain"])
+        self.assertEqual([c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list], ["evolution-chain/10"])
+        self.assertEqual(pikachu["evolution_chain"], raichu["evolution_chain"])
+
+    def test_forms_find_their_species_family(self):
+        with mock.patch.object(upstream.requests, "get", side_effect=fake_get_from(FORMS)) as get:
+            report = evolutions.evolution_report(evolutions.cached_graph(), "Mega Charizard X")
+            again = evolutions.evolution_report(evolutions.cached_graph(), "charizard-mega-x")
+        fetched = sorted(c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list)
+        self.assertEqual(fetched, ["evolution-chain/2", "pokemon-species/charizard", "pokemon/charizard-mega-x"])
+        self.assertEqual((report["pokemon"], report["species"], report["stage"]), ("charizard-mega-x", "charizard", 3))
+        self.assertEqual(report["family"], ["charmander", "charmeleon", "charizard"])
+        self.assertEqual(again, report)
+
+    def test_view_reads_synced_chains(self):
+        self.sync("pikachu", "raichu")
+        with mock.patch.object(upstream.requests, "get") as get:
+            result = self.client.get("/api/agent/evolutions/", {"name": "Pikachu"}).json()["result"]
+        get.assert_not_called()
+        self.assertEqual(result["final_stages"], ["raichu"])
+        self.assertEqual(result["evolves_to"], [{"species": "raichu", "conditions": []}])
+
+
+class DexFileTests(PokedexTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        dexfile.set_path(os.path.join(directory.name, "pokedex.bin"))
+
+    def test_sync_writes_a_file_components_read_without_queries(self):
+        self.sync("pikachu", "raichu")
+        self.cache.clear_memory()
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get, self.assertNumQueries(0):
+            summary = info_retrival.Pokemon("Raichu").fetch(["types", "abilities", "stats", "sprite"]).get_summary()
+            comparison = PokemonComparer("pikachu", "raichu").compare()
+        get.assert_not_called()
+        self.assertEqual(summary["stats"]["speed"], 110)
+        self.assertEqual((summary["types"], summary["abilities"]), (["electric"], ["static"]))
+        self.assertEqual(comparison["stats_comparison"]["speed"]["winner"], "raichu")
+        self.assertEqual(recommend_counters("pikachu")["top_weaknesses"], {"ground": 2.0})
+
+    def test_lookups_and_type_documents(self):
+        path = dexfile.path()
+        dexfile.write(path, [DEX["pokemon/pikachu"], DEX["pokemon/raichu"]], [{**DEX["type/electric"], "pokemon": [
+            {"pokemon": {"name": "pikachu"}}, {"pokemon": {"name": "zapdos"}}]}])
+        dex = dexfile.DexFile(path)
+        self.assertEqual(len(dex), 2)
+        self.assertEqual(dex.get(" PIKACHU ").moves, ("tackle", "thunder-shock", "thunderbolt", "volt-tackle"))
+        self.assertEqual(dex.get("raichu").species, "raichu")
+        self.assertIsNone(dex.get("zapdos"))
+        electric = dex.type_document("electric")
+        self.assertEqual(electric["damage_relations"]["double_damage_from"], [{"name": "ground"}])
+        self.assertEqual([p["pokemon"]["name"] for p in electric["pokemon"]], ["pikachu", "zapdos"])
+        # Named in a relation but never fetched: the caller falls back to the repository.
+        self.assertIsNone(dex.type_document("ground"))
+
+
+class SearchTests(PokedexTestCase):
+    def search(self, **params):
+        return self.client.post("/api/agent/search/", params, format="json")
+
+    def test_filters_text_and_pagination(self):
+        self.sync("pikachu", "raichu")
+        fast = self.search(types=["electric"], min_stats={"speed": 100}).json()["result"]
+        self.assertEqual([r["name"] for r in fast["results"]], ["raichu"])
+        self.assertEqual(fast["results"][0]["evolution_stage"], 2)
+        self.assertEqual(self.search(text="electr").json()["result"]["results"][0]["name"], "pikachu")
+        self.assertEqual(self.search(fully_evolved=False, generation="i").json()["result"]["total"], 1)
+        first = self.search(sort="-speed", limit=1).json()["result"]
+        self.assertEqual((first["total"], first["next_offset"], first["results"][0]["name"]), (2, 1, "raichu"))
+        second = self.search(sort="-speed", limit=1, offset=first["next_offset"]).json()["result"]
+        self.assertEqual((second["next_offset"], second["results"][0]["name"]), (None, "pikachu"))
+
+    def test_index_follows_syncs_and_rejects_bad_params(self):
+        self.sync("pikachu")
+        self.assertEqual(self.search().json()["result"]["indexed"], 1)
+        self.sync("raichu")
+        self.assertEqual(self.search().json()["result"]["indexed"], 2)
+        self.assertEqual(self.search(sort="weight").status_code, 400)
+        self.assertEqual(self.search(min_stats={"luck": 1}).status_code, 400)
+
+
+    def test_cached_index_takes_stored_documents_one_by_one(self):
+        self.cache.set("pokemon/pikachu", DEX["pokemon/pikachu"])
+        index = search.cached_index()
+        self.assertEqual(index.records[25]["evolution_stage"], None)
+        with mock.patch.object(search, "records_from_cache", side_effect=AssertionError("rebuilt")):
+            self.cache.set("pokemon-species/25", DEX["pokemon-species/25"])
+            # PokeAPI links each chain member to its species.
+            self.cache.set("evolution-chain/10", {"id": 10, "chain": {
+                "species": _ref("pokemon-species", "pikachu", 25), "evolves_to": []}})
+            self.cache.set("pokemon/raichu", DEX["pokemon/raichu"])
+            self.assertIs(search.cached_index(), index)
+        self.assertEqual(len(index), 2)
+        self.assertEqual((index.records[25]["generation"], index.records[25]["evolution_stage"]), (1, 1))
+        self.assertEqual(index.search(text="stor")["results"][0]["name"], "pikachu")
+        self.assertEqual([r["name"] for r in index.search(sort="-speed")["results"]], ["raichu", "pikachu"])
+        self.assertIn("raichu", speed_tiers.current(index).base)
+
+
+class WarmCacheTests(PokedexTestCase):
+    def fake_get(self, url, timeout=None):
+        # The tools read species by name, which the DEX fixtures only key by ID.
+        path = url.rsplit("/api/v2/", 1)[1]
+        named = {f"pokemon-species/{DEX[key]['name']}": key for key in DEX if key.startswith("pokemon-species/")}
+        return super().fake_get(url.replace(path, named.get(path, path)), timeout)
+
+    def warm(self, *args):
+        out = io.StringIO()
+        with mock.patch.object(upstream.requests, "get", side_effect=self.fake_get) as get:
+            call_command("warm_cache", "--no-types", *args, stdout=out, stderr=io.StringIO())
+        return [c.args[0].rsplit("/api/v2/", 1)[1] for c in get.call_args_list], out.getvalue()
+
+    def access_log(self, *requests):
+        lines = ["[INFO] 2024-01-01 api_logger [API] POST /api/agent/pokemon-info/ | Payload: {}"]
+        lines += [json.dumps({"path": path, "status": status, "payload": payload}) for path, status, payload in requests]
+        with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as f:
+            f.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_warms_most_requested_and_resumes(self):
+        log = self.access_log(
+            ("/api/agent/compare/", 200, json.dumps({"pokemon1": "Pikachu", "pokemon2": "raichu"})),
+            ("/api/agent/batch/", 200, json.dumps({"operations": [{"op": "pokemon_info", "name": "pikachu"}]})),
+            ("/api/agent/pokemon-info/", 200, '{"name": "pikachu", "fields": ["na'),  # truncated payload
+            ("/api/agent/pokemon-info/", 404, json.dumps({"name": "raichu"})),
+            ("/api/agent/pokemon-info/", 200, json.dumps({"name": "missingno"})),
+        )
+        fetched, out = self.warm("--top", "1", "--access-log", log)
+        self.assertEqual(sorted(fetched), ["evolution-chain/10", "pokemon-species/pikachu", "pokemon/pikachu",
+                                           "type/electric"])
+        self.assertIn("Warmed 1 of 1 targets", out)
+        # Already cached documents are skipped; names that do not exist are reported, not failed.
+        fetched, out = self.warm("--top", "3", "--access-log", log)
+        self.assertEqual(sorted(fetched), ["pokemon-species/raichu", "pokemon/missingno", "pokemon/raichu"])
+        self.assertIn("Not found upstream: missingno", out)
+        self.assertEqual(self.cache.get("pokemon/raichu")["id"], 26)
+
+    def test_logged_spellings_count_under_canonical_names(self):
+        log = self.access_log(
+            ("/api/agent/pokemon-info/", 200, json.dumps({"name": "Mega Charizard X"})),
+            ("/api/agent/pokemon-info/", 200, json.dumps({"name": "charizard-mega-x"})),
+            ("/api/agent/compare/", 200, json.dumps({"pokemon1": "Mr. Mime", "pokemon2": "mr mime"})),
+        )
+        self.assertEqual(warmup.access_log_names([log]), {"charizard-mega-x": 2, "mr-mime": 2})
+
+    def test_generations_warm_default_varieties(self):
+        self.cache.set("generation/3", {"pokemon_species": [
+            _ref("pokemon-species", "deoxys", 386), _ref("pokemon-species", "torchic", 255)]})
+        self.cache.set(names.DEX_LISTING_KEY, {"results": [
+            _ref("pokemon", "torchic", 255), _ref("pokemon", "deoxys-normal", 386),
+            _ref("pokemon", "deoxys-attack", 10001)]})
+        with mock.patch.object(upstream.requests, "get") as get:
+            self.assertEqual(warmup.generation_names(3), ["torchic", "deoxys-normal"])
+        get.assert_not_called()
+
+
+class LearnsetTests(PokedexTestCase):
+    def learnset(self, **params):
+        return self.client.get("/api/agent/learnset/", params)
+
+    def test_learners_filter_by_version_group_and_method(self):
+        self.sync("pikachu", "raichu")
+        learners = lambda **params: self.learnset(**params).json()["result"]["pokemon"]  # noqa: E731
+        self.assertEqual(learners(moves="thunderbolt"), ["pikachu", "raichu"])
+        self.assertEqual(learners(moves="Thunderbolt", version_group="red-blue"), ["pikachu"])
+        self.assertEqual(learners(moves="thunderbolt", method="level-up"), ["raichu"])
+        self.assertEqual(learners(moves="thunderbolt,volt-tackle"), ["pikachu"])
+        self.assertEqual(self.learnset(moves="splash").status_code, 400)
+        self.assertEqual(self.learnset(moves="thunderbolt", version_group="gold").status_code, 400)
+
+    def test_moves_of_pokemon(self):
+        self.sync("pikachu", "raichu")
+        result = self.client.post("/api/agent/learnset/", {"name": "pikachu", "version_group": "scarlet-violet"},
+                                  format="json").json()["result"]
+        self.assertEqual(result["moves"], [
+            {"name": "thunder-shock", "methods": ["level-up"], "level": 1},
+            {"name": "thunderbolt", "methods": ["machine"], "level": None},
+            {"name": "volt-tackle", "methods": ["egg"], "level": None},
+        ])
+        raichu = self.learnset(name="raichu").json()["result"]
+        self.assertEqual([(m["name"], m["methods"]) for m in raichu["moves"]],
+                         [("thunderbolt", ["level-up", "machine"]), ("tackle", [])])
+
+
+    def test_cached_index_updates_one_pokemon_at_a_time(self):
+        self.cache.set("pokemon/raichu", DEX["pokemon/raichu"])
+        index = learnsets.cached_index()
+        with mock.patch.object(learnsets, "learnsets_from_cache", side_effect=AssertionError("rebuilt")):
+            self.cache.set("pokemon/pikachu", DEX["pokemon/pikachu"])
+            self.assertIs(learnsets.cached_index(), index)
+            self.assertEqual(index.learners_of("thunderbolt")["pokemon"], ["pikachu", "raichu"])
+            self.cache.set("pokemon/pikachu", {**DEX["pokemon/pikachu"], "moves": [{"move": {"name": "tackle"}}]})
+        self.assertEqual(index.learners_of("thunderbolt")["pokemon"], ["raichu"])
+        self.assertEqual(index.learners_of("thunderbolt", method="machine")["pokemon"], ["raichu"])
+        self.assertEqual(index.learners_of("tackle")["pokemon"], ["pikachu", "raichu"])
+        self.assertEqual(len(index), 2)
+
+
+class SpeedTierTests(PokedexTestCase):
+    def tier(self, **params):
+        return self.client.get("/api/agent/speed-tiers/", params)
+
+    def test_tiers_place_pokemon_across_spreads(self):
+        self.sync("pikachu")
+        self.assertEqual(self.tier(name="pikachu").json()["result"]["indexed"], 1)
+        self.sync("raichu")
+        pikachu = self.tier(name="pikachu").json()["result"]
+        self.assertEqual((pikachu["speed"], pikachu["indexed"]), (306, 2))
+        self.assertEqual(pikachu["outsped_by"], {"count": 1, "nearest": [{"name": "raichu", "speed": 350}]})
+        self.assertEqual(pikachu["outspeeds"]["count"], 0)
+        scarf = self.tier(name="pikachu", spread="scarf", versus="max").json()["result"]
+        self.assertEqual((scarf["speed"], scarf["outspeeds"]["count"]), (459, 2))
+        self.assertEqual([p["name"] for p in scarf["outspeeds"]["nearest"]], ["raichu", "pikachu"])
+        slow = self.tier(name="raichu", spread="min", level=50).json()["result"]
+        self.assertEqual((slow["speed"], slow["outspeeds"]["count"], slow["ties"]), (103, 1, []))
+        self.assertEqual(self.tier(name="pikachu", spread="+2").status_code, 400)
+        self.assertEqual(self.tier(name="pikachu", level=42).status_code, 400)
+
+    def test_updates_move_only_changed_pokemon(self):
+        tiers = speed_tiers.SpeedTierIndex(levels=(100,))
+        self.assertEqual(tiers.update({"pikachu": 90, "raichu": 110, "jolteon": 130}), (0, 3))
+        self.assertEqual(tiers.update({"pikachu": 90, "raichu": 130, "jolteon": 130, "persian": 115}), (1, 2))
+        speeds, names = tiers.tiers[(100, "max")]
+        self.assertEqual(names, ["pikachu", "persian", "jolteon", "raichu"])
+        self.assertEqual(speeds, sorted(speeds))
+        self.assertEqual(tiers.query("jolteon")["ties"], ["raichu"])
+        self.assertEqual(tiers.query("electrode", base_speed=150)["outspeeds"]["count"], 4)
+
+
+class DamageTests(TestCase):
+    GARCHOMP = {"hp": 108, "attack": 130, "defense": 95, "special-attack": 80, "special-defense": 85, "speed": 102}
+    HEATRAN = {"hp": 91, "attack": 90, "defense": 106, "special-attack": 130, "special-defense": 106, "speed": 77}
+
+    def test_stats_and_damage_match_the_games(self):
+        chomp = damage.calc_stats(self.GARCHOMP, damage.parse_spread({"evs": {"atk": 252}, "nature": "adamant"}))
+        heatran = damage.calc_stats(self.HEATRAN, damage.parse_spread())
+        self.assertEqual((chomp["hp"], chomp["attack"], chomp["special-attack"]), (357, 394, 176))
+        self.assertEqual((heatran["hp"], heatran["defense"]), (323, 248))
+        # 252+ Atk Garchomp Earthquake vs. 0 HP / 0 Def Heatran: 684-808, a guaranteed OHKO.
+        rolls = damage.damage_rolls(100, 100, chomp["attack"], heatran["defense"], True, 4.0)
+        self.assertEqual((rolls[0, 0], rolls[0, -1]), (684, 808))
+        one_hit, two_hits, best, worst = damage.ko_chances(rolls, [heatran["hp"]])
+        self.assertEqual((one_hit[0], best[0], worst[0]), (1.0, 1, 1))
+
+    def test_rows_are_independent_and_doubles_spread_is_reduced(self):
+        rolls = damage.damage_rolls(50, [100, 100, 100], 150, 100, False, [1.0, 1.0, 0.0], [False, True, False])
+        self.assertEqual(rolls.shape, (3, 16))
+        self.assertEqual(rolls[1, -1], damage._modify(rolls[0, -1], 3072))
+        self.assertEqual(rolls[2].max(), 0)
+        one_hit, two_hits, best, worst = damage.ko_chances(rolls, [2 * int(rolls[0, 0]) - 1] * 3)
+        self.assertEqual((one_hit[0], two_hits[0], two_hits[2]), (0.0, 1.0, 0.0))
+        with self.assertRaises(ValueError):
+            damage.parse_spread({"evs": {"hp": 252, "atk": 252, "def": 252}})
+
+    def test_default_moves_are_capped_and_skips_reported(self):
+        learned = [{"move": {"name": f"move-{i}"}, "version_group_details": [
+            {"level_learned_at": i, "move_learn_method": {"name": "level-up"}}]} for i in range(40)]
+        learned.append({"move": {"name": "earthquake"}, "version_group_details": [
+            {"level_learned_at": 0, "move_learn_method": {"name": "machine"}}]})
+        pokemon = {**_synced_pokemon(445, "garchomp", "ground", 102), "moves": learned}
+        names, left_out = damage.default_moves(pokemon)
+        self.assertEqual((names[:3], len(names), left_out), (["earthquake", "move-39", "move-38"], 24, 17))
+
+        async def move(name):
+            if name == "move-39":
+                raise upstream.DeadlineExceeded("Deadline exceeded")
+            return {"name": name, "power": 100, "damage_class": {"name": "physical"}, "type": {"name": "ground"}}
+        repository = mock.Mock(pokemon_async=mock.AsyncMock(return_value=pokemon), move_async=move,
+                               type_async=mock.AsyncMock(return_value=DEX["type/electric"]))
+        with mock.patch.object(damage, "get_repository", return_value=repository):
+            report = async_to_sync(damage.matchup_damage)("garchomp", "garchomp")
+        self.assertEqual((report["pokemon1"]["moves_evaluated"], report["pokemon1"]["moves_left_out"]), (23, 17))
+        self.assertEqual(report["pokemon2"]["moves_failed"], ["move-39"])
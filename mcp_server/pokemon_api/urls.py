@@ -1,9 +1,23 @@
 from django.urls import path
-from .views import PokemonInfoView,ComparePokemonView,StrategyAPIView,TeamCompositionAPIView
+from .async_views import AsyncPokemonInfoView,AsyncComparePokemonView,AsyncStrategyView,AsyncTeamCompositionView
+from .views import PokemonInfoView,BulkPokemonView,BatchView,SearchView,LearnsetView,SpeedTierView,EvolutionView,ComparePokemonView,StrategyAPIView,TeamCompositionAPIView,ProfileListView,ProfileDetailView
 
 urlpatterns = [
     path('agent/pokemon-info/', PokemonInfoView.as_view(), name='agent-pokemon-info'),
+    path('agent/bulk/', BulkPokemonView.as_view(), name='agent-bulk-pokemon'),
+    path('agent/batch/', BatchView.as_view(), name='agent-batch'),
+    path('agent/search/', SearchView.as_view(), name='agent-search'),
+    path('agent/learnset/', LearnsetView.as_view(), name='agent-learnset'),
+    path('agent/speed-tiers/', SpeedTierView.as_view(), name='agent-speed-tiers'),
+    path('agent/evolutions/', EvolutionView.as_view(), name='agent-evolutions'),
     path('agent/compare/', ComparePokemonView.as_view(), name='agent-compare-pokemon'),
     path('agent/strategy/', StrategyAPIView.as_view(), name='agent-strategy'),
     path('agent/team/', TeamCompositionAPIView.as_view(), name='agent-team'),
+    # Async variants for ASGI deployments (same contract as above)
+    path('agent/async/pokemon-info/', AsyncPokemonInfoView.as_view(), name='agent-async-pokemon-info'),
+    path('agent/async/compare/', AsyncComparePokemonView.as_view(), name='agent-async-compare-pokemon'),
+    path('agent/async/strategy/', AsyncStrategyView.as_view(), name='agent-async-strategy'),
+    path('agent/async/team/', AsyncTeamCompositionView.as_view(), name='agent-async-team'),
+    path('admin/profiles/', ProfileListView.as_view(), name='admin-profiles'),
+    path('admin/profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='admin-profile-detail'),
 ]
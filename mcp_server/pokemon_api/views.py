@@ -1,32 +1,196 @@
 import logging
+from concurrent.futures import as_completed
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .src.components.info_retrival import Pokemon
+from rest_framework.permissions import BasePermission, IsAdminUser
+from django.conf import settings
+from .src.components.info_retrival import Pokemon, fetch_summary, parse_fields
 from .src.components.comparison_module import PokemonComparer
 from .src.components.strategy import recommend_counters
 from .src.components.team_composition import generate_team_with_gemini
+from .src.components import rate_limit, profiling
+from .src.components.encoding import encode_columnar, parse_format, COLUMNAR_FORMAT
+from .src.components.search import SEARCH_PARAMS
+from .src.components.learnsets import pokemon_moves
+from .src.components import evolutions, speed_tiers
+from .search import pokedex_index
+from .learnsets import learnset_index
+from .flavor_text import flavor_text_index
+from .evolutions import evolution_graph
+from .renderers import dumps
+from . import batch
+
+MAX_BULK_NAMES = 20
 
 logger = logging.getLogger(__name__)
 
-class PokemonInfoView(APIView):
+class LookupView(APIView):
+    """
+    A read-only lookup: POST takes a JSON body and GET the same fields as
+    query parameters, so GET responses can be revalidated with their ETag.
+    Subclasses define lookup(data).
+    """
+
+    def get(self, request):
+        return self.lookup(request.query_params)
+
     def post(self, request):
-        name = request.data.get("name", "").lower()
+        return self.lookup(request.data)
+
+class PokemonInfoView(LookupView):
+    def lookup(self, data):
+        name = data.get("name", "").lower()
         if not name:
             return Response({"error": "Missing 'name'"}, status=status.HTTP_400_BAD_REQUEST)
-        info = Pokemon(name)
         try:
-            info.fetch_basic_info()
-            info.fetch_flavor_text()
-            return Response({"result": info.get_summary()}, status=status.HTTP_200_OK)
+            fields = parse_fields(data.get("fields"))
+        except ValueError as ve:
+            return Response({"error": str(ve)}, status=status.HTTP_400_BAD_REQUEST)
+        info = Pokemon(name, language=data.get("language"), version=data.get("version"),
+                       flavor_texts=flavor_text_index(), evolution_graph=evolution_graph())
+        try:
+            info.fetch(fields)
+            return Response({"result": info.get_summary(fields)}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception("Error in PokemonInfoView")
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class ComparePokemonView(APIView):
+class BulkPokemonView(APIView):
     def post(self, request):
-        name1 = request.data.get("pokemon1")
-        name2 = request.data.get("pokemon2")
+        names = request.data.get("names")
+        if not names or not isinstance(names, list):
+            return Response({"error": "'names' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(names) > MAX_BULK_NAMES:
+            return Response(
+                {"error": f"Cannot lookup more than {MAX_BULK_NAMES} Pokemon at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            fields = parse_fields(request.data.get("fields"))
+            fmt = parse_format(request.data.get("format"))
+        except ValueError as ve:
+            return Response({"error": str(ve)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        with rate_limit.priority(rate_limit.BULK):
+            for name in names:
+                try:
+                    results.append({"name": name, "info": fetch_summary(str(name).lower(), fields), "success": True})
+                except Exception as e:
+                    logger.warning(f"Failed to fetch info for {name}: {e}")
+                    results.append({"name": name, "error": str(e), "success": False})
+
+        if fmt == COLUMNAR_FORMAT:
+            results = encode_columnar(results, fields)
+        return Response({"result": results}, status=status.HTTP_200_OK)
+
+class SearchView(APIView):
+    """
+    Filters, sorts and paginates the whole dex from the in-memory search index:
+    types, abilities, generation, evolution stage, stat ranges and full-text
+    search over flavor text.
+    """
+
+    def post(self, request):
+        params = {key: request.data[key] for key in SEARCH_PARAMS if request.data.get(key) is not None}
+        try:
+            return Response({"result": pokedex_index().search(**params)}, status=status.HTTP_200_OK)
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class LearnsetView(LookupView):
+    """
+    "name": the moves a Pokémon learns; "moves": the Pokémon that learn all of
+    them. Both narrow to a "version_group" and/or learn "method".
+    """
+
+    def lookup(self, data):
+        name, moves = data.get("name"), data.get("moves") or data.get("move")
+        if not name and not moves:
+            return Response({"error": "Give a Pokémon 'name' or a list of 'moves'"}, status=status.HTTP_400_BAD_REQUEST)
+        filters = {"version_group": data.get("version_group"), "method": data.get("method")}
+        try:
+            if name:
+                result = pokemon_moves(learnset_index(), name, **filters)
+            else:
+                result = learnset_index().learners_of(moves, **filters)
+            return Response({"result": result}, status=status.HTTP_200_OK)
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception("Error in LearnsetView")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class SpeedTierView(LookupView):
+    """
+    Where "name" falls in the dex's speed tiers: who it outspeeds, who outspeeds
+    it and who it ties, at a "spread" (min, neutral, max, scarf, +1) against the
+    dex at "versus" (default: the same spread), at "level" 100 or 50.
+    """
+
+    def lookup(self, data):
+        name = data.get("name")
+        if not name:
+            return Response({"error": "Missing 'name'"}, status=status.HTTP_400_BAD_REQUEST)
+        params = {key: data[key] for key in ("spread", "versus", "level", "limit") if data.get(key) is not None}
+        try:
+            result = speed_tiers.speed_tier(speed_tiers.current(pokedex_index()), name, **params)
+            return Response({"result": result}, status=status.HTTP_200_OK)
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception("Error in SpeedTierView")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class EvolutionView(LookupView):
+    """
+    "name"'s whole evolution family, branches included: its stage, what it
+    evolves from and into with the conditions, its pre-evolutions, the fully
+    evolved Pokémon it can become and the full tree.
+    """
+
+    def lookup(self, data):
+        name = data.get("name")
+        if not name:
+            return Response({"error": "Missing 'name'"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = evolutions.evolution_report(evolution_graph(), name)
+            return Response({"result": result}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception("Error in EvolutionView")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class BatchView(APIView):
+    """
+    Runs a list of heterogeneous operations concurrently. Results come back in
+    request order, or with "stream": true as NDJSON lines in completion order
+    (each line carries its "index").
+    """
+
+    def post(self, request):
+        operations = request.data.get("operations")
+        if not operations or not isinstance(operations, list):
+            return Response({"error": "'operations' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > batch.MAX_BATCH_OPERATIONS:
+            return Response(
+                {"error": f"Cannot run more than {batch.MAX_BATCH_OPERATIONS} operations at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with rate_limit.priority(rate_limit.BULK):
+            futures = batch.submit_batch(operations)
+
+        if request.data.get("stream"):
+            lines = (dumps(future.result()) + b"\n" for future in as_completed(futures))
+            return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        return Response({"result": [future.result() for future in futures]}, status=status.HTTP_200_OK)
+
+class ComparePokemonView(LookupView):
+    def lookup(self, data):
+        name1 = data.get("pokemon1")
+        name2 = data.get("pokemon2")
         if not name1 or not name2:
             return Response(
                 {"error": "Both 'pokemon1' and 'pokemon2' are required."},
@@ -39,9 +203,9 @@ class ComparePokemonView(APIView):
             logger.exception("Error in ComparePokemonView")
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class StrategyAPIView(APIView):
-    def post(self, request):
-        name = request.data.get("name")
+class StrategyAPIView(LookupView):
+    def lookup(self, data):
+        name = data.get("name")
         if not name:
             return Response({"error": "Missing 'name'"}, status=status.HTTP_400_BAD_REQUEST)
         try:
@@ -63,3 +227,31 @@ class TeamCompositionAPIView(APIView):
             return Response({"error": str(ve)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
             return Response({"error": "An unexpected error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class IsAdminOrDebug(BasePermission):
+    """Staff users only, except while DEBUG is on."""
+
+    def has_permission(self, request, view):
+        return settings.DEBUG or IsAdminUser().has_permission(request, view)
+
+class ProfileListView(APIView):
+    permission_classes = [IsAdminOrDebug]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            return Response({"error": "'limit' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        target = request.query_params.get("target")
+        profiles = [p.summary() for p in profiling.store.recent(limit, target)]
+        return Response({"result": {"sample_rate": profiling.SAMPLE_RATE, "profiles": profiles}}, status=status.HTTP_200_OK)
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsAdminOrDebug]
+
+    def get(self, request, profile_id):
+        record = profiling.store.get(profile_id)
+        if record is None:
+            return Response({"error": f"Profile '{profile_id}' not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"result": record.to_dict()}, status=status.HTTP_200_OK)
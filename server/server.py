@@ -1,16 +1,26 @@
 import sys
+import json
+import functools
 from typing import List, Dict, Any, Optional
 import httpx
 import os
 import asyncio
 import logging
 from mcp.server.fastmcp import FastMCP
+from mcp.server.lowlevel import NotificationOptions
+from mcp.server.stdio import stdio_server
+from mcp.shared.exceptions import McpError
+from mcp import types
 from dotenv import load_dotenv
 
-from src.components.info_retrival import Pokemon
+from src.components.info_retrival import Pokemon, fetch_summary, parse_fields
 from src.components.comparison_module import PokemonComparer
 from src.components.team_composition import generate_team_with_gemini
 from src.components.strategy import recommend_counters
+from src.components.cache import cache
+from src.components import upstream, rate_limit, profiling
+from src.components import damage, dexfile, evolutions, learnsets, resources, search, speed_tiers, warmup
+from src.components.encoding import encode_columnar, parse_format, COLUMNAR_FORMAT
 
 # Load environment variables
 load_dotenv()
@@ -22,25 +32,75 @@ logger = logging.getLogger(__name__)
 # Initialize FastMCP server
 mcp = FastMCP("Pokemon MCP Server")
 
+# Upper bound on the upstream work a single tool call may do
+TOOL_DEADLINE_SECONDS = float(os.getenv("POKE_TOOL_DEADLINE", "25"))
+
+def with_deadline(func):
+    """Propagate a per-call deadline to every upstream fetch made by the tool."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with upstream.deadline(TOOL_DEADLINE_SECONDS):
+            return await func(*args, **kwargs)
+    return wrapper
+
+def _meta_flag(name: str) -> bool:
+    """True when the client set `"_meta": {name: true}` on the tools/call request."""
+    try:
+        meta = mcp.get_context().request_context.meta
+    except ValueError:
+        return False
+    return bool(meta is not None and getattr(meta, name, False))
+
+def with_profiling(func):
+    """
+    Profile the call when requested or sampled; the result then carries its profile_id.
+    With `"_meta": {"timing": true}` the result also carries a `_timing` breakdown.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with profiling.timing() as timing:
+            with profiling.profile(f"mcp:{func.__name__}", requested=_meta_flag("profile")) as record:
+                result = await func(*args, **kwargs)
+        if isinstance(result, dict):
+            if record is not None:
+                result["profile_id"] = record.id
+            if _meta_flag("timing"):
+                result["_timing"] = timing.to_dict()
+        return result
+    return wrapper
+
 @mcp.tool()
-async def get_pokemon_info(name: str) -> Dict[str, Any]:
+@with_profiling
+@with_deadline
+async def get_pokemon_info(name: str, fields: Optional[List[str]] = None, language: Optional[str] = None,
+                           version: Optional[str] = None) -> Dict[str, Any]:
     """
     Get detailed information about a Pokemon including stats, types, abilities, and description.
     
     Args:
         name: The name of the Pokemon to look up
+        fields: Optional subset of fields to return (e.g. ["types", "stats"]). Only the
+            upstream data needed for these fields is fetched. Defaults to all fields.
+        language: Language of the description, as a PokeAPI language code (e.g. "en", "ja", "fr").
+            Defaults to the server's POKE_LANGUAGE, "en" unless configured.
+        version: Game version the description is taken from (e.g. "scarlet", "red").
+            Defaults to the first one PokeAPI lists in that language.
     """
     if not name:
         return {"error": "Missing 'name'", "success": False}
     
     try:
-        # Create Pokemon instance and fetch data
-        pokemon = Pokemon(name.lower())
-        pokemon.fetch_basic_info()
-        pokemon.fetch_flavor_text()
+        fields = parse_fields(fields)
+    except ValueError as ve:
+        return {"error": str(ve), "success": False}
+    
+    try:
+        # Create Pokemon instance and fetch only the data the projection needs
+        pokemon = Pokemon(name.lower(), language=language, version=version)
+        pokemon.fetch(fields)
         
         return {
-            "result": pokemon.get_summary(),
+            "result": pokemon.get_summary(fields),
             "success": True
         }
     except Exception as e:
@@ -51,6 +111,8 @@ async def get_pokemon_info(name: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
+@with_profiling
+@with_deadline
 async def compare_pokemon(pokemon1: str, pokemon2: str) -> Dict[str, Any]:
     """
     Compare two Pokemon across various stats and analyze type matchups.
@@ -82,6 +144,8 @@ async def compare_pokemon(pokemon1: str, pokemon2: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
+@with_profiling
+@with_deadline
 async def get_pokemon_counters(name: str) -> Dict[str, Any]:
     """
     Get strategic counters and recommendations for a specific Pokemon.
@@ -108,6 +172,8 @@ async def get_pokemon_counters(name: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
+@with_profiling
+@with_deadline
 async def generate_pokemon_team(description: str) -> Dict[str, Any]:
     """
     Generate a Pokemon team using Gemini AI based on a description.
@@ -143,14 +209,31 @@ async def generate_pokemon_team(description: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-async def analyze_pokemon_matchup(pokemon1: str, pokemon2: str, battle_format: str = "singles") -> Dict[str, Any]:
+@with_profiling
+@with_deadline
+async def analyze_pokemon_matchup(
+    pokemon1: str,
+    pokemon2: str,
+    battle_format: str = "singles",
+    spread: Optional[Dict[str, Any]] = None,
+    moves1: Optional[List[str]] = None,
+    moves2: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """
-    Analyze the matchup between two Pokemon in detail, including type effectiveness and stat comparison.
+    Analyze the matchup between two Pokemon in detail: type effectiveness, stat comparison,
+    and the damage range and KO chances of each side's best moves against the other.
     
     Args:
         pokemon1: Name of the first Pokemon
         pokemon2: Name of the second Pokemon
-        battle_format: Battle format context (singles, doubles, etc.)
+        battle_format: "singles" or a Smogon tier like "ou" (level 100), or "doubles"/"vgc"
+            (level 50, spread moves do 0.75x)
+        spread: Optional level/EVs/IVs/nature used for both sides, e.g.
+            {"level": 50, "evs": {"attack": 252, "speed": 252}, "ivs": {"speed": 0}, "nature": "adamant"}.
+            Defaults to no EVs, 31 IVs and a neutral nature.
+        moves1: Moves to evaluate for the first Pokemon (default: up to 24 of the moves it learns,
+            common attacks first; the result lists moves_failed and counts moves_left_out)
+        moves2: Moves to evaluate for the second Pokemon (same default as moves1)
     """
     if not pokemon1 or not pokemon2:
         return {
@@ -158,6 +241,14 @@ async def analyze_pokemon_matchup(pokemon1: str, pokemon2: str, battle_format: s
             "success": False
         }
     
+    try:
+        damage_report = await damage.matchup_damage(
+            pokemon1, pokemon2, battle_format=battle_format, spread=spread, moves1=moves1, moves2=moves2
+        )
+    except (TypeError, ValueError, upstream.UpstreamError) as e:
+        # UpstreamError covers an open circuit and a deadline running out mid-fetch.
+        return {"error": str(e), "success": False}
+    
     try:
         # Get detailed comparison
         comparer = PokemonComparer(pokemon1, pokemon2)
@@ -170,9 +261,10 @@ async def analyze_pokemon_matchup(pokemon1: str, pokemon2: str, battle_format: s
         return {
             "result": {
                 "comparison": comparison_result,
+                "damage": damage_report,
                 "pokemon1_counters": pokemon1_counters,
                 "pokemon2_counters": pokemon2_counters,
-                "battle_format": battle_format
+                "battle_format": damage_report["format"]
             },
             "success": True
         }
@@ -184,6 +276,8 @@ async def analyze_pokemon_matchup(pokemon1: str, pokemon2: str, battle_format: s
         }
 
 @mcp.tool()
+@with_profiling
+@with_deadline
 async def get_team_analysis(team_members: List[str]) -> Dict[str, Any]:
     """
     Analyze a complete Pokemon team for strengths, weaknesses, and synergies.
@@ -212,22 +306,23 @@ async def get_team_analysis(team_members: List[str]) -> Dict[str, Any]:
             "recommended_improvements": []
         }
         
-        # Get info for each team member
-        for pokemon_name in team_members:
-            try:
-                pokemon = Pokemon(pokemon_name.lower())
-                pokemon.fetch_basic_info()
-                pokemon.fetch_flavor_text()
-                team_analysis["team_members"].append({
-                    "name": pokemon_name,
-                    "info": pokemon.get_summary()
-                })
-            except Exception as e:
-                logger.warning(f"Could not fetch info for {pokemon_name}: {e}")
-                team_analysis["team_members"].append({
-                    "name": pokemon_name,
-                    "error": str(e)
-                })
+        # Get info for each team member (queued behind interactive lookups)
+        with rate_limit.priority(rate_limit.BULK):
+            for pokemon_name in team_members:
+                try:
+                    pokemon = Pokemon(pokemon_name.lower())
+                    pokemon.fetch_basic_info()
+                    pokemon.fetch_flavor_text()
+                    team_analysis["team_members"].append({
+                        "name": pokemon_name,
+                        "info": pokemon.get_summary()
+                    })
+                except Exception as e:
+                    logger.warning(f"Could not fetch info for {pokemon_name}: {e}")
+                    team_analysis["team_members"].append({
+                        "name": pokemon_name,
+                        "error": str(e)
+                    })
         
         # Get counters for the entire team concept
         team_description = f"A team consisting of: {', '.join(team_members)}"
@@ -252,12 +347,17 @@ async def get_team_analysis(team_members: List[str]) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-async def bulk_pokemon_lookup(names: List[str]) -> Dict[str, Any]:
+@with_profiling
+@with_deadline
+async def bulk_pokemon_lookup(names: List[str], fields: Optional[List[str]] = None, format: str = "rows") -> Dict[str, Any]:
     """
     Get information for multiple Pokemon at once.
     
     Args:
         names: List of Pokemon names to look up
+        fields: Optional subset of fields to return for each Pokemon (e.g. ["types", "stats"])
+        format: "rows" (one dict per Pokemon) or "columnar" (shared schema with parallel
+            value arrays and a packed stats table; much smaller for large batches)
     """
     if not names or len(names) == 0:
         return {
@@ -271,26 +371,34 @@ async def bulk_pokemon_lookup(names: List[str]) -> Dict[str, Any]:
             "success": False
         }
     
+    try:
+        fields = parse_fields(fields)
+        format = parse_format(format)
+    except ValueError as ve:
+        return {"error": str(ve), "success": False}
+    
     try:
         results = []
         
-        for name in names:
-            try:
-                pokemon = Pokemon(name.lower())
-                pokemon.fetch_basic_info()
-                pokemon.fetch_flavor_text()
-                results.append({
-                    "name": name,
-                    "info": pokemon.get_summary(),
-                    "success": True
-                })
-            except Exception as e:
-                logger.warning(f"Failed to fetch info for {name}: {e}")
-                results.append({
-                    "name": name,
-                    "error": str(e),
-                    "success": False
-                })
+        # Bulk traffic yields upstream capacity to interactive lookups
+        with rate_limit.priority(rate_limit.BULK):
+            for name in names:
+                try:
+                    results.append({
+                        "name": name,
+                        "info": fetch_summary(name.lower(), fields),
+                        "success": True
+                    })
+                except Exception as e:
+                    logger.warning(f"Failed to fetch info for {name}: {e}")
+                    results.append({
+                        "name": name,
+                        "error": str(e),
+                        "success": False
+                    })
+        
+        if format == COLUMNAR_FORMAT:
+            results = encode_columnar(results, fields)
         
         return {
             "result": results,
@@ -304,6 +412,158 @@ async def bulk_pokemon_lookup(names: List[str]) -> Dict[str, Any]:
         }
 
 @mcp.tool()
+@with_profiling
+@with_deadline
+async def search_pokemon(
+    types: Optional[List[str]] = None,
+    abilities: Optional[List[str]] = None,
+    generation: Optional[str] = None,
+    evolution_stage: Optional[int] = None,
+    fully_evolved: Optional[bool] = None,
+    min_stats: Optional[Dict[str, int]] = None,
+    max_stats: Optional[Dict[str, int]] = None,
+    text: Optional[str] = None,
+    sort: str = "id",
+    offset: int = 0,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    Search the whole Pokedex by type, ability, generation, evolution stage, base stats and
+    flavor text, e.g. water types with speed >= 100: types=["water"], min_stats={"speed": 100}.
+    
+    Searches the Pokemon cached locally (`manage.py sync_pokedex` caches the whole dex);
+    `indexed` in the result says how many that is.
+    
+    Args:
+        types: The Pokemon must have every listed type
+        abilities: The Pokemon must have an ability containing one of these terms (e.g. "levitate")
+        generation: Generation number or roman numeral (e.g. 4 or "iv")
+        evolution_stage: 1 for base forms, 2 for first evolutions, 3 for second evolutions
+        fully_evolved: Only Pokemon that can (False) or cannot (True) evolve further
+        min_stats: Inclusive lower bounds, e.g. {"speed": 100, "total": 500}
+        max_stats: Inclusive upper bounds, same keys as min_stats
+        text: Words the English flavor text must contain (prefix match, e.g. "electr")
+        sort: "id", "name", a stat or "total"; prefix with "-" for descending (e.g. "-speed")
+        offset: Pagination offset; use `next_offset` from the previous page
+        limit: Page size (max 100)
+    """
+    try:
+        result = search.cached_index().search(
+            types=types, abilities=abilities, generation=generation, evolution_stage=evolution_stage,
+            fully_evolved=fully_evolved, min_stats=min_stats, max_stats=max_stats, text=text,
+            sort=sort, offset=offset, limit=limit,
+        )
+    except (TypeError, ValueError) as e:
+        return {"error": str(e), "success": False}
+    return {"result": result, "success": True}
+
+@mcp.tool()
+@with_profiling
+@with_deadline
+async def get_move_learners(
+    moves: List[str], version_group: Optional[str] = None, method: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    List the Pokemon that learn every one of the given moves, e.g. moves=["earthquake", "stealth-rock"].
+    
+    Searches the Pokemon cached locally (`manage.py sync_pokedex` caches the whole dex);
+    `indexed` in the result says how many that is.
+    
+    Args:
+        moves: Move names (e.g. "earthquake" or "Stealth Rock")
+        version_group: Only learnable in this version group (e.g. "scarlet-violet")
+        method: Only learnable by this method: "level-up", "machine", "egg", "tutor", ...
+    """
+    try:
+        result = learnsets.cached_index().learners_of(moves, version_group=version_group, method=method)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e), "success": False}
+    return {"result": result, "success": True}
+
+@mcp.tool()
+@with_profiling
+@with_deadline
+async def get_pokemon_moves(
+    name: str, version_group: Optional[str] = None, method: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    List every move a Pokemon learns with the methods it learns it by (and its level-up level).
+    
+    Args:
+        name: The name of the Pokemon
+        version_group: Only moves learnable in this version group (e.g. "scarlet-violet")
+        method: Only moves learnable by this method: "level-up", "machine", "egg", "tutor", ...
+    """
+    if not name:
+        return {"error": "Missing 'name'", "success": False}
+    try:
+        result = learnsets.pokemon_moves(learnsets.cached_index(), name, version_group=version_group, method=method)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e), "success": False}
+    except Exception as e:
+        logger.exception("Error in get_pokemon_moves")
+        return {"error": str(e), "success": False}
+    return {"result": result, "success": True}
+
+@mcp.tool()
+@with_profiling
+@with_deadline
+async def get_speed_tiers(
+    name: str, spread: str = "max", versus: Optional[str] = None, level: int = 100, limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Place a Pokemon in the speed tiers of the whole dex: what it outspeeds, what outspeeds it
+    (nearest first, with totals) and what it speed-ties.
+    
+    Ranks against the Pokemon cached locally (`manage.py sync_pokedex` caches the whole dex).
+    
+    Args:
+        name: The name of the Pokemon
+        spread: Its investment: "min" (0 IVs, -Spe), "neutral" (252 EVs), "max" (252 EVs, +Spe),
+                "scarf" or "+1" (max Speed x1.5)
+        versus: The spread assumed for every other Pokemon (defaults to `spread`)
+        level: 100 or 50
+        limit: How many of the nearest Pokemon to list on each side
+    """
+    if not name:
+        return {"error": "Missing 'name'", "success": False}
+    try:
+        tiers = speed_tiers.current(search.cached_index())
+        result = speed_tiers.speed_tier(tiers, name, spread=spread, versus=versus, level=level, limit=limit)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e), "success": False}
+    except Exception as e:
+        logger.exception("Error in get_speed_tiers")
+        return {"error": str(e), "success": False}
+    return {"result": result, "success": True}
+
+@mcp.tool()
+@with_profiling
+@with_deadline
+async def get_evolutions(name: str) -> Dict[str, Any]:
+    """
+    Get a Pokemon's whole evolution family, branches included (e.g. all of Eevee's evolutions),
+    with how each evolution is triggered.
+    
+    Returns its stage, what it evolves from and into (with conditions such as level, item or
+    friendship), its pre-evolutions, the fully evolved Pokemon it can become and the full tree.
+    Forms such as "Alolan Ninetales" report their species' family.
+    
+    Args:
+        name: The name of the Pokemon
+    """
+    if not name:
+        return {"error": "Missing 'name'", "success": False}
+    try:
+        result = evolutions.evolution_report(evolutions.cached_graph(), name)
+    except Exception as e:
+        logger.exception("Error in get_evolutions")
+        return {"error": str(e), "success": False}
+    return {"result": result, "success": True}
+
+@mcp.tool()
+@with_profiling
+@with_deadline
 async def get_competitive_analysis(pokemon_name: str, format: str = "OU") -> Dict[str, Any]:
     """
     Get competitive analysis for a Pokemon including counters and team suggestions.
@@ -347,11 +607,21 @@ async def get_competitive_analysis(pokemon_name: str, format: str = "OU") -> Dic
         }
 
 @mcp.tool()
+@with_deadline
 async def health_check() -> Dict[str, Any]:
     """
     Check if the server and all components are working properly.
     """
     try:
+        # Fail fast while PokeAPI is known to be degraded
+        if upstream.breaker.state == upstream.CircuitBreaker.OPEN:
+            return {
+                "status": "degraded",
+                "error": "PokeAPI circuit breaker is open; serving cached data only.",
+                "upstream": upstream.health(),
+                "success": False
+            }
+        
         # Test basic Pokemon lookup
         test_pokemon = Pokemon("pikachu")
         test_pokemon.fetch_basic_info()
@@ -372,6 +642,7 @@ async def health_check() -> Dict[str, Any]:
                 "basic_lookup": "passed",
                 "comparison": "passed"
             },
+            "upstream": upstream.health(),
             "success": True
         }
     except Exception as e:
@@ -379,9 +650,151 @@ async def health_check() -> Dict[str, Any]:
         return {
             "status": "unhealthy",
             "error": str(e),
+            "upstream": upstream.health(),
             "success": False
         }
 
+@mcp.tool()
+@with_deadline
+async def get_profiles(profile_id: Optional[str] = None, tool: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    """
+    Admin: retrieve stored profiles of tool calls.
+    
+    A call is profiled when the client sets `"_meta": {"profile": true}` on the request or
+    when it is sampled (POKE_PROFILE_SAMPLE_RATE). Profiled results carry a `profile_id`.
+    
+    Args:
+        profile_id: Return this profile in full (spans and top functions by cumulative time)
+        tool: Only list profiles of this tool
+        limit: Maximum number of profile summaries to list (newest first)
+    """
+    if profile_id:
+        record = profiling.store.get(profile_id)
+        if record is None:
+            return {"error": f"Profile '{profile_id}' not found", "success": False}
+        return {"result": record.to_dict(), "success": True}
+    
+    target = f"mcp:{tool}" if tool else None
+    return {
+        "result": {
+            "sample_rate": profiling.SAMPLE_RATE,
+            "profiles": [p.summary() for p in profiling.store.recent(limit, target)]
+        },
+        "success": True
+    }
+
+# MCP resources served from the local cache
+RESOURCE_PAGE_SIZE = int(os.getenv("POKE_RESOURCE_PAGE_SIZE", "100"))
+
+# Resource URI -> sessions subscribed to updates, and every session that has
+# listed resources (they receive list-changed notifications).
+_resource_subscriptions: Dict[str, set] = {}
+_listing_sessions: set = set()
+_notification_loop: Optional[asyncio.AbstractEventLoop] = None
+
+@mcp.resource("pokemon://{name}", mime_type="application/json")
+def pokemon_resource(name: str) -> str:
+    """Pokemon stats, types, abilities and sprite."""
+    return json.dumps(resources.pokemon_resource(name))
+
+@mcp.resource("species://{name}", mime_type="application/json")
+def species_resource(name: str) -> str:
+    """Species data: generation, varieties, evolution chain ID and English flavor text."""
+    return json.dumps(resources.species_resource(name))
+
+@mcp.resource("type://{name}", mime_type="application/json")
+def type_resource(name: str) -> str:
+    """Type damage relations and the Pokemon of that type."""
+    return json.dumps(resources.type_resource(name))
+
+@mcp.resource("evolution-chain://{chain_id}", mime_type="application/json")
+def evolution_chain_resource(chain_id: str) -> str:
+    """Full (branching) evolution tree of a chain."""
+    return json.dumps(resources.evolution_chain_resource(chain_id))
+
+def _remember_session():
+    global _notification_loop
+    _notification_loop = asyncio.get_running_loop()
+    session = mcp.get_context().session
+    _listing_sessions.add(session)
+    return session
+
+@mcp._mcp_server.list_resources()
+async def list_resources(request: types.ListResourcesRequest) -> types.ListResourcesResult:
+    """List a page of pokemon:// resources over the whole dex (cursor is the page offset)."""
+    cursor = request.params.cursor if request.params else None
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise McpError(types.ErrorData(code=types.INVALID_PARAMS, message=f"Invalid cursor: {cursor!r}"))
+    _remember_session()
+    names = resources.dex_names()
+    page = names[offset:offset + RESOURCE_PAGE_SIZE]
+    next_offset = offset + RESOURCE_PAGE_SIZE
+    return types.ListResourcesResult(
+        resources=[
+            types.Resource(uri=f"pokemon://{n}", name=n, mimeType="application/json")
+            for n in page
+        ],
+        nextCursor=str(next_offset) if next_offset < len(names) else None,
+    )
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    session = _remember_session()
+    _resource_subscriptions.setdefault(str(uri), set()).add(session)
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    session = mcp.get_context().session
+    _resource_subscriptions.get(str(uri), set()).discard(session)
+
+async def _send_resource_notifications(uri: Optional[str], list_changed: bool):
+    if uri:
+        for session in list(_resource_subscriptions.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                _resource_subscriptions[uri].discard(session)
+    if list_changed:
+        for session in list(_listing_sessions):
+            try:
+                await session.send_resource_list_changed()
+            except Exception:
+                _listing_sessions.discard(session)
+
+def _on_cache_write(key: str, refreshed: bool):
+    """Cache listener: notify subscribers when a cached resource is refreshed."""
+    loop = _notification_loop
+    if not refreshed or loop is None or loop.is_closed():
+        return
+    uri = resources.key_to_uri(key)
+    list_changed = key == resources.DEX_LISTING_KEY
+    if uri or list_changed:
+        loop.call_soon_threadsafe(
+            lambda: loop.create_task(_send_resource_notifications(uri, list_changed))
+        )
+
+cache.subscribe(_on_cache_write)
+
+def initialization_options():
+    """
+    The capabilities the server advertises: FastMCP's, with resource
+    list-changed notifications and resource subscriptions, which it serves.
+    The SDK only derives listChanged from NotificationOptions and always
+    reports subscribe=False, so the resources capability is given explicitly.
+    """
+    options = mcp._mcp_server.create_initialization_options(NotificationOptions(resources_changed=True))
+    options.capabilities.resources = types.ResourcesCapability(subscribe=True, listChanged=True)
+    return options
+
+async def run_stdio():
+    """mcp.run() over stdio, advertising initialization_options()."""
+    async with stdio_server() as (read_stream, write_stream):
+        await mcp._mcp_server.run(read_stream, write_stream, initialization_options())
+
 # Server startup and management
 async def startup():
     """Initialize server components"""
@@ -397,29 +810,62 @@ async def startup():
             print(f" Health check issues: {health.get('error', 'Unknown')}", file=sys.stderr)
     
         print("\n Available MCP Tools:", file=sys.stderr)
-        print("  • get_pokemon_info(name) - Get detailed Pokemon information", file=sys.stderr)
+        print("  • get_pokemon_info(name, fields) - Get detailed Pokemon information", file=sys.stderr)
         print("  • compare_pokemon(pokemon1, pokemon2) - Compare two Pokemon", file=sys.stderr)
         print("  • get_pokemon_counters(name) - Get counter recommendations", file=sys.stderr)
+        print("  • search_pokemon(types, abilities, min_stats, text, ...) - Search the Pokedex", file=sys.stderr)
+        print("  • get_move_learners(moves, version_group, method) - Pokemon that learn given moves", file=sys.stderr)
+        print("  • get_pokemon_moves(name, version_group, method) - Full learnset of a Pokemon", file=sys.stderr)
+        print("  • get_speed_tiers(name, spread, versus, level) - What a Pokemon outspeeds and ties", file=sys.stderr)
+        print("  • get_evolutions(name) - Whole evolution family with branches and conditions", file=sys.stderr)
         print("  • generate_pokemon_team(description) - Generate team with AI", file=sys.stderr)
-        print("  • analyze_pokemon_matchup(pokemon1, pokemon2, format) - Detailed matchup analysis", file=sys.stderr)
+        print("  • analyze_pokemon_matchup(pokemon1, pokemon2, battle_format, spread) - Matchup with damage calcs", file=sys.stderr)
         print("  • get_team_analysis(team_members) - Analyze complete team", file=sys.stderr)
-        print("  • bulk_pokemon_lookup(names) - Look up multiple Pokemon", file=sys.stderr)
+        print("  • bulk_pokemon_lookup(names, fields, format) - Look up multiple Pokemon", file=sys.stderr)
         print("  • get_competitive_analysis(name, format) - Competitive analysis", file=sys.stderr)
         print("  • health_check() - Check server status", file=sys.stderr)
+        print("  • get_profiles(profile_id, tool, limit) - Admin: stored call profiles", file=sys.stderr)
+        print("\n Available MCP Resources (served from the local cache):", file=sys.stderr)
+        print("  • pokemon://{name}, species://{name}, type://{name}, evolution-chain://{id}", file=sys.stderr)
         
     except Exception as e:
         print(f" Server startup failed: {e}", file=sys.stderr)
         raise
 
+def warm_cache_main(argv):
+    """`python server.py warm-cache ...`: fill the shared cache before serving."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="server.py warm-cache", description=warmup.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    warmup.add_arguments(parser)
+    try:
+        failed = warmup.run(vars(parser.parse_args(argv)), print, lambda message: print(message, file=sys.stderr))
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failed else 0
+
+def build_dexfile_main(argv):
+    """`python server.py build-dexfile ...`: write the Pokédex file from the cached documents."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="server.py build-dexfile", description=dexfile.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    dexfile.add_arguments(parser)
+    return 0 if dexfile.run(vars(parser.parse_args(argv)), dexfile.documents_from_cache(), print) else 1
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["warm-cache"]:
+        sys.exit(warm_cache_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["build-dexfile"]:
+        sys.exit(build_dexfile_main(sys.argv[2:]))
+
     def main():
         try:
             # Run startup in an async context
             asyncio.run(startup())
             print(" Pokemon MCP Server ready!", file=sys.stderr)
             
-            # Use the synchronous run method - FastMCP will handle the event loop
-            mcp.run()
+            asyncio.run(run_stdio())
             
         except KeyboardInterrupt:
             print("\nReceived shutdown signal...", file=sys.stderr)
@@ -1,17 +1,25 @@
-import requests
+import asyncio
+from . import dexfile, names
+from .upstream import UpstreamError
+from .repository import get_repository
 
 class PokemonComparer:
     def __init__(self, name1, name2):
-        self.name1 = name1.lower()
-        self.name2 = name2.lower()
+        self.name1 = names.resolve(name1)
+        self.name2 = names.resolve(name2)
         self.pokemon_data = {}
 
     def fetch_data(self, name):
-        url = f"https://pokeapi.co/api/v2/pokemon/{name}"
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception(f"Pokémon '{name}' not found")
-        return response.json()
+        try:
+            return get_repository().pokemon(name)
+        except UpstreamError as e:
+            raise Exception(f"Pokémon '{name}' not found{names.hint(e)}") from e
+
+    async def fetch_data_async(self, name):
+        try:
+            return await get_repository().pokemon_async(name)
+        except UpstreamError as e:
+            raise Exception(f"Pokémon '{name}' not found{names.hint(e)}") from e
 
     def extract_info(self, data):
         stats = {s['stat']['name']: s['base_stat'] for s in data['stats']}
@@ -23,10 +31,32 @@ class PokemonComparer:
             "abilities": abilities,
         }
 
+    def dex_info(self, name):
+        """extract_info() from the Pokédex file, or None when it does not hold the Pokémon."""
+        entry = dexfile.lookup(name)
+        if entry is None:
+            return None
+        return {
+            "stats": dict(entry.stats),
+            "types": list(entry.types),
+            "abilities": list(entry.abilities),
+        }
+
     def compare(self):
-        data1 = self.extract_info(self.fetch_data(self.name1))
-        data2 = self.extract_info(self.fetch_data(self.name2))
+        data1 = self.dex_info(self.name1) or self.extract_info(self.fetch_data(self.name1))
+        data2 = self.dex_info(self.name2) or self.extract_info(self.fetch_data(self.name2))
+        return self._build_comparison(data1, data2)
+
+    async def compare_async(self):
+        """Async twin of compare(); Pokémon not in the Pokédex file are fetched concurrently."""
+        names = (self.name1, self.name2)
+        infos = [self.dex_info(name) for name in names]
+        fetched = iter(await asyncio.gather(
+            *[self.fetch_data_async(name) for name, info in zip(names, infos) if info is None]))
+        data1, data2 = [info or self.extract_info(next(fetched)) for info in infos]
+        return self._build_comparison(data1, data2)
 
+    def _build_comparison(self, data1, data2):
         comparison = {
             "pokemon_1": self.name1,
             "pokemon_2": self.name2,
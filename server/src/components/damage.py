@@ -0,0 +1,302 @@
+"""
+Damage ranges and KO chances, computed for many moves at once.
+
+Stats follow the games' formulas from base stats, level, EVs, IVs and nature.
+Damage follows the generation V+ formula in the games' order of operations:
+base damage, the 0.75 spread-move reduction in doubles, the sixteen random
+rolls (85-100%), STAB and type effectiveness, rounding as the games do at each
+step. Every (attacker, defender, move) combination is one row of a NumPy
+array, so both sides of a matchup with dozens of moves each are evaluated in a
+single vectorized pass.
+
+Not modelled: critical hits, abilities, items, weather, terrain, stat stages,
+burns, screens, multi-hit moves and moves without a fixed base power.
+"""
+import asyncio
+import numpy as np
+from .names import resolve
+from .rate_limit import BULK, priority
+from .repository import get_repository
+from .upstream import NotFoundError
+
+STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+STAT_ALIASES = {"atk": "attack", "def": "defense", "spa": "special-attack", "spd": "special-defense", "spe": "speed"}
+# Smogon's singles tiers all play at level 100.
+FORMATS = {"singles": "singles", "doubles": "doubles", "vgc": "doubles",
+           **{tier: "singles" for tier in ("ubers", "ou", "uu", "ru", "nu", "pu")}}
+DEFAULT_LEVELS = {"singles": 100, "doubles": 50}
+# Targets of moves that hit more than one Pokémon, and so do 0.75x damage in doubles.
+SPREAD_TARGETS = frozenset({"all-opponents", "all-other-pokemon", "all-pokemon"})
+MAX_EVS, MAX_TOTAL_EVS, MAX_IV = 252, 510, 31
+ROLLS = np.arange(85, 101, dtype=np.int64)
+# Moves evaluated per side when none are given. A Pokémon learns 100+ moves,
+# each a document to fetch on a cold cache, and most are weak or never used.
+DEFAULT_MOVES = 24
+# Damaging moves common in competitive play, tried before the rest of a learnset.
+COMMON_ATTACKS = frozenset({
+    "earthquake", "close-combat", "flare-blitz", "outrage", "stone-edge", "iron-head", "knock-off", "u-turn",
+    "volt-switch", "ice-beam", "thunderbolt", "flamethrower", "surf", "hydro-pump", "scald", "psychic",
+    "psyshock", "shadow-ball", "dark-pulse", "dragon-pulse", "draco-meteor", "focus-blast", "aura-sphere",
+    "energy-ball", "giga-drain", "leaf-storm", "sludge-bomb", "sludge-wave", "earth-power", "fire-blast",
+    "overheat", "heat-wave", "thunder", "blizzard", "moonblast", "dazzling-gleam", "play-rough", "hurricane",
+    "air-slash", "brave-bird", "bug-buzz", "x-scissor", "leech-life", "first-impression", "extreme-speed",
+    "double-edge", "body-slam", "return", "facade", "hyper-voice", "boomburst", "wild-charge", "thunder-punch",
+    "ice-punch", "fire-punch", "drain-punch", "mach-punch", "bullet-punch", "aqua-jet", "ice-shard",
+    "sucker-punch", "shadow-sneak", "waterfall", "liquidation", "crunch", "dragon-claw", "dual-wingbeat",
+    "acrobatics", "rock-slide", "head-smash", "gunk-shot", "poison-jab", "seed-bomb", "wood-hammer",
+    "power-whip", "leaf-blade", "zen-headbutt", "psycho-cut", "high-jump-kick", "superpower", "sacred-sword",
+    "meteor-mash", "flash-cannon", "heavy-slam", "iron-tail", "poltergeist", "shadow-claw", "icicle-crash",
+    "high-horsepower", "stomping-tantrum", "bulldoze", "scorching-sands", "power-gem", "ancient-power",
+    "dragon-darts", "fake-out", "hyper-beam", "giga-impact", "solar-beam", "water-spout", "eruption",
+})
+
+# Natures: row raises a stat by 10%, column lowers one; the diagonal is neutral.
+_NATURE_STATS = ("attack", "defense", "speed", "special-attack", "special-defense")
+_NATURE_GRID = (
+    ("hardy", "lonely", "brave", "adamant", "naughty"),
+    ("bold", "docile", "relaxed", "impish", "lax"),
+    ("timid", "hasty", "serious", "jolly", "naive"),
+    ("modest", "mild", "quiet", "bashful", "rash"),
+    ("calm", "gentle", "sassy", "careful", "quirky"),
+)
+NATURES = {
+    name: (None, None) if up == down else (_NATURE_STATS[up], _NATURE_STATS[down])
+    for up, row in enumerate(_NATURE_GRID) for down, name in enumerate(row)
+}
+
+
+def _stat_name(name):
+    stat = str(name).strip().lower().replace("_", "-")
+    stat = STAT_ALIASES.get(stat, stat)
+    if stat not in STATS:
+        raise ValueError(f"Unknown stat '{name}'. Valid stats: {', '.join(STATS)}")
+    return stat
+
+
+def parse_spread(spread=None, battle_format="singles"):
+    """
+    Validate {"level", "evs", "ivs", "nature"} (all optional) into a full
+    spread. The default is the format's level (100 singles, 50 doubles), no
+    EVs, perfect IVs and a neutral nature.
+    """
+    spread = dict(spread or {})
+    unknown = set(spread) - {"level", "evs", "ivs", "nature"}
+    if unknown:
+        raise ValueError(f"Unknown spread keys: {', '.join(sorted(unknown))}. Valid keys: level, evs, ivs, nature")
+    level = int(spread.get("level") or DEFAULT_LEVELS[battle_format])
+    if not 1 <= level <= 100:
+        raise ValueError("level must be between 1 and 100")
+    evs = {stat: 0 for stat in STATS}
+    ivs = {stat: MAX_IV for stat in STATS}
+    for values, limit, label in ((evs, MAX_EVS, "EVs"), (ivs, MAX_IV, "IVs")):
+        for stat, value in dict(spread.get(label.lower()) or {}).items():
+            value = int(value)
+            if not 0 <= value <= limit:
+                raise ValueError(f"{label} must be between 0 and {limit}")
+            values[_stat_name(stat)] = value
+    if sum(evs.values()) > MAX_TOTAL_EVS:
+        raise ValueError(f"EVs may not total more than {MAX_TOTAL_EVS}")
+    nature = str(spread.get("nature") or "hardy").strip().lower()
+    if nature not in NATURES:
+        raise ValueError(f"Unknown nature '{nature}'")
+    return {"level": level, "evs": evs, "ivs": ivs, "nature": nature}
+
+
+def calc_stats(base_stats, spread):
+    """Actual stats from base stats and a parse_spread() spread."""
+    level, evs, ivs = spread["level"], spread["evs"], spread["ivs"]
+    up, down = NATURES[spread["nature"]]
+    stats = {}
+    for stat in STATS:
+        core = (2 * base_stats.get(stat, 0) + ivs[stat] + evs[stat] // 4) * level // 100
+        if stat == "hp":
+            # Shedinja's 1 HP is the one fixed value.
+            stats[stat] = 1 if base_stats.get("hp") == 1 else core + level + 10
+        else:
+            stats[stat] = (core + 5) * (110 if stat == up else 90 if stat == down else 100) // 100
+    return stats
+
+
+def _modify(values, numerator):
+    """value * numerator / 4096, rounded half down like the games' modifiers."""
+    quotient, remainder = np.divmod(values * numerator, 4096)
+    return quotient + (remainder > 2048)
+
+
+def damage_rolls(level, power, attack, defense, stab, effectiveness, spread=False):
+    """
+    Damage of every random roll: an (N, 16) int array for N combinations given
+    as equally long arrays (or scalars). effectiveness is the product of the
+    type multipliers; stab and spread are booleans.
+    """
+    level, power, attack, defense, stab, effectiveness, spread = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=np.int64)) for a in (level, power, attack, defense)),
+        np.atleast_1d(np.asarray(stab, dtype=bool)),
+        np.atleast_1d(np.asarray(effectiveness, dtype=np.float64)),
+        np.atleast_1d(np.asarray(spread, dtype=bool)),
+    )
+    base = (2 * level // 5 + 2) * power * attack // defense // 50 + 2
+    base = np.where(spread, _modify(base, 3072), base)
+    rolls = base[:, None] * ROLLS // 100
+    rolls = np.where(stab[:, None], _modify(rolls, 6144), rolls)
+    # Type multipliers are powers of two, so flooring the product matches the games' integer steps.
+    rolls = np.floor(rolls * effectiveness[:, None]).astype(np.int64)
+    return np.where(effectiveness[:, None] > 0, np.maximum(rolls, 1), 0)
+
+
+def ko_chances(rolls, hp):
+    """Chance to KO in one and in two hits, and the (best, worst) number of hits, per row."""
+    hp = np.asarray(hp, dtype=np.int64)[:, None]
+    one_hit = (rolls >= hp).mean(axis=1)
+    two_hits = ((rolls[:, :, None] + rolls[:, None, :]) >= hp[:, :, None]).mean(axis=(1, 2))
+    low, high = rolls[:, 0], rolls[:, -1]
+    best = np.where(high > 0, -(-hp[:, 0] // np.maximum(high, 1)), 0)
+    worst = np.where(low > 0, -(-hp[:, 0] // np.maximum(low, 1)), 0)
+    return one_hit, two_hits, best, worst
+
+
+def type_multipliers(move_types, defender_type_docs):
+    """Product of the defender's type multipliers for each move type."""
+    multipliers = np.ones(len(move_types))
+    for doc in defender_type_docs:
+        relations = doc["damage_relations"]
+        factor = {t["name"]: 2.0 for t in relations["double_damage_from"]}
+        factor.update({t["name"]: 0.5 for t in relations["half_damage_from"]})
+        factor.update({t["name"]: 0.0 for t in relations["no_damage_from"]})
+        multipliers *= np.array([factor.get(t, 1.0) for t in move_types])
+    return multipliers
+
+
+def damaging_move(doc):
+    """The fields the engine needs from a PokeAPI move, or None for status and variable-power moves."""
+    damage_class = (doc.get("damage_class") or {}).get("name")
+    if not doc.get("power") or damage_class not in ("physical", "special"):
+        return None
+    return {
+        "name": doc["name"],
+        "type": doc["type"]["name"],
+        "power": doc["power"],
+        "category": damage_class,
+        "spread": (doc.get("target") or {}).get("name") in SPREAD_TARGETS,
+    }
+
+
+def side_of(pokemon, type_docs, moves, spread):
+    base_stats = {s["stat"]["name"]: s["base_stat"] for s in pokemon["stats"]}
+    return {
+        "name": pokemon["name"],
+        "types": [t["type"]["name"] for t in pokemon["types"]],
+        "type_docs": type_docs,
+        "stats": calc_stats(base_stats, spread),
+        "moves": moves,
+    }
+
+
+def evaluate(sides, battle_format, level, top=10):
+    """Damage of each side's moves against the other side, both directions in one pass."""
+    pairs = [(sides[0], sides[1]), (sides[1], sides[0])]
+    rows = [(side, move) for side, _ in enumerate(pairs) for move in pairs[side][0]["moves"]]
+    results = ([], [])
+    if rows:
+        doubles = battle_format == "doubles"
+        attackers = [pairs[side][0] for side, _ in rows]
+        defenders = [pairs[side][1] for side, _ in rows]
+        moves = [move for _, move in rows]
+        effectiveness = np.concatenate([
+            type_multipliers([m["type"] for m in attacker["moves"]], defender["type_docs"])
+            for attacker, defender in pairs
+        ])
+        physical = np.array([m["category"] == "physical" for m in moves])
+        attack = np.where(physical, [a["stats"]["attack"] for a in attackers],
+                          [a["stats"]["special-attack"] for a in attackers])
+        defense = np.where(physical, [d["stats"]["defense"] for d in defenders],
+                           [d["stats"]["special-defense"] for d in defenders])
+        stab = np.array([m["type"] in a["types"] for a, m in zip(attackers, moves)])
+        spread = np.array([doubles and m["spread"] for m in moves])
+        hp = np.array([d["stats"]["hp"] for d in defenders])
+        rolls = damage_rolls(level, [m["power"] for m in moves], attack, defense, stab, effectiveness, spread)
+        one_hit, two_hits, best, worst = ko_chances(rolls, hp)
+
+        for i, (side, move) in enumerate(rows):
+            low, high = int(rolls[i, 0]), int(rolls[i, -1])
+            results[side].append({
+                **move,
+                "stab": bool(stab[i]),
+                "effectiveness": float(effectiveness[i]),
+                "min": low,
+                "max": high,
+                "min_percent": round(100 * low / int(hp[i]), 1),
+                "max_percent": round(100 * high / int(hp[i]), 1),
+                "ohko_chance": round(float(one_hit[i]), 4),
+                "two_hit_ko_chance": round(float(two_hits[i]), 4),
+                "hits_to_ko": [int(best[i]), int(worst[i])] if high else None,
+            })
+    report = {"format": battle_format, "level": level}
+    for side, (attacker, defender) in enumerate(pairs):
+        ranked = sorted(results[side], key=lambda m: (-m["max"], m["name"]))
+        report[f"pokemon{side + 1}"] = {
+            "name": attacker["name"],
+            "target": defender["name"],
+            "stats": attacker["stats"],
+            "moves_evaluated": len(ranked),
+            "best_moves": ranked[:top],
+        }
+    return report
+
+
+def default_moves(pokemon, limit=DEFAULT_MOVES):
+    """
+    The moves evaluated when none are given, at most `limit`: common attacks
+    first, then level-up moves from the latest learned, then the rest.
+    """
+    learned = {}
+    for entry in pokemon["moves"]:
+        levels = [d.get("level_learned_at") or 0 for d in entry.get("version_group_details") or ()
+                  if (d.get("move_learn_method") or {}).get("name") == "level-up"]
+        learned[entry["move"]["name"]] = max(levels, default=-1)
+    ranked = sorted(learned, key=lambda name: (name not in COMMON_ATTACKS, -learned[name]))
+    return ranked[:limit], max(len(ranked) - limit, 0)
+
+
+async def _documents(fetch, names):
+    """Fetch documents concurrently; (the ones fetched, the names that failed)."""
+    docs = await asyncio.gather(*(fetch(name) for name in names), return_exceptions=True)
+    fetched = [doc for doc in docs if not isinstance(doc, BaseException)]
+    return fetched, [name for name, doc in zip(names, docs) if isinstance(doc, BaseException)]
+
+
+async def matchup_damage(name1, name2, battle_format="singles", spread=None, moves1=None, moves2=None, top=10):
+    """
+    Damage both Pokémon can do to each other with the given moves, or by
+    default with up to DEFAULT_MOVES of the moves they learn, best first. Each
+    side reports the moves it could not fetch and how many learned moves the
+    default left out. Raises ValueError for an unknown Pokémon or format or an
+    invalid spread.
+    """
+    fmt = FORMATS.get(str(battle_format).strip().lower())
+    if fmt is None:
+        raise ValueError(f"Unknown battle format '{battle_format}'. Valid formats: {', '.join(FORMATS)}")
+    spread = parse_spread(spread, fmt)
+    repository = get_repository()
+    sides, skipped = [], []
+    # Up to DEFAULT_MOVES move documents per side on a cold cache; they queue behind interactive lookups.
+    with priority(BULK):
+        for name, moves in ((name1, moves1), (name2, moves2)):
+            try:
+                pokemon = await repository.pokemon_async(resolve(name))
+            except NotFoundError as e:
+                raise ValueError(f"Pokémon '{name}' not found") from e
+            left_out = 0
+            if moves:
+                names = list(dict.fromkeys(str(m).strip().lower().replace(" ", "-") for m in moves))
+            else:
+                names, left_out = default_moves(pokemon)
+            type_docs = await asyncio.gather(*(repository.type_async(t["type"]["name"]) for t in pokemon["types"]))
+            move_docs, failed = await _documents(repository.move_async, names)
+            usable = [m for m in map(damaging_move, move_docs) if m is not None]
+            sides.append(side_of(pokemon, type_docs, usable, spread))
+            skipped.append({"moves_failed": failed, "moves_left_out": left_out})
+    report = evaluate(sides, fmt, spread["level"], top)
+    for side, extra in enumerate(skipped):
+        report[f"pokemon{side + 1}"].update(extra)
+    return report
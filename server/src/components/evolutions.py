@@ -0,0 +1,275 @@
+"""
+Evolution graph: every evolution family as an adjacency list with its triggers.
+
+PokeAPI describes a family as a tree of nested chain links, and branches sit
+side by side in `evolves_to` (Eevee's eight evolutions, Tyrogue's three), so
+following only the first link lost them. The graph keeps one entry per chain
+ID: each species' direct evolutions, its parent and the conditions for
+evolving into it. Every species maps to its chain ID, so a family is fetched
+and stored once whichever member is asked for, and the tree, pre-evolutions
+and final stages of any member are walks over a handful of dict entries.
+Forms and default varieties (ninetales-alola, deoxys-normal) map to their
+species, so they find its family too.
+
+On the MCP server the graph is built from the cached evolution chain
+documents and extended as the cache stores new ones; the Django backend
+builds it from the synced chain table.
+"""
+import threading
+import weakref
+from collections import namedtuple
+from . import names, upstream
+from .repository import get_repository, species_of, species_of_async
+
+# children: species -> its direct evolutions; parents: species -> what it evolves from;
+# conditions: species -> the ways to evolve into it.
+Chain = namedtuple("Chain", "id root children parents conditions")
+
+
+def conditions(details):
+    """
+    PokeAPI evolution_details -> one compact dict per way to evolve, with
+    only the conditions that are set: {"trigger": "level-up", "min_level": 16}.
+    """
+    found = []
+    for detail in details or ():
+        condition = {}
+        for key, value in detail.items():
+            if value is None or value == "" or value is False:
+                continue
+            condition[key] = value["name"] if isinstance(value, dict) else value
+        found.append(condition)
+    return found
+
+
+class EvolutionGraph:
+    def __init__(self, chains=()):
+        """chains: evolution chain documents ({"id", "chain"})."""
+        self.chains = {}  # chain ID -> Chain
+        self.species = {}  # species name -> chain ID
+        self.varieties = {}  # form or default variety name -> species name
+        self._lock = threading.Lock()
+        for document in chains:
+            self.add(document)
+
+    def __len__(self):
+        return len(self.chains)
+
+    def __contains__(self, name):
+        return self.species_name(name) in self.species
+
+    def species_name(self, name):
+        """The species a Pokémon or species name stands for in the graph."""
+        name = str(name)
+        return self.varieties.get(name, name)
+
+    def add_variety(self, name, species):
+        if name != species:
+            self.varieties[name] = species
+
+    def add_varieties(self, document):
+        """Map the varieties listed in a species document to the species."""
+        for variety in document.get("varieties") or ():
+            self.add_variety(variety["pokemon"]["name"], document["name"])
+
+    def add(self, document):
+        """Index (or re-index) one evolution chain document."""
+        root = document["chain"]
+        children, parents, ways = {}, {}, {}
+        stack = [root]
+        while stack:
+            link = stack.pop()
+            name = link["species"]["name"]
+            evolves_to = link.get("evolves_to") or ()
+            children[name] = tuple(child["species"]["name"] for child in evolves_to)
+            for child in evolves_to:
+                parents[child["species"]["name"]] = name
+                ways[child["species"]["name"]] = conditions(child.get("evolution_details"))
+            stack.extend(evolves_to)
+        chain = Chain(document["id"], root["species"]["name"], children, parents, ways)
+        with self._lock:
+            previous = self.chains.get(chain.id)
+            for name in previous.children if previous else ():
+                if self.species.get(name) == chain.id:
+                    del self.species[name]
+            self.chains[chain.id] = chain
+            for name in children:
+                self.species[name] = chain.id
+
+    def chain(self, name):
+        """The Chain a species belongs to; LookupError when it is not indexed."""
+        ident = self.species.get(str(name))
+        if ident is None:
+            raise LookupError(name)
+        return self.chains[ident]
+
+    def members(self, name):
+        """Every species of the family, stage by stage from the base form."""
+        chain = self.chain(name)
+        order = [chain.root]
+        for species in order:
+            order.extend(chain.children[species])
+        return order
+
+    def tree(self, name):
+        """The whole family as nested {"species", "conditions", "evolves_to"} nodes from the base form."""
+        chain = self.chain(name)
+
+        def node(species):
+            return {
+                "species": species,
+                "conditions": chain.conditions.get(species, []),
+                "evolves_to": [node(child) for child in chain.children[species]],
+            }
+        return node(chain.root)
+
+    def pre_evolutions(self, name):
+        """What a species evolves from, base form first."""
+        chain = self.chain(name)
+        path = []
+        species = chain.parents.get(name)
+        while species is not None:
+            path.append(species)
+            species = chain.parents.get(species)
+        return path[::-1]
+
+    def evolutions(self, name):
+        """A species' direct evolutions with their conditions."""
+        chain = self.chain(name)
+        return [{"species": child, "conditions": chain.conditions[child]} for child in chain.children[name]]
+
+    def final_stages(self, name):
+        """The fully evolved species a species can become (itself when it is fully evolved)."""
+        chain = self.chain(name)
+        finals, stack = [], [name]
+        while stack:
+            species = stack.pop()
+            evolves_to = chain.children[species]
+            if not evolves_to:
+                finals.append(species)
+            stack.extend(reversed(evolves_to))
+        return finals
+
+    def report(self, name):
+        """Everything the graph knows about a species' place in its family."""
+        chain = self.chain(name)
+        pre = self.pre_evolutions(name)
+        return {
+            "pokemon": name,
+            "chain_id": chain.id,
+            "stage": len(pre) + 1,
+            "fully_evolved": not chain.children[name],
+            "evolves_from": chain.parents.get(name),
+            "conditions": chain.conditions.get(name, []),
+            "pre_evolutions": pre,
+            "evolves_to": self.evolutions(name),
+            "final_stages": self.final_stages(name),
+            "family": self.members(name),
+            "tree": self.tree(name),
+        }
+
+
+def indexed(graph, name):
+    """
+    The species name under which a Pokémon's family is in the graph, fetching
+    its species and chain through the repository when it is not indexed yet.
+    Forms are looked up under their species (ninetales-alola -> ninetales).
+    """
+    if name in graph:
+        return graph.species_name(name)
+    species_name = species_of(name)
+    if species_name in graph:
+        graph.add_variety(name, species_name)
+        return species_name
+    species = get_repository().species(species_name)
+    graph.add_varieties(species)
+    if species["name"] not in graph:
+        chain = get_repository().evolution_chain(species["evolution_chain"]["url"])
+        if species["name"] not in graph:  # unless the cache listener indexed it on the way
+            graph.add(chain)
+    graph.add_variety(name, species["name"])
+    return species["name"]
+
+
+async def indexed_async(graph, name):
+    """Async twin of indexed()."""
+    if name in graph:
+        return graph.species_name(name)
+    species_name = await species_of_async(name)
+    if species_name in graph:
+        graph.add_variety(name, species_name)
+        return species_name
+    species = await get_repository().species_async(species_name)
+    graph.add_varieties(species)
+    if species["name"] not in graph:
+        chain = await get_repository().evolution_chain_async(species["evolution_chain"]["url"])
+        if species["name"] not in graph:  # unless the cache listener indexed it on the way
+            graph.add(chain)
+    graph.add_variety(name, species["name"])
+    return species["name"]
+
+
+def evolution_report(graph, name):
+    """
+    graph.report() for a Pokémon name, indexing its family first when needed.
+    A form's report is its species' under the form's name, with the species added.
+    """
+    name = names.resolve(name)
+    species = indexed(graph, name)
+    report = graph.report(species)
+    if species != name:
+        report = {"pokemon": name, "species": species, **{k: v for k, v in report.items() if k != "pokemon"}}
+    return report
+
+
+def chains_from_cache(source):
+    """Every cached (fresh or stale) evolution chain document."""
+    for key in source.keys("evolution-chain/"):
+        if "?" in key or "/" in key[len("evolution-chain/"):]:
+            continue
+        entry = source.entry(key)
+        if entry and entry[1]:
+            yield entry[1]
+
+
+_graph = None
+_graph_source = None  # weak reference to the cache the graph was built from
+_graph_lock = threading.Lock()
+_subscribed = weakref.WeakSet()
+
+
+def _built_from(source):
+    return _graph_source is not None and _graph_source() is source
+
+
+def _listener(source_ref):
+    def stored(key, refreshed):
+        graph, source = _graph, source_ref()
+        if graph is None or source is None or not _built_from(source):
+            return
+        if key.startswith("evolution-chain/"):
+            entry = source.entry(key)
+            if entry and entry[1] and "chain" in entry[1]:
+                graph.add(entry[1])
+        elif key.startswith("pokemon-species/") and not refreshed:
+            entry = source.entry(key)
+            if entry and entry[1] and "varieties" in entry[1]:
+                graph.add_varieties(entry[1])
+    return stored
+
+
+def cached_graph():
+    """Graph over the active cache's evolution chain documents, extended as it stores new ones."""
+    global _graph, _graph_source
+    source = upstream.cache
+    graph = _graph
+    if graph is None or not _built_from(source):
+        with _graph_lock:
+            graph = _graph
+            if graph is None or not _built_from(source):
+                graph = _graph = EvolutionGraph(chains_from_cache(source))
+                _graph_source = weakref.ref(source)
+                if source not in _subscribed:
+                    source.subscribe(_listener(_graph_source))
+                    _subscribed.add(source)
+    return graph
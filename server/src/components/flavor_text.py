@@ -0,0 +1,175 @@
+"""
+Flavor text index: every species' Pokédex text by language and game version.
+
+A species document carries its flavor text in every language and version,
+which made each description lookup a full species download followed by a
+linear scan for the first English entry. The index keeps only the text:
+languages and versions are interned to small integers, each distinct text is
+stored once (consecutive games often repeat it), and one dict keyed by packed
+(species, language, version) integers answers a lookup in O(1). A species is
+reachable by its name, its national dex number and the names of its
+varieties, so forms such as charizard-mega-x find charizard's text. A form
+whose species is not indexed yet fetches the species it belongs to.
+
+On the MCP server the index is built from the cached species documents and
+extended as the cache stores new ones; the Django backend builds it from the
+synced species table.
+"""
+import os
+import threading
+import weakref
+from . import upstream
+from .learnsets import _Interned
+from .repository import get_repository, species_of, species_of_async
+
+DEFAULT_LANGUAGE = os.getenv("POKE_LANGUAGE", "en").strip().lower() or "en"
+# Version slot for "the first entry in this language", PokeAPI's order.
+_ANY = 0xFFF
+
+
+def clean(text):
+    return text.replace("\n", " ").replace("\f", " ")
+
+
+def _option(value):
+    value = str(value or "").strip().lower().replace(" ", "-")
+    return value or None
+
+
+class FlavorTextIndex:
+    def __init__(self, documents=()):
+        """documents: species documents (id, name, flavor_text_entries and optionally varieties)."""
+        self.languages, self.versions = _Interned(), _Interned()
+        self.texts = []
+        self._text_ids = {}
+        self.species = {}  # species name, dex number or variety name -> species ordinal
+        self._entries = {}  # (ordinal << 24) | (language << 12) | version -> text ID
+        self._count = 0
+        self._lock = threading.Lock()
+        for document in documents:
+            self.add(document)
+
+    def __len__(self):
+        return self._count
+
+    def _text(self, text):
+        ident = self._text_ids.get(text)
+        if ident is None:
+            ident = self._text_ids[text] = len(self.texts)
+            self.texts.append(text)
+        return ident
+
+    def add(self, document):
+        """Index (or re-index) one species document."""
+        with self._lock:
+            ordinal = self.species.get(document["name"])
+            if ordinal is None:
+                ordinal, self._count = self._count, self._count + 1
+            else:
+                for language in range(len(self.languages.names)):
+                    prefix = (ordinal << 24) | (language << 12)
+                    for version in [*range(len(self.versions.names)), _ANY]:
+                        self._entries.pop(prefix | version, None)
+            for entry in document.get("flavor_text_entries") or ():
+                prefix = (ordinal << 24) | (self.languages.add(entry["language"]["name"]) << 12)
+                text = self._text(clean(entry["flavor_text"]))
+                if entry.get("version"):
+                    self._entries.setdefault(prefix | self.versions.add(entry["version"]["name"]), text)
+                self._entries.setdefault(prefix | _ANY, text)
+            aliases = [document["name"], str(document["id"])]
+            aliases += [v["pokemon"]["name"] for v in document.get("varieties") or ()]
+            for alias in aliases:
+                self.species[alias] = ordinal
+
+    def __contains__(self, name):
+        return str(name) in self.species
+
+    def text(self, name, language=None, version=None):
+        """
+        The species' flavor text in a language (default POKE_LANGUAGE), from a
+        version or else its first entry; None when there is none. Raises
+        LookupError when the species is not indexed.
+        """
+        ordinal = self.species.get(str(name))
+        if ordinal is None:
+            raise LookupError(name)
+        language = self.languages.ids.get(_option(language) or DEFAULT_LANGUAGE)
+        version = _option(version)
+        version = _ANY if version is None else self.versions.ids.get(version)
+        if language is None or version is None:
+            return None
+        text = self._entries.get((ordinal << 24) | (language << 12) | version)
+        return None if text is None else self.texts[text]
+
+
+def lookup(index, name, language=None, version=None):
+    """
+    index.text(), fetching and indexing the species through the repository when
+    it is not indexed yet; a form fetches its species (charizard-mega-x -> charizard).
+    """
+    try:
+        return index.text(name, language, version)
+    except LookupError:
+        document = get_repository().species(species_of(name))
+        if document["name"] not in index:
+            index.add(document)
+        return index.text(document["name"], language, version)
+
+
+async def lookup_async(index, name, language=None, version=None):
+    """Async twin of lookup()."""
+    try:
+        return index.text(name, language, version)
+    except LookupError:
+        document = await get_repository().species_async(await species_of_async(name))
+        if document["name"] not in index:
+            index.add(document)
+        return index.text(document["name"], language, version)
+
+
+def documents_from_cache(source):
+    """Every cached (fresh or stale) species document."""
+    for key in source.keys("pokemon-species/"):
+        if "?" in key or "/" in key[len("pokemon-species/"):]:
+            continue
+        entry = source.entry(key)
+        if entry and entry[1]:
+            yield entry[1]
+
+
+_index = None
+_index_source = None  # weak reference to the cache the index was built from
+_index_lock = threading.Lock()
+_subscribed = weakref.WeakSet()
+
+
+def _built_from(source):
+    return _index_source is not None and _index_source() is source
+
+
+def _listener(source_ref):
+    def stored(key, refreshed):
+        index, source = _index, source_ref()
+        if index is None or source is None or not _built_from(source) or not key.startswith("pokemon-species/"):
+            return
+        entry = source.entry(key)
+        if entry and entry[1] and "flavor_text_entries" in entry[1]:
+            index.add(entry[1])
+    return stored
+
+
+def cached_index():
+    """Index over the active cache's species documents, extended as it stores new ones."""
+    global _index, _index_source
+    source = upstream.cache
+    index = _index
+    if index is None or not _built_from(source):
+        with _index_lock:
+            index = _index
+            if index is None or not _built_from(source):
+                index = _index = FlavorTextIndex(documents_from_cache(source))
+                _index_source = weakref.ref(source)
+                if source not in _subscribed:
+                    source.subscribe(_listener(_index_source))
+                    _subscribed.add(source)
+    return index
@@ -0,0 +1,283 @@
+"""
+Learnset index: the moves each Pokémon learns and the Pokémon that learn each move.
+
+PokeAPI lists every move a Pokémon can learn, with the version groups and
+methods (level-up, machine, egg, tutor, ...) it learns it by. The index keeps
+all of it compactly: move, version group and method names are interned to
+small integers, every Pokémon gets a sorted array of move IDs plus parallel
+arrays of its learn details, and every move a bitset of the Pokémon that learn
+it, also kept per (version group, method). "Who learns Earthquake and Stealth
+Rock in scarlet-violet" is then a handful of integer ANDs.
+
+Like the search index, it is built from the synced Pokédex tables on the
+Django backend and from the cached pokemon documents on the MCP server.
+"""
+import threading
+import weakref
+from array import array
+from . import names, upstream
+from .repository import get_repository
+
+
+def compact_moves(moves):
+    """PokeAPI `moves` -> [[move, [[version_group, method, level], ...]], ...], the form rows store."""
+    return [
+        [entry["move"]["name"], [[d["version_group"]["name"], d["move_learn_method"]["name"], d.get("level_learned_at") or 0]
+                                 for d in entry.get("version_group_details") or ()]]
+        for entry in moves
+    ]
+
+
+def expand_moves(compact):
+    """Inverse of compact_moves(); rows synced before learn details were kept hold bare names."""
+    moves = []
+    for entry in compact:
+        name, details = (entry, ()) if isinstance(entry, str) else entry
+        moves.append({"move": {"name": name}, "version_group_details": [
+            {"level_learned_at": level, "version_group": {"name": group}, "move_learn_method": {"name": method}}
+            for group, method, level in details
+        ]})
+    return moves
+
+
+def _normalize(name):
+    return str(name).strip().lower().replace(" ", "-").replace("_", "-")
+
+
+def _names(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [_normalize(v) for v in value if str(v).strip()]
+
+
+def _positions(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class _Interned:
+    """Names <-> dense integer IDs."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def add(self, name):
+        ident = self.ids.get(name)
+        if ident is None:
+            ident = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return ident
+
+
+class LearnsetIndex:
+    def __init__(self, learnsets):
+        """learnsets: (pokemon ID, name, compact moves) tuples."""
+        self.moves, self.version_groups, self.methods = _Interned(), _Interned(), _Interned()
+        self.pokemon = []      # position -> (id, name); positions are bits of the bitsets
+        self.positions = {}    # name -> position
+        self.move_ids = []     # position -> sorted array of move IDs
+        self.details = []      # position -> (move IDs, version groups, methods, levels) parallel arrays
+        self.learners = {}     # move ID -> bitset
+        self.filtered = {}     # (move ID, version group, method) -> bitset
+        self._lock = threading.Lock()
+        for pokemon_id, name, moves in sorted(learnsets, key=lambda learnset: learnset[0]):
+            self.add(pokemon_id, name, moves)
+
+    def add(self, pokemon_id, name, moves):
+        """Index (or re-index) one Pokémon's learnset; only its own bits change."""
+        with self._lock:
+            detail = (array("H"), array("B"), array("B"), array("B"))
+            ids, keys = set(), set()
+            for entry in moves:
+                move_name, learned = (entry, ()) if isinstance(entry, str) else entry
+                move = self.moves.add(move_name)
+                ids.add(move)
+                for group_name, method_name, level in learned:
+                    group, method = self.version_groups.add(group_name), self.methods.add(method_name)
+                    keys.add((move, group, method))
+                    for column, value in zip(detail, (move, group, method, min(level, 255))):
+                        column.append(value)
+            position = self.positions.get(name)
+            if position is None:
+                position = len(self.pokemon)
+                self.move_ids.append(array("H"))
+                self.details.append(detail)
+                self.pokemon.append((pokemon_id, name))
+                self.positions[name] = position
+            else:
+                keep = ~(1 << position)
+                for move in self.move_ids[position]:
+                    self.learners[move] &= keep
+                for key in set(zip(*self.details[position][:3])):
+                    self.filtered[key] &= keep
+                self.pokemon[position] = (pokemon_id, name)
+            bit = 1 << position
+            for move in ids:
+                self.learners[move] = self.learners.get(move, 0) | bit
+            for key in keys:
+                self.filtered[key] = self.filtered.get(key, 0) | bit
+            self.move_ids[position] = array("H", sorted(ids))
+            self.details[position] = detail
+
+    def __len__(self):
+        return len(self.pokemon)
+
+    def _resolve(self, interned, value, label):
+        names = _names(value)
+        if not names:
+            return None
+        unknown = [name for name in names if name not in interned.ids]
+        if unknown:
+            raise ValueError(f"Unknown {label} '{unknown[0]}'. Valid values: {', '.join(sorted(interned.ids))}")
+        return [interned.ids[name] for name in names]
+
+    def _learners(self, move, groups, methods):
+        if groups is None and methods is None:
+            return self.learners.get(move, 0)
+        bits = 0
+        for group in groups if groups is not None else range(len(self.version_groups.names)):
+            for method in methods if methods is not None else range(len(self.methods.names)):
+                bits |= self.filtered.get((move, group, method), 0)
+        return bits
+
+    def learners_of(self, moves, version_group=None, method=None):
+        """Pokémon (in ID order) that learn every one of `moves`, optionally in a version group / by a method."""
+        names = _names(moves)
+        if not names:
+            raise ValueError("Give at least one move")
+        groups = self._resolve(self.version_groups, version_group, "version group")
+        methods = self._resolve(self.methods, method, "learn method")
+        matched = None
+        for name in names:
+            move = self.moves.ids.get(name)
+            if move is None:
+                raise ValueError(f"Unknown move '{name}': no indexed Pokémon learns it")
+            bits = self._learners(move, groups, methods)
+            matched = bits if matched is None else matched & bits
+        # Positions follow ID order up to the first Pokémon added after the build.
+        pokemon = [name for _, name in sorted(self.pokemon[position] for position in _positions(matched))]
+        return {
+            "moves": names,
+            "version_group": version_group,
+            "method": method,
+            "total": len(pokemon),
+            "pokemon": pokemon,
+            "indexed": len(self.pokemon),
+        }
+
+    def moves_of(self, name, version_group=None, method=None):
+        """
+        Moves a Pokémon learns with how it learns them; level is the lowest
+        level-up level among the matching details. Raises LookupError when the
+        Pokémon is not indexed.
+        """
+        position = self.positions.get(_normalize(name))
+        if position is None:
+            raise LookupError(name)
+        groups = self._resolve(self.version_groups, version_group, "version group")
+        methods = self._resolve(self.methods, method, "learn method")
+        groups = set(groups) if groups is not None else None
+        methods = set(methods) if methods is not None else None
+
+        learned = {}
+        for move, group, how, level in zip(*self.details[position]):
+            if (groups is None or group in groups) and (methods is None or how in methods):
+                entry = learned.setdefault(move, {"methods": set(), "level": None})
+                entry["methods"].add(how)
+                if self.methods.names[how] == "level-up" and (entry["level"] is None or level < entry["level"]):
+                    entry["level"] = level
+        if groups is None and methods is None:
+            # Moves stored without learn details.
+            for move in self.move_ids[position]:
+                learned.setdefault(move, {"methods": set(), "level": None})
+
+        moves = [{"name": self.moves.names[move],
+                  "methods": sorted(self.methods.names[how] for how in entry["methods"]),
+                  "level": entry["level"]} for move, entry in learned.items()]
+        moves.sort(key=lambda m: (m["level"] is None, m["level"] or 0, m["name"]))
+        pokemon_id, pokemon_name = self.pokemon[position]
+        return {
+            "pokemon": pokemon_name,
+            "id": pokemon_id,
+            "version_group": version_group,
+            "method": method,
+            "total": len(moves),
+            "moves": moves,
+        }
+
+
+def pokemon_moves(index, name, version_group=None, method=None):
+    """index.moves_of(), fetching the Pokémon through the repository when it is not indexed yet."""
+    name = names.resolve(name)
+    try:
+        return index.moves_of(name, version_group, method)
+    except LookupError:
+        data = get_repository().pokemon(name)
+        return LearnsetIndex([(data["id"], data["name"], compact_moves(data["moves"]))]).moves_of(
+            data["name"], version_group, method)
+
+
+def _learnset(document):
+    return document["id"], document["name"], compact_moves(document.get("moves") or ())
+
+
+def learnsets_from_cache(source=None):
+    """Learnsets of every Pokémon whose pokemon document is cached (fresh or stale)."""
+    source = source or upstream.cache
+    for key in source.keys("pokemon/"):
+        if "?" in key or "/" in key[len("pokemon/"):]:
+            continue
+        entry = source.entry(key)
+        if entry and entry[1]:
+            yield _learnset(entry[1])
+
+
+_index = None
+_index_source = None  # weak reference to the cache the index was built from
+_index_lock = threading.Lock()
+_subscribed = weakref.WeakSet()
+# Bumped on every pokemon document write; an index built across a bump is not kept.
+_version = 0
+
+
+def _built_from(source):
+    return _index_source is not None and _index_source() is source
+
+
+def _listener(source_ref):
+    def stored(key, refreshed):
+        global _version
+        if not key.startswith("pokemon/") or "?" in key or "/" in key[len("pokemon/"):]:
+            return
+        _version += 1
+        index, source = _index, source_ref()
+        if index is None or source is None or not _built_from(source):
+            return
+        entry = source.entry(key)
+        if entry and entry[1] and "moves" in entry[1]:
+            index.add(*_learnset(entry[1]))
+    return stored
+
+
+def cached_index():
+    """Index over the active cache's pokemon documents, updated Pokémon by Pokémon as it stores new ones."""
+    global _index, _index_source
+    source = upstream.cache
+    index = _index
+    if index is None or not _built_from(source):
+        with _index_lock:
+            index = _index
+            if index is None or not _built_from(source):
+                if source not in _subscribed:
+                    source.subscribe(_listener(weakref.ref(source)))
+                    _subscribed.add(source)
+                version = _version
+                index = LearnsetIndex(learnsets_from_cache(source))
+                if version == _version:
+                    _index, _index_source = index, weakref.ref(source)
+    return index
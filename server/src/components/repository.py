@@ -0,0 +1,104 @@
+"""
+Where Pokémon, species, type, move and evolution chain documents come from.
+
+Components read PokeAPI-shaped documents through the active repository rather
+than calling the upstream layer directly. The default repository is PokeAPI
+itself (through the cache); the Django backend swaps in one that answers from
+its local, indexed Pokédex tables and only falls back to PokeAPI for rows that
+have not been synced yet.
+
+Every method raises UpstreamError (NotFoundError for unknown names) on failure,
+whichever repository is active. Pokémon names are checked against the local
+name index (components/names.py) first, and unknown ones raise
+UnknownPokemonError, a NotFoundError carrying "did you mean" suggestions.
+
+Species endpoints take species names: species_of() maps a Pokémon or form
+name to its species, from the name index or else the species ref of the
+Pokémon's document.
+"""
+from . import names
+from .upstream import NotFoundError, fetch_json, fetch_json_async
+
+
+class UpstreamRepository:
+    """Documents straight from PokeAPI, via the cache."""
+
+    def pokemon(self, name):
+        names.check(name)
+        try:
+            return fetch_json(f"pokemon/{name}")
+        except names.UnknownPokemonError:
+            raise
+        except NotFoundError as e:
+            raise names.unknown(name) from e
+
+    def species(self, name):
+        return fetch_json(f"pokemon-species/{name}")
+
+    def type(self, name):
+        return fetch_json(f"type/{name}")
+
+    def evolution_chain(self, url):
+        return fetch_json(url)
+
+    def move(self, name):
+        return fetch_json(f"move/{name}")
+
+    async def pokemon_async(self, name):
+        names.check(name)
+        try:
+            return await fetch_json_async(f"pokemon/{name}")
+        except names.UnknownPokemonError:
+            raise
+        except NotFoundError as e:
+            raise names.unknown(name) from e
+
+    async def species_async(self, name):
+        return await fetch_json_async(f"pokemon-species/{name}")
+
+    async def type_async(self, name):
+        return await fetch_json_async(f"type/{name}")
+
+    async def evolution_chain_async(self, url):
+        return await fetch_json_async(url)
+
+    async def move_async(self, name):
+        return await fetch_json_async(f"move/{name}")
+
+
+_repository = UpstreamRepository()
+
+
+def get_repository():
+    return _repository
+
+
+def set_repository(repository):
+    """Install the repository components read from; returns the previous one."""
+    global _repository
+    previous, _repository = _repository, repository
+    return previous
+
+
+def _species_ref(document, name):
+    return (document.get("species") or {}).get("name") or name
+
+
+def species_of(name):
+    """The species of a canonical Pokémon name: charizard-mega-x -> charizard, deoxys-normal -> deoxys."""
+    index = names.name_index()
+    species = index.species_of(name)
+    if species is None:
+        species = _species_ref(get_repository().pokemon(name), name)
+        index.add_species(name, species)
+    return species
+
+
+async def species_of_async(name):
+    """Async twin of species_of()."""
+    index = names.name_index()
+    species = index.species_of(name)
+    if species is None:
+        species = _species_ref(await get_repository().pokemon_async(name), name)
+        index.add_species(name, species)
+    return species
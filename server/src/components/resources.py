@@ -0,0 +1,85 @@
+"""
+Compact, cache-backed views of PokeAPI resources.
+
+Each function reads through the local cache (fetching upstream only on a miss)
+and trims the payload down to what an agent needs, so the same data can be
+served as MCP resources and reused across turns.
+"""
+from . import flavor_text
+from .names import DEX_LISTING_KEY
+from .upstream import fetch_json, resource_key
+from .info_retrival import Pokemon
+
+# Upstream resource path prefix -> MCP resource URI scheme
+RESOURCE_SCHEMES = {
+    "pokemon": "pokemon",
+    "pokemon-species": "species",
+    "type": "type",
+    "evolution-chain": "evolution-chain",
+}
+
+
+def _id_from_url(url):
+    return int(resource_key(url).rsplit("/", 1)[-1])
+
+
+def key_to_uri(key):
+    """Map a cache key such as "pokemon-species/pikachu" to its resource URI, or None."""
+    kind, _, ident = key.partition("/")
+    scheme = RESOURCE_SCHEMES.get(kind)
+    if scheme is None or not ident or "/" in ident:
+        return None
+    return f"{scheme}://{ident}"
+
+
+def dex_names():
+    """Names of every Pokémon in the national dex, in dex order."""
+    listing = fetch_json(DEX_LISTING_KEY)
+    return [entry["name"] for entry in listing["results"]]
+
+
+def pokemon_resource(name):
+    pokemon = Pokemon(name)
+    pokemon.fetch_basic_info()
+    return pokemon.get_summary(("name", "id", "types", "abilities", "height", "weight", "stats", "sprite"))
+
+
+def species_resource(name):
+    data = fetch_json(f"pokemon-species/{name.lower()}")
+    chain = data.get("evolution_chain")
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "generation": (data.get("generation") or {}).get("name"),
+        "is_legendary": data.get("is_legendary"),
+        "is_mythical": data.get("is_mythical"),
+        "evolves_from": (data.get("evolves_from_species") or {}).get("name"),
+        "evolution_chain_id": _id_from_url(chain["url"]) if chain else None,
+        "varieties": [v["pokemon"]["name"] for v in data.get("varieties", [])],
+        "flavor_text": flavor_text.lookup(flavor_text.cached_index(), data["name"]),
+    }
+
+
+def type_resource(name):
+    data = fetch_json(f"type/{name.lower()}")
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "damage_relations": {
+            relation: [t["name"] for t in targets]
+            for relation, targets in data["damage_relations"].items()
+        },
+        "pokemon": [p["pokemon"]["name"] for p in data.get("pokemon", [])],
+    }
+
+
+def _chain_tree(link):
+    return {
+        "species": link["species"]["name"],
+        "evolves_to": [_chain_tree(child) for child in link.get("evolves_to", [])],
+    }
+
+
+def evolution_chain_resource(chain_id):
+    data = fetch_json(f"evolution-chain/{chain_id}")
+    return {"id": data["id"], "chain": _chain_tree(data["chain"])}
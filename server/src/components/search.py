@@ -0,0 +1,369 @@
+"""
+In-memory search index over the Pokédex.
+
+Every filter is answered from a prebuilt structure instead of a scan: sets of
+Pokémon IDs per type, ability, generation and evolution stage, one sorted
+array per base stat (range filters are two bisects), and an inverted index
+over flavor text whose sorted vocabulary gives prefix matches by bisect too.
+Candidate sets are intersected smallest first, so a query over the whole dex
+takes well under a millisecond once the index is built.
+
+The index is built from compact records. The Django backend makes them from
+its synced Pokédex tables; the MCP server makes them from the PokeAPI
+documents in the shared cache, which `manage.py sync_pokedex` fills, and
+re-indexes just the Pokémon a newly stored document touches.
+"""
+import re
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from . import upstream
+from .upstream import resource_key
+
+STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+RANGE_KEYS = STATS + ("total",)
+SORT_KEYS = ("id", "name") + RANGE_KEYS
+# Keyword arguments of PokedexIndex.search(), as accepted by the endpoints.
+SEARCH_PARAMS = ("types", "abilities", "generation", "evolution_stage", "fully_evolved",
+                 "min_stats", "max_stats", "text", "sort", "offset", "limit")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or "").lower())
+
+
+def generation_number(name):
+    """ "generation-iv" (PokeAPI) or "generation-4" -> 4; None when unknown."""
+    suffix = str(name or "").rsplit("-", 1)[-1].lower()
+    return int(suffix) if suffix.isdigit() else _ROMAN.get(suffix)
+
+
+def evolution_position(chain, species_name):
+    """(stage, fully_evolved) of a species in a PokeAPI chain link tree; stage 1 is the base form."""
+    stack = [(chain, 1)]
+    while stack:
+        link, stage = stack.pop()
+        if link["species"]["name"] == species_name:
+            return stage, not link.get("evolves_to")
+        stack.extend((child, stage + 1) for child in link.get("evolves_to", []))
+    return None, None
+
+
+def english_flavor_texts(entries):
+    texts = []
+    for entry in entries or ():
+        if entry["language"]["name"] == "en":
+            text = " ".join(entry["flavor_text"].split())
+            if text not in texts:
+                texts.append(text)
+    return texts
+
+
+def make_record(id, name, types, abilities, stats, generation=None, evolution_stage=None,
+                fully_evolved=None, flavor_texts=()):
+    stats = {stat: stats.get(stat, 0) for stat in STATS}
+    return {
+        "id": id,
+        "name": name,
+        "types": list(types),
+        "abilities": list(abilities),
+        "stats": stats,
+        "total": sum(stats.values()),
+        "generation": generation,
+        "evolution_stage": evolution_stage,
+        "fully_evolved": fully_evolved,
+        "flavor_texts": list(flavor_texts),
+    }
+
+
+def pokemon_record(pokemon, species=None, chain=None):
+    """Record from PokeAPI pokemon, pokemon-species and evolution-chain documents."""
+    stage, final = evolution_position(chain["chain"], species["name"]) if species and chain else (None, None)
+    return make_record(
+        id=pokemon["id"],
+        name=pokemon["name"],
+        types=[t["type"]["name"] for t in pokemon["types"]],
+        abilities=[a["ability"]["name"] for a in pokemon["abilities"]],
+        stats={s["stat"]["name"]: s["base_stat"] for s in pokemon["stats"]},
+        generation=generation_number((species.get("generation") or {}).get("name")) if species else None,
+        evolution_stage=stage,
+        fully_evolved=final,
+        flavor_texts=english_flavor_texts(species.get("flavor_text_entries")) if species else (),
+    )
+
+
+def _normalize_stat(name):
+    stat = str(name).strip().lower().replace("_", "-")
+    if stat not in RANGE_KEYS:
+        raise ValueError(f"Unknown stat '{name}'. Valid stats: {', '.join(RANGE_KEYS)}")
+    return stat
+
+
+def _names(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+
+def _value(record, stat):
+    return record["total"] if stat == "total" else record["stats"][stat]
+
+
+class PokedexIndex:
+    def __init__(self, records):
+        self.records = {r["id"]: r for r in records}
+        self.by_type, self.by_ability, self.by_generation, self.by_stage, self.by_final = {}, {}, {}, {}, {}
+        self.by_token = {}
+        for r in self.records.values():
+            for facet, key in self._facets(r):
+                facet.setdefault(key, set()).add(r["id"])
+        self.vocabulary = sorted(self.by_token)
+        self.ranges = {}
+        for stat in RANGE_KEYS:
+            ordered = sorted(self.records.values(), key=lambda r: _value(r, stat))
+            self.ranges[stat] = ([_value(r, stat) for r in ordered], [r["id"] for r in ordered])
+        # Bumped by every add(), so snapshots of the dex (speed tiers) notice changes.
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _facets(self, r):
+        for t in r["types"]:
+            yield self.by_type, t
+        for a in r["abilities"]:
+            yield self.by_ability, a
+        yield self.by_generation, r["generation"]
+        yield self.by_stage, r["evolution_stage"]
+        yield self.by_final, r["fully_evolved"]
+        for token in tokenize(" ".join(r["flavor_texts"])):
+            yield self.by_token, token
+
+    def add(self, record):
+        """
+        Index (or re-index) one record. Sets and sorted arrays are replaced
+        rather than changed in place, so a search running meanwhile sees
+        either the old or the new version of each.
+        """
+        ident = record["id"]
+        with self._lock:
+            previous = self.records.get(ident)
+            vocabulary_changed = False
+            for facet, key in self._facets(previous) if previous else ():
+                ids = facet.get(key)
+                if ids and ident in ids:
+                    if len(ids) > 1:
+                        facet[key] = ids - {ident}
+                    else:
+                        del facet[key]
+                        vocabulary_changed |= facet is self.by_token
+            for facet, key in self._facets(record):
+                ids = facet.get(key)
+                if ids is None:
+                    facet[key] = {ident}
+                    vocabulary_changed |= facet is self.by_token
+                elif ident not in ids:
+                    facet[key] = ids | {ident}
+            for stat in RANGE_KEYS:
+                values, ids = list(self.ranges[stat][0]), list(self.ranges[stat][1])
+                if previous:
+                    at = bisect_left(values, _value(previous, stat))
+                    while ids[at] != ident:
+                        at += 1
+                    del values[at], ids[at]
+                at = bisect_right(values, _value(record, stat))
+                values.insert(at, _value(record, stat))
+                ids.insert(at, ident)
+                self.ranges[stat] = (values, ids)
+            self.records[ident] = record
+            if vocabulary_changed:
+                self.vocabulary = sorted(self.by_token)
+            self.version += 1
+
+    def __len__(self):
+        return len(self.records)
+
+    def _in_range(self, stat, low, high):
+        values, ids = self.ranges[stat]  # one snapshot: add() replaces the pair together
+        start = 0 if low is None else bisect_left(values, low)
+        stop = len(values) if high is None else bisect_right(values, high)
+        return set(ids[start:stop])
+
+    def _with_prefix(self, term):
+        matched, vocabulary = set(), self.vocabulary
+        for token in vocabulary[bisect_left(vocabulary, term):]:
+            if not token.startswith(term):
+                break
+            matched |= self.by_token.get(token, set())
+        return matched
+
+    def search(self, types=None, abilities=None, generation=None, evolution_stage=None, fully_evolved=None,
+               min_stats=None, max_stats=None, text=None, sort="id", offset=0, limit=DEFAULT_PAGE_SIZE):
+        """
+        Filter, sort and paginate the dex.
+
+        types: the Pokémon has every listed type. abilities: it has an ability
+        containing any of the terms ("levitate", "water"). min_stats/max_stats:
+        inclusive bounds per stat or "total". text: every word prefixes a word
+        of its English flavor text. sort: a SORT_KEYS entry, "-" for descending.
+        """
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+        offset = max(int(offset), 0)
+        descending = str(sort).startswith("-")
+        sort_key = str(sort).lstrip("-").lower().replace("_", "-")
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort '{sort}'. Valid keys: {', '.join(SORT_KEYS)} (prefix '-' for descending)")
+
+        candidates = []
+        for t in _names(types):
+            candidates.append(self.by_type.get(t, set()))
+        terms = _names(abilities)
+        if terms:
+            candidates.append(set().union(*[ids for name, ids in list(self.by_ability.items())
+                                            if any(term in name for term in terms)]))
+        if generation is not None:
+            number = generation_number(f"-{generation}")
+            if number is None:
+                raise ValueError(f"Unknown generation '{generation}'")
+            candidates.append(self.by_generation.get(number, set()))
+        if evolution_stage is not None:
+            candidates.append(self.by_stage.get(int(evolution_stage), set()))
+        if fully_evolved is not None:
+            candidates.append(self.by_final.get(bool(fully_evolved), set()))
+        bounds = {}
+        for stats, side in ((min_stats, 0), (max_stats, 1)):
+            for stat, value in dict(stats or {}).items():
+                bounds.setdefault(_normalize_stat(stat), [None, None])[side] = int(value)
+        for stat, (low, high) in bounds.items():
+            candidates.append(self._in_range(stat, low, high))
+        for term in tokenize(text):
+            candidates.append(self._with_prefix(term))
+
+        if candidates:
+            candidates.sort(key=len)
+            matched = candidates[0].intersection(*candidates[1:])
+        else:
+            matched = set(self.records)
+
+        if sort_key in ("id", "name", "total"):
+            key = lambda r: r[sort_key]  # noqa: E731
+        else:
+            key = lambda r: r["stats"][sort_key]  # noqa: E731
+        ordered = sorted((self.records[i] for i in matched), key=lambda r: (key(r), r["id"]), reverse=descending)
+        page = ordered[offset:offset + limit]
+        return {
+            "total": len(ordered),
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if offset + limit < len(ordered) else None,
+            "indexed": len(self.records),
+            "results": [{k: v for k, v in r.items() if k != "flavor_texts"} for r in page],
+        }
+
+
+def _load(source, *keys):
+    for key in filter(None, keys):
+        entry = source.entry(resource_key(key))
+        if entry and entry[1]:
+            return entry[1]
+    return None
+
+
+def cached_record(source, pokemon):
+    """Record for a pokemon document, with its species and chain as far as they are cached."""
+    species = _load(source, pokemon["species"]["url"]) if pokemon.get("species") else None
+    chain_ref = (species or {}).get("evolution_chain")
+    chain = _load(source, chain_ref["url"]) if chain_ref else None
+    return pokemon_record(pokemon, species, chain)
+
+
+def _is_document(key, kind):
+    return key.startswith(kind + "/") and "?" not in key and "/" not in key[len(kind) + 1:]
+
+
+def records_from_cache(source=None):
+    """Records for every Pokémon whose pokemon document is cached (fresh or stale)."""
+    source = source or upstream.cache
+    records = []
+    for key in source.keys("pokemon/"):
+        pokemon = _load(source, key) if _is_document(key, "pokemon") else None
+        if pokemon:
+            records.append(cached_record(source, pokemon))
+    return records
+
+
+def affected_pokemon(source, key, document):
+    """The cached pokemon documents whose records a newly stored document changes."""
+    if _is_document(key, "pokemon"):
+        return [document] if "stats" in document else []
+    if _is_document(key, "evolution-chain"):
+        links, species = [document.get("chain")], []
+        while links:
+            link = links.pop()
+            if link:
+                named = link["species"]
+                species.append(_load(source, named.get("url"), f"pokemon-species/{named['name']}"))
+                links.extend(link.get("evolves_to") or ())
+    elif _is_document(key, "pokemon-species"):
+        species = [document]
+    else:
+        return []
+    found = []
+    for entry in filter(None, species):
+        varieties = [v["pokemon"] for v in entry.get("varieties") or ()] or [{"name": entry["name"]}]
+        for variety in varieties:
+            pokemon = _load(source, variety.get("url"), f"pokemon/{variety['name']}")
+            if pokemon and "stats" in pokemon:
+                found.append(pokemon)
+    return found
+
+
+_index = None
+_index_source = None  # weak reference to the cache the index was built from
+_index_lock = threading.Lock()
+_subscribed = weakref.WeakSet()
+# Bumped on every relevant cache write; an index built across a bump is not kept.
+_version = 0
+
+
+def _built_from(source):
+    return _index_source is not None and _index_source() is source
+
+
+def _listener(source_ref):
+    def stored(key, refreshed):
+        global _version
+        if key.split("/", 1)[0] not in ("pokemon", "pokemon-species", "evolution-chain"):
+            return
+        _version += 1
+        index, source = _index, source_ref()
+        if index is None or source is None or not _built_from(source):
+            return
+        entry = source.entry(key)
+        for pokemon in affected_pokemon(source, key, entry[1]) if entry and entry[1] else ():
+            index.add(cached_record(source, pokemon))
+    return stored
+
+
+def cached_index():
+    """Index over the active cache's documents, updated record by record as it stores new ones."""
+    global _index, _index_source
+    source = upstream.cache
+    index = _index
+    if index is None or not _built_from(source):
+        with _index_lock:
+            index = _index
+            if index is None or not _built_from(source):
+                if source not in _subscribed:
+                    source.subscribe(_listener(weakref.ref(source)))
+                    _subscribed.add(source)
+                version = _version
+                index = PokedexIndex(records_from_cache(source))
+                if version == _version:
+                    _index, _index_source = index, weakref.ref(source)
+    return index
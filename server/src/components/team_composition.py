@@ -1,9 +1,11 @@
+import asyncio
 from google import genai
 from dotenv import load_dotenv
 import os
 import json
 import re
 from .info_retrival import Pokemon  # adjust import path as needed
+from . import profiling
 
 load_dotenv()
 api_key = os.getenv("GOOGLE_API_KEY")
@@ -19,8 +21,8 @@ def extract_json_from_text(text: str):
             return None
     return None
 
-def generate_team_with_gemini(description: str) -> dict:
-    prompt = f"""
+def _team_prompt(description: str) -> str:
+    return f"""
 You are a Pokémon team builder.
 
 Given this description:
@@ -41,12 +43,7 @@ Example:
 }}
 """
 
-    response = client.models.generate_content(
-        model='gemini-2.0-flash-001',
-        contents=prompt
-    )
-
-    raw_text = response.text
+def _parse_team(raw_text: str) -> dict:
     team_data = None
 
     try:
@@ -56,6 +53,16 @@ Example:
 
     if not team_data:
         raise ValueError(f"Failed to parse JSON from Gemini response. Raw response: {raw_text}")
+    return team_data
+
+def generate_team_with_gemini(description: str) -> dict:
+    with profiling.span(profiling.LLM, "gemini-2.0-flash-001"):
+        response = client.models.generate_content(
+            model='gemini-2.0-flash-001',
+            contents=_team_prompt(description)
+        )
+
+    team_data = _parse_team(response.text)
 
     # Add image URL for each Pokémon in the team
     for poke in team_data.get("team", []):
@@ -67,3 +74,25 @@ Example:
             poke["image_url"] = None
 
     return team_data
+
+
+async def generate_team_with_gemini_async(description: str) -> dict:
+    """Async twin of generate_team_with_gemini(); team sprites are fetched concurrently."""
+    with profiling.span(profiling.LLM, "gemini-2.0-flash-001"):
+        response = await client.aio.models.generate_content(
+            model='gemini-2.0-flash-001',
+            contents=_team_prompt(description)
+        )
+
+    team_data = _parse_team(response.text)
+
+    async def add_image_url(poke):
+        try:
+            poke_obj = Pokemon(poke["name"].lower())
+            await poke_obj.fetch_async(("sprite",))
+            poke["image_url"] = poke_obj.get_image_url()
+        except Exception:
+            poke["image_url"] = None
+
+    await asyncio.gather(*[add_image_url(poke) for poke in team_data.get("team", [])])
+    return team_data
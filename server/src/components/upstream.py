@@ -0,0 +1,487 @@
+import asyncio
+import contextvars
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+import httpx
+import requests
+from dotenv import load_dotenv
+import os
+
+from .cache import cache
+from .rate_limit import limiter, RateLimitTimeout
+from . import profiling
+
+load_dotenv()
+
+BASE_URL = (os.getenv("POKE_API_URL") or "https://pokeapi.co/api/v2").strip().rstrip("/")
+
+# Per-attempt timeout, retry policy and circuit breaker tuning.
+REQUEST_TIMEOUT = float(os.getenv("POKE_API_TIMEOUT", "5"))
+MAX_RETRIES = int(os.getenv("POKE_API_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("POKE_API_BACKOFF_BASE", "0.25"))
+BACKOFF_CAP = float(os.getenv("POKE_API_BACKOFF_CAP", "4"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("POKE_API_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("POKE_API_BREAKER_RESET", "30"))
+# Connection pool size of the shared async client (one per event loop).
+ASYNC_MAX_CONNECTIONS = int(os.getenv("POKE_API_MAX_CONNECTIONS", "100"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Absolute time.monotonic() by which the current tool call/request must finish.
+_deadline = contextvars.ContextVar("upstream_deadline", default=None)
+
+
+class UpstreamError(Exception):
+    """A PokeAPI request failed."""
+
+    def __init__(self, message, status_code=None, url=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+
+
+class NotFoundError(UpstreamError):
+    """PokeAPI answered 404 for the requested resource."""
+
+
+class DeadlineExceeded(UpstreamError):
+    """The caller's deadline expired before PokeAPI answered."""
+
+
+class CircuitOpenError(UpstreamError):
+    """PokeAPI is considered degraded and nothing usable is cached."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    After `failure_threshold` consecutive failed calls the breaker opens and
+    calls fail fast for `reset_timeout` seconds. The first call after that is
+    let through as a probe: success closes the breaker, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._last_error = None
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "stale_served": 0}
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+            self._stats["successes"] += 1
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            self._stats["failures"] += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """The call let through as a probe ended without a verdict on PokeAPI's health; let the next one probe."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_stale_served(self):
+        with self._lock:
+            self._stats["stale_served"] += 1
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self._opened_at), 2))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+                **self._stats,
+            }
+
+
+breaker = CircuitBreaker()
+
+# Upstream requests in flight, by cache key (see fetch_json).
+_inflight = {}
+_inflight_lock = threading.Lock()
+_async_inflight = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Bound every upstream call made inside the block to finish within `seconds`.
+
+    Nested deadlines can only tighten the outer one.
+    """
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """Seconds left before the current deadline, or None when unbounded."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def resource_key(path_or_url):
+    """
+    Normalize a resource path or absolute PokeAPI URL into a cache key.
+
+    "https://pokeapi.co/api/v2/evolution-chain/10/" -> "evolution-chain/10"
+    """
+    path = str(path_or_url).strip()
+    if path.startswith(BASE_URL):
+        path = path[len(BASE_URL):]
+    elif "/api/v2/" in path:
+        path = path.split("/api/v2/", 1)[1]
+    return path.strip("/").lower()
+
+
+def resource_url(key):
+    return f"{BASE_URL}/{key}"
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter; a server Retry-After acts as the floor."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_CAP))
+    return delay
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _request(key):
+    """GET a resource with per-attempt timeouts and bounded, jittered retries."""
+    url = resource_url(key)
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded fetching '{key}'", url=url) from last_error
+        # Every attempt (retries included) spends a token from the shared limiter.
+        try:
+            with profiling.span(profiling.RATE_LIMIT_WAIT, key):
+                limiter.acquire(timeout=remaining)
+        except RateLimitTimeout as e:
+            raise DeadlineExceeded(f"Deadline exceeded waiting to fetch '{key}'", url=url) from e
+        remaining = remaining_time()
+        timeout = REQUEST_TIMEOUT if remaining is None else max(0.001, min(REQUEST_TIMEOUT, remaining))
+
+        retry_after = None
+        try:
+            with profiling.span(profiling.UPSTREAM, key):
+                response = requests.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            last_error = UpstreamError(f"PokeAPI request for '{key}' failed: {e}", url=url)
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 404:
+                raise NotFoundError(f"Resource '{key}' not found", status_code=404, url=url)
+            last_error = UpstreamError(
+                f"PokeAPI request for '{key}' failed: {response.status_code}",
+                status_code=response.status_code,
+                url=url,
+            )
+            if response.status_code not in RETRYABLE_STATUS:
+                raise last_error
+            retry_after = _retry_after(response)
+
+        if attempt == MAX_RETRIES:
+            break
+        delay = _backoff_delay(attempt, retry_after)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"Deadline exceeded fetching '{key}'", url=url) from last_error
+        time.sleep(delay)
+    raise last_error
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def async_client():
+    """The httpx.AsyncClient shared by every coroutine on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS,
+                              max_keepalive_connections=ASYNC_MAX_CONNECTIONS)
+        client = _async_clients[loop] = httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT)
+    return client
+
+
+async def _request_async(key):
+    """Async twin of _request(); keep the two retry policies in step."""
+    url = resource_url(key)
+    client = async_client()
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded fetching '{key}'", url=url) from last_error
+        try:
+            with profiling.span(profiling.RATE_LIMIT_WAIT, key):
+                await limiter.acquire_async(timeout=remaining)
+        except RateLimitTimeout as e:
+            raise DeadlineExceeded(f"Deadline exceeded waiting to fetch '{key}'", url=url) from e
+        remaining = remaining_time()
+        timeout = REQUEST_TIMEOUT if remaining is None else max(0.001, min(REQUEST_TIMEOUT, remaining))
+
+        retry_after = None
+        try:
+            with profiling.span(profiling.UPSTREAM, key):
+                response = await client.get(url, timeout=timeout)
+        except httpx.HTTPError as e:
+            last_error = UpstreamError(f"PokeAPI request for '{key}' failed: {e}", url=url)
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 404:
+                raise NotFoundError(f"Resource '{key}' not found", status_code=404, url=url)
+            last_error = UpstreamError(
+                f"PokeAPI request for '{key}' failed: {response.status_code}",
+                status_code=response.status_code,
+                url=url,
+            )
+            if response.status_code not in RETRYABLE_STATUS:
+                raise last_error
+            retry_after = _retry_after(response)
+
+        if attempt == MAX_RETRIES:
+            break
+        delay = _backoff_delay(attempt, retry_after)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"Deadline exceeded fetching '{key}'", url=url) from last_error
+        await asyncio.sleep(delay)
+    raise last_error
+
+
+def _raise_if_missing(key):
+    if cache.is_missing(key):
+        raise NotFoundError(f"Resource '{key}' not found", status_code=404, url=resource_url(key))
+
+
+def fetch_json(path_or_url, use_cache=True):
+    """
+    Fetch a PokeAPI resource, serving it from the local cache when possible.
+
+    Transient failures are retried; when PokeAPI stays unavailable (or the
+    circuit breaker is open) a stale cached copy is served if one exists.
+    Raises NotFoundError for 404s, without a request while the cache remembers
+    the 404, and UpstreamError for any other failure.
+    """
+    key = resource_key(path_or_url)
+    if use_cache:
+        with profiling.span(profiling.CACHE, key):
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+        _raise_if_missing(key)
+
+    # Single flight: concurrent callers missing the cache for the same key
+    # share one upstream request.
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        try:
+            return future.result(timeout=remaining_time())
+        except FutureTimeoutError as e:
+            raise DeadlineExceeded(f"Deadline exceeded waiting for '{key}'", url=resource_url(key)) from e
+
+    try:
+        data = _fetch_uncached(key)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(data)
+        return data
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def _fetch_uncached(key):
+    if not breaker.allow():
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise CircuitOpenError(
+            f"PokeAPI is unavailable (circuit open), no cached copy of '{key}'",
+            status_code=503,
+            url=resource_url(key),
+        )
+
+    try:
+        data = _request(key)
+    except NotFoundError:
+        breaker.record_success()
+        cache.remember_missing(key)
+        raise
+    except DeadlineExceeded:
+        # The caller's budget ran out, queued behind the rate limiter or in
+        # backoff; that says nothing about PokeAPI's health.
+        breaker.release_probe()
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise
+    except UpstreamError as e:
+        if e.status_code is not None and e.status_code < 500 and e.status_code not in RETRYABLE_STATUS:
+            # Client errors say nothing about PokeAPI's health.
+            breaker.record_success()
+            raise
+        breaker.record_failure(e)
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise
+    except BaseException:
+        # Anything else (an undecodable body, a cancelled task) must not
+        # leave a half-open breaker waiting forever on its probe.
+        breaker.release_probe()
+        raise
+
+    breaker.record_success()
+    cache.set(key, data)
+    return data
+
+
+async def fetch_json_async(path_or_url, use_cache=True):
+    """Async twin of fetch_json(): same cache, breaker, deadline, retry and single-flight semantics."""
+    key = resource_key(path_or_url)
+    if use_cache:
+        with profiling.span(profiling.CACHE, key):
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+        _raise_if_missing(key)
+
+    inflight = _async_inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(_fetch_uncached_async(key))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    # Shielded so one cancelled caller does not cancel the fetch for the others.
+    return await asyncio.shield(task)
+
+
+async def _fetch_uncached_async(key):
+    if not breaker.allow():
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise CircuitOpenError(
+            f"PokeAPI is unavailable (circuit open), no cached copy of '{key}'",
+            status_code=503,
+            url=resource_url(key),
+        )
+
+    try:
+        data = await _request_async(key)
+    except NotFoundError:
+        breaker.record_success()
+        cache.remember_missing(key)
+        raise
+    except DeadlineExceeded:
+        # The caller's budget ran out, queued behind the rate limiter or in
+        # backoff; that says nothing about PokeAPI's health.
+        breaker.release_probe()
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise
+    except UpstreamError as e:
+        if e.status_code is not None and e.status_code < 500 and e.status_code not in RETRYABLE_STATUS:
+            breaker.record_success()
+            raise
+        breaker.record_failure(e)
+        stale = cache.get(key, allow_stale=True)
+        if stale is not None:
+            breaker.record_stale_served()
+            return stale
+        raise
+    except BaseException:
+        # Anything else (an undecodable body, a cancelled task) must not
+        # leave a half-open breaker waiting forever on its probe.
+        breaker.release_probe()
+        raise
+
+    breaker.record_success()
+    cache.set(key, data)
+    return data
+
+
+def health():
+    """Upstream layer state for health checks."""
+    return {
+        "base_url": BASE_URL,
+        "circuit_breaker": breaker.snapshot(),
+        "rate_limiter": limiter.snapshot(),
+        "negative_cache": cache.negative_snapshot(),
+    }